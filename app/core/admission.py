@@ -0,0 +1,270 @@
+import asyncio
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import Header
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.errors import ServiceUnavailableError, ValidationError
+
+# Lower value wins. Interactive queries are admitted before writes, writes before bulk work.
+PRIORITIES: Dict[str, int] = {"query": 0, "write": 1, "bulk": 2}
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    seq: int
+    name: str
+    future: "asyncio.Future[None]"
+
+
+class AdmissionController:
+    """Caps concurrent embedding/query work and sheds requests that would wait too long.
+
+    Waiting requests are admitted in priority order. A request is rejected up front
+    when the estimated queue wait (requests ahead of it times the EWMA service time,
+    spread over the slots) exceeds its deadline, and again if the deadline passes
+    while it is queued.
+
+    Waiting is an ``await`` on a future, so a queued request holds no worker
+    thread. Slots are handed to waiters under a thread lock and the wake-up is
+    posted to each waiter's own event loop, so one controller serves every loop
+    and thread in the process.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        bulk_max_concurrent: int = 4,
+        initial_service_ms: float = 50.0,
+        ewma_alpha: float = 0.2,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.bulk_max_concurrent = max(1, min(bulk_max_concurrent, self.max_concurrent))
+        self.ewma_alpha = ewma_alpha
+        self.service_seconds = max(initial_service_ms, 0.0) / 1000.0
+        self.in_flight = 0
+        self.bulk_in_flight = 0
+        self.admitted_total = 0
+        self.shed_total: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def estimated_wait(self, priority: str) -> float:
+        with self._lock:
+            return self._estimate(PRIORITIES[priority])
+
+    async def acquire(self, priority: str, deadline_ms: float) -> float:
+        """Wait until a slot is free; returns the admission time for ``release``."""
+        level = PRIORITIES[priority]
+        deadline = time.monotonic() + max(deadline_ms, 0.0) / 1000.0
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            waiter = _Waiter(level, next(self._seq), priority, loop.create_future())
+            if self._eligible(priority):
+                self._admit(priority)
+                return time.monotonic()
+            estimate = self._estimate(level)
+            if estimate > deadline - time.monotonic():
+                self._shed(priority, estimate)
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter.future, max(deadline - time.monotonic(), 0.0))
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self._shed(priority, self._estimate(level))
+            # Handed a slot just as the deadline passed: keep it.
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    self._free(priority)
+                    self._dispatch()
+            raise
+        return time.monotonic()
+
+    def release(self, priority: str, admitted_at: float) -> None:
+        elapsed = time.monotonic() - admitted_at
+        with self._lock:
+            self._free(priority)
+            self.service_seconds += self.ewma_alpha * (elapsed - self.service_seconds)
+            self._dispatch()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": settings.ADMISSION_ENABLED,
+                "max_concurrent": self.max_concurrent,
+                "bulk_max_concurrent": self.bulk_max_concurrent,
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "service_ms_ewma": round(self.service_seconds * 1000.0, 3),
+                "admitted_total": self.admitted_total,
+                "shed_total": dict(self.shed_total),
+            }
+
+    def _eligible(self, name: str) -> bool:
+        if self.in_flight >= self.max_concurrent:
+            return False
+        return name != "bulk" or self.bulk_in_flight < self.bulk_max_concurrent
+
+    def _admit(self, name: str) -> None:
+        self.in_flight += 1
+        if name == "bulk":
+            self.bulk_in_flight += 1
+        self.admitted_total += 1
+
+    def _free(self, name: str) -> None:
+        self.in_flight -= 1
+        if name == "bulk":
+            self.bulk_in_flight -= 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority and oldest first. Caller holds the lock."""
+        for waiter in sorted(self._waiters, key=lambda item: (item.priority, item.seq)):
+            if self.in_flight >= self.max_concurrent:
+                return
+            if not self._eligible(waiter.name):
+                continue
+            self._waiters.remove(waiter)
+            self._admit(waiter.name)
+            waiter.future.get_loop().call_soon_threadsafe(_wake, waiter.future)
+
+    def _estimate(self, level: int) -> float:
+        ahead = sum(1 for waiter in self._waiters if waiter.priority <= level)
+        if self.in_flight < self.max_concurrent and ahead == 0:
+            return 0.0
+        return (ahead + 1) * self.service_seconds / self.max_concurrent
+
+    def _shed(self, priority: str, estimate: float) -> None:
+        self.shed_total[priority] += 1
+        raise ServiceUnavailableError(
+            "Server is overloaded; retry later",
+            details={"priority": priority, "estimated_wait_ms": round(estimate * 1000.0, 1)},
+            retry_after=max(1, math.ceil(estimate)),
+        )
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+
+def reset_admission_controller() -> None:
+    global admission_controller
+    admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global admission_controller
+    if admission_controller is not None:
+        return admission_controller
+
+    with _admission_controller_lock:
+        if admission_controller is None:
+            admission_controller = AdmissionController(
+                max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+                bulk_max_concurrent=settings.ADMISSION_BULK_MAX_CONCURRENT,
+                initial_service_ms=settings.ADMISSION_INITIAL_SERVICE_MS,
+            )
+    return admission_controller
+
+
+class AdmissionSlot:
+    """A held admission slot. ``release`` is idempotent; a no-op slot when admission is off."""
+
+    def __init__(
+        self,
+        controller: Optional[AdmissionController] = None,
+        priority: str = "query",
+        admitted_at: float = 0.0,
+    ):
+        self._controller = controller
+        self._priority = priority
+        self._admitted_at = admitted_at
+        self._released = False
+        self.handed_off = False
+
+    def release(self) -> None:
+        if self._released or self._controller is None:
+            return
+        self._released = True
+        self._controller.release(self._priority, self._admitted_at)
+
+    def hold_until_sent(self, response: Response) -> Response:
+        """Keep the slot until ``response`` has been sent instead of when the endpoint returns.
+
+        Route dependencies exit before a streaming body is sent, so a streaming
+        endpoint hands its slot to the response to bound the streaming work too.
+        """
+        self.handed_off = True
+        return _SlotHeldResponse(response, self)
+
+
+class _SlotHeldResponse(Response):
+    """Sends the wrapped response, then frees the slot even if the client went away."""
+
+    def __init__(self, response: Response, slot: AdmissionSlot):
+        self.response = response
+        self.slot = slot
+        self.status_code = response.status_code
+        self.media_type = response.media_type
+        self.raw_headers = response.raw_headers
+        self.background = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.slot.release()
+        if self.background is not None:
+            await self.background()
+
+
+def admit(priority: str) -> Callable[..., AsyncIterator[AdmissionSlot]]:
+    """Route dependency that holds an admission slot for the duration of the request.
+
+    It is ``async`` so queued requests wait on the event loop instead of holding a
+    threadpool thread that admitted sync endpoints need to run. It yields the
+    :class:`AdmissionSlot`; streaming endpoints pass their response through
+    ``slot.hold_until_sent`` so the slot lasts until the body has been sent.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown admission priority {priority!r}")
+
+    async def dependency(
+        x_statelock_deadline_ms: Optional[str] = Header(default=None),
+    ) -> AsyncIterator[AdmissionSlot]:
+        if not settings.ADMISSION_ENABLED:
+            yield AdmissionSlot()
+            return
+        deadline_ms = float(settings.ADMISSION_DEFAULT_DEADLINE_MS)
+        if x_statelock_deadline_ms is not None:
+            try:
+                deadline_ms = float(x_statelock_deadline_ms)
+            except ValueError:
+                raise ValidationError("X-Statelock-Deadline-Ms must be a number of milliseconds")
+        controller = get_admission_controller()
+        slot = AdmissionSlot(controller, priority, await controller.acquire(priority, deadline_ms))
+        try:
+            yield slot
+        finally:
+            if not slot.handed_off:
+                slot.release()
+
+    return dependency
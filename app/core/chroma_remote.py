@@ -0,0 +1,103 @@
+"""Chroma client/server mode (``CHROMA_MODE=http``).
+
+The stock HTTP client opens an unbounded ``httpx`` session with no timeout.
+``build_http_client`` swaps in a pooled session with connect/read timeouts, and
+``RetryingCollection`` retries collection calls that fail at the transport
+level (refused or reset connections, timeouts) with exponential backoff. Every
+collection operation the service uses is idempotent or keyed by id, so a retry
+cannot duplicate a write.
+"""
+
+import logging
+import random
+import time
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_RETRIED_METHODS = {"add", "upsert", "update", "delete", "get", "query", "count", "peek"}
+
+
+def _transport_errors() -> tuple:
+    import httpx
+
+    return (httpx.TransportError,)
+
+
+def with_retries(fn: Callable[[], T], retries: int, backoff_seconds: float) -> T:
+    errors = _transport_errors()
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except errors as exc:
+            if attempt >= retries:
+                raise
+            delay = backoff_seconds * (2**attempt) * (0.5 + random.random() / 2)
+            logger.warning("Chroma request failed (%s); retrying in %.2fs", exc, delay)
+            time.sleep(delay)
+            attempt += 1
+
+
+class RetryingCollection:
+    """Proxy for a remote collection that retries transport failures."""
+
+    def __init__(self, collection: Any, retries: int, backoff_seconds: float):
+        self._collection = collection
+        self._retries = max(0, retries)
+        self._backoff_seconds = max(0.0, backoff_seconds)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if name not in _RETRIED_METHODS or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return with_retries(
+                lambda: attr(*args, **kwargs), self._retries, self._backoff_seconds
+            )
+
+        return call
+
+
+def _pooled_session(headers: dict):
+    import httpx
+
+    return httpx.Client(
+        headers=headers,
+        timeout=httpx.Timeout(
+            settings.CHROMA_TIMEOUT_SECONDS, connect=settings.CHROMA_CONNECT_TIMEOUT_SECONDS
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.CHROMA_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.CHROMA_POOL_MAX_KEEPALIVE,
+        ),
+    )
+
+
+def build_http_client():
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    def connect():
+        return chromadb.HttpClient(
+            host=settings.CHROMA_HOST,
+            port=settings.CHROMA_PORT,
+            ssl=settings.CHROMA_SSL,
+            headers=dict(settings.CHROMA_HEADERS),
+            settings=ChromaSettings(anonymized_telemetry=False),
+        )
+
+    client = with_retries(connect, settings.CHROMA_RETRIES, settings.CHROMA_RETRY_BACKOFF_SECONDS)
+    server = getattr(client, "_server", None)
+    session = getattr(server, "_session", None)
+    if session is None:
+        logger.warning("Unexpected chromadb client layout; keeping its default HTTP session")
+        return client
+    server._session = _pooled_session(dict(session.headers))
+    session.close()
+    return client
@@ -0,0 +1,252 @@
+"""Negotiated response compression and compressed request bodies.
+
+``CompressionMiddleware`` compresses responses with the best codec the client
+accepts (zstd, then brotli, then gzip). zstd and brotli are used only when the
+optional ``zstandard`` / ``brotli`` packages are installed. Bodies are
+compressed chunk by chunk as the app sends them, so a streamed response is
+never buffered whole.
+
+``DecompressingRoute`` lets a router accept ``Content-Encoding: gzip`` or
+``zstd`` request bodies, bounded by ``REQUEST_MAX_DECOMPRESSED_BYTES``.
+"""
+
+import io
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.errors import PayloadTooLargeError, UnsupportedMediaTypeError, ValidationError
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+class _Compressor:
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+
+class _GzipCompressor(_Compressor):
+    def __init__(self):
+        self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _ZstdCompressor(_Compressor):
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliCompressor(_Compressor):
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+def available_encodings() -> List[str]:
+    """Supported response codings, most preferred first."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+_COMPRESSORS: Dict[str, Callable[[], _Compressor]] = {
+    "gzip": _GzipCompressor,
+    "zstd": _ZstdCompressor,
+    "br": _BrotliCompressor,
+}
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick a coding from an ``Accept-Encoding`` header, honouring q-values."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in available_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressingResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or message["status"] in (204, 304)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        if self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+            self.compressor = _COMPRESSORS[self.encoding]()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self._flush_start()
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self._flush_start()
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
+
+
+def decompress_body(body: bytes, encoding: str, max_bytes: int) -> bytes:
+    """Decode a request body, refusing to expand it beyond ``max_bytes``."""
+    if encoding == "gzip":
+        decoder = zlib.decompressobj(47)
+        try:
+            data = decoder.decompress(body, max_bytes + 1)
+        except zlib.error as exc:
+            raise ValidationError("Malformed gzip request body", details=str(exc))
+        if len(data) > max_bytes or decoder.unconsumed_tail:
+            raise PayloadTooLargeError(max_bytes)
+        if not decoder.eof:
+            raise ValidationError("Truncated gzip request body")
+        return data
+    if encoding == "zstd" and zstandard is not None:
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body)) as reader:
+                data = reader.read(max_bytes + 1)
+        except zstandard.ZstdError as exc:
+            raise ValidationError("Malformed zstd request body", details=str(exc))
+        if len(data) > max_bytes:
+            raise PayloadTooLargeError(max_bytes)
+        return data
+    supported = ["gzip"] + (["zstd"] if zstandard is not None else [])
+    raise UnsupportedMediaTypeError(
+        f"Unsupported Content-Encoding {encoding!r}", details={"supported": supported}
+    )
+
+
+class DecompressingRequest(Request):
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            encoding = self.headers.get("content-encoding", "").strip().lower()
+            if encoding and encoding != "identity":
+                body = decompress_body(body, encoding, settings.REQUEST_MAX_DECOMPRESSED_BYTES)
+            self._body = body
+        return self._body
+
+
+class DecompressingRoute(APIRoute):
+    """Route class that transparently decodes compressed request bodies."""
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def handler(request: Request):
+            request = DecompressingRequest(request.scope, request.receive)
+            if "content-encoding" in request.headers:
+                # Decode up front: FastAPI would turn errors raised while it reads
+                # the body into a generic 400.
+                await request.body()
+            return await original_handler(request)
+
+        return handler
@@ -1,11 +1,54 @@
+from typing import Dict, List, Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
+    CHROMA_MODE: Literal["embedded", "http", "memory"] = "embedded"
     CHROMA_DB_PATH: str = "./chroma_db"
+    CHROMA_HOST: str = "localhost"
+    CHROMA_PORT: int = 8000
+    CHROMA_SSL: bool = False
+    CHROMA_HEADERS: Dict[str, str] = {}
+    CHROMA_TIMEOUT_SECONDS: float = 10.0
+    CHROMA_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    CHROMA_POOL_MAX_CONNECTIONS: int = 32
+    CHROMA_POOL_MAX_KEEPALIVE: int = 16
+    CHROMA_RETRIES: int = 3
+    CHROMA_RETRY_BACKOFF_SECONDS: float = 0.1
+    CHROMA_DISTANCE_SPACE: Literal["l2", "cosine", "ip"] = "l2"
+    CHROMA_HNSW_M: int = 16
+    CHROMA_HNSW_CONSTRUCTION_EF: int = 100
+    CHROMA_HNSW_SEARCH_EF: int = 10
+    REINDEX_BATCH_SIZE: int = 500
+    TOMBSTONE_RETENTION_SECONDS: int = 7 * 24 * 3600
+    SESSION_COPY_BATCH_SIZE: int = 500
+    SESSION_COPY_INLINE_MAX: int = 2000
+    JOBS_DB_PATH: str = ""
+    JOBS_MAX_WORKERS: int = 2
+    JOBS_MAX_QUEUED: int = 100
+    JOBS_BATCH_SIZE: int = 500
+    JOBS_HEARTBEAT_SECONDS: float = 5.0
+    JOBS_RETENTION_SECONDS: int = 7 * 24 * 3600
+    JOBS_COMPACTION_INTERVAL_SECONDS: float = 3600.0
+    JOBS_COUNTER_REBUILD_INTERVAL_SECONDS: float = 0.0
+    MEMORY_CHECKPOINT_INTERVAL_SECONDS: float = 30.0
+    MEMORY_CHECKPOINT_EVERY_WRITES: int = 1000
+    MEMORY_JOURNAL_FSYNC: bool = False
     EMBEDDING_MODEL_NAME: str = "all-MiniLM-L6-v2"
     EMBEDDING_PROVIDER: str = "local"
     HASH_EMBEDDING_DIM: int = 256
+    NGRAM_EMBEDDING_DIM: int = 1024
+    NGRAM_CHAR_MIN: int = 3
+    NGRAM_CHAR_MAX: int = 5
+    EMBEDDING_SERVER_SOCKET: str = "/tmp/statelock-embedder.sock"
+    EMBEDDING_SERVER_PROVIDER: str = "local"
+    EMBEDDING_SERVER_MAX_BATCH: int = 64
+    EMBEDDING_SERVER_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_SERVER_TIMEOUT_SECONDS: float = 10.0
+    EMBEDDING_SERVER_RETRY_SECONDS: float = 5.0
+    EMBEDDING_MIGRATION_BATCH_SIZE: int = 256
+    EMBEDDING_MIGRATION_MAX_ROWS_PER_SECOND: float = 200.0
     QUERY_CANDIDATE_MULTIPLIER: int = 5
     API_TITLE: str = "StateLock Engine API"
     API_VERSION: str = "0.3.0"
@@ -19,6 +62,60 @@ class Settings(BaseSettings):
     API_TAG_MAX_COUNT: int = 20
     AUTH_REQUIRED: bool = False
     STATELOCK_API_KEY: str = ""
+    POLICY_SAVE_TRIGGERS: List[str] = ["decision", "preference", "todo", "policy"]
+    POLICY_LOW_CONFIDENCE_PATTERNS: List[str] = [
+        r"i\s+am\s+not\s+sure",
+        r"i\s+think",
+        r"maybe",
+        r"might",
+        r"uncertain",
+        r"not\s+confident",
+    ]
+    POLICY_MIN_WORDS: int = 8
+    POLICY_MAX_BATCH: int = 1000
+    CHUNKING_ENABLED: bool = True
+    CHUNK_SIZE_CHARS: int = 1000
+    CHUNK_OVERLAP_CHARS: int = 200
+    # Unset: on, except in CHROMA_MODE=http without JOBS_COUNTER_REBUILD_INTERVAL_SECONDS.
+    LEXICAL_INDEX_ENABLED: Optional[bool] = None
+    LEXICAL_BM25_K1: float = 1.2
+    LEXICAL_BM25_B: float = 0.75
+    DEDUP_ENABLED: bool = False
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.92
+    DEDUP_ACTION: Literal["refresh", "merge"] = "refresh"
+    SESSION_MEMORY_CAP: int = 0
+    SESSION_EVICTION_POLICY: Literal["lru", "oldest"] = "lru"
+    EVICTION_EXEMPT_TAGS: List[str] = ["pinned"]
+    RETRIEVAL_TRACKING_FLUSH_SECONDS: float = 30.0
+    RETRIEVAL_TRACKING_MAX_PENDING: int = 5000
+    RETENTION_ENABLED: bool = False
+    RETENTION_DEFAULT_TTL_SECONDS: int = 0
+    RETENTION_SESSION_PREFIX_TTLS: Dict[str, int] = {}
+    RETENTION_TAG_TTLS: Dict[str, int] = {}
+    RETENTION_MAX_AGE_SECONDS: int = 0
+    RETENTION_INTERVAL_SECONDS: float = 300.0
+    RETENTION_SCAN_PAGE_SIZE: int = 1000
+    RETENTION_DELETE_BATCH_SIZE: int = 200
+    RETENTION_MAX_DELETES_PER_SECOND: float = 500.0
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    REQUEST_MAX_DECOMPRESSED_BYTES: int = 32 * 1024 * 1024
+    SINGLE_FLIGHT_ENABLED: bool = True
+    # Unset: on, except in CHROMA_MODE=http where several workers share the store.
+    ETAG_ENABLED: Optional[bool] = None
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 16
+    ADMISSION_BULK_MAX_CONCURRENT: int = 4
+    ADMISSION_DEFAULT_DEADLINE_MS: float = 5000.0
+    ADMISSION_INITIAL_SERVICE_MS: float = 50.0
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_JOURNAL_PATH: str = ""
+    WRITE_BEHIND_BATCH_SIZE: int = 64
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: float = 50.0
+    WRITE_BEHIND_FSYNC: bool = True
 
     class Config:
         env_file = ".env"
@@ -1,24 +1,171 @@
-import chromadb
+import threading
+from typing import Any, Dict, Optional
 
 from app.core.config import settings
 
+LOGICAL_COLLECTIONS = ("memory_blocks", "memory_chunks")
+# Delete markers for delta sync. Not vector-searched, so reindex and embedding
+# migration leave it in place.
+TOMBSTONE_COLLECTION = "memory_tombstones"
+# Its metadata holds the physical collection name behind each logical one, so an
+# online reindex can swap in a rebuilt collection by rewriting one record, plus the
+# embedding model the active collections were built with.
+CATALOG_COLLECTION = "statelock_catalog"
+
+
+def hnsw_metadata() -> dict:
+    """Collection metadata for newly created collections; existing ones keep theirs."""
+    return {
+        "hnsw:space": settings.CHROMA_DISTANCE_SPACE,
+        "hnsw:M": settings.CHROMA_HNSW_M,
+        "hnsw:construction_ef": settings.CHROMA_HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": settings.CHROMA_HNSW_SEARCH_EF,
+    }
+
+
+def distance_space(collection) -> str:
+    return (getattr(collection, "metadata", None) or {}).get("hnsw:space") or "l2"
+
 
 class Database:
     _client = None
     _collection = None
+    _chunk_collection = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_client(cls):
         if cls._client is None:
-            cls._client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = cls._connect()
         return cls._client
 
+    @classmethod
+    def _connect(cls):
+        if settings.CHROMA_MODE == "http":
+            from app.core.chroma_remote import build_http_client
+
+            return build_http_client()
+        # Imported on first use: chromadb takes seconds to import.
+        import chromadb
+
+        if settings.CHROMA_MODE == "memory":
+            from chromadb.config import Settings as ChromaSettings
+
+            from app.core.memory_store import open_memory_store
+
+            client = chromadb.EphemeralClient(settings=ChromaSettings(anonymized_telemetry=False))
+            open_memory_store(client)
+            return client
+        return chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
+
+    @classmethod
+    def _call(cls, fn):
+        """Run a client call, with transport retries in http mode."""
+        if settings.CHROMA_MODE != "http":
+            return fn()
+        from app.core.chroma_remote import with_retries
+
+        return with_retries(fn, settings.CHROMA_RETRIES, settings.CHROMA_RETRY_BACKOFF_SECONDS)
+
+    @classmethod
+    def _open_collection(cls, client, name: str):
+        if settings.CHROMA_MODE == "memory":
+            from app.core.memory_store import get_memory_store
+
+            return get_memory_store().collection(name)
+        collection = cls._call(
+            lambda: client.get_or_create_collection(name=name, metadata=hnsw_metadata())
+        )
+        if settings.CHROMA_MODE != "http":
+            return collection
+        from app.core.chroma_remote import RetryingCollection
+
+        return RetryingCollection(
+            collection, settings.CHROMA_RETRIES, settings.CHROMA_RETRY_BACKOFF_SECONDS
+        )
+
+    @classmethod
+    def open_physical(cls, name: str):
+        """Open (or create with the configured HNSW settings) a collection by its real name."""
+        return cls._open_collection(cls.get_client(), name)
+
+    @classmethod
+    def catalog(cls) -> Dict[str, Any]:
+        """Catalog entries; always empty in memory mode, which has fixed collections."""
+        if settings.CHROMA_MODE == "memory":
+            return {}
+        client = cls.get_client()
+        catalog = cls._call(lambda: client.get_or_create_collection(name=CATALOG_COLLECTION))
+        return dict(catalog.metadata or {})
+
+    @classmethod
+    def update_catalog(cls, values: Dict[str, Any]) -> None:
+        # modify() replaces the whole metadata, so merge with the current entries.
+        client = cls.get_client()
+        catalog = cls._call(lambda: client.get_or_create_collection(name=CATALOG_COLLECTION))
+        merged = {**(catalog.metadata or {}), **values}
+        cls._call(lambda: catalog.modify(metadata=merged))
+
+    @classmethod
+    def active_names(cls) -> Dict[str, str]:
+        """Physical collection name for each logical collection."""
+        names = {name: name for name in LOGICAL_COLLECTIONS}
+        for logical, physical in cls.catalog().items():
+            if logical in names:
+                names[logical] = str(physical)
+        return names
+
+    @classmethod
+    def activate(
+        cls,
+        names: Dict[str, str],
+        collections: Dict[str, object],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Point the catalog at ``names`` and serve ``collections`` from now on."""
+        cls.update_catalog({**names, **(extra or {})})
+        cls.install(collections)
+
+    @classmethod
+    def install(cls, collections: Dict[str, object]) -> None:
+        """Replace the collection objects handed out to callers (no catalog change)."""
+        with cls._lock:
+            cls._collection = collections.get("memory_blocks", cls._collection)
+            cls._chunk_collection = collections.get("memory_chunks", cls._chunk_collection)
+
     @classmethod
     def get_collection(cls):
         if cls._collection is None:
             client = cls.get_client()
-            cls._collection = client.get_or_create_collection(name="memory_blocks")
+            name = cls.active_names()["memory_blocks"]
+            with cls._lock:
+                if cls._collection is None:
+                    cls._collection = cls._open_collection(client, name)
         return cls._collection
 
+    @classmethod
+    def get_chunk_collection(cls):
+        if cls._chunk_collection is None:
+            client = cls.get_client()
+            name = cls.active_names()["memory_chunks"]
+            with cls._lock:
+                if cls._chunk_collection is None:
+                    cls._chunk_collection = cls._open_collection(client, name)
+        return cls._chunk_collection
+
+    @classmethod
+    def check_ready(cls) -> None:
+        """Raise if the store is unreachable; in http mode this pings the server each call."""
+        cls.get_collection()
+        if settings.CHROMA_MODE == "http":
+            cls.get_client().heartbeat()
+
+
 def get_db_collection():
     return Database.get_collection()
+
+
+def get_chunk_collection():
+    return Database.get_chunk_collection()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -10,6 +10,7 @@ class AppError(Exception):
     message: str
     status_code: int = 400
     details: Any = None
+    headers: Optional[Dict[str, str]] = None
 
 
 class NotFoundError(AppError):
@@ -48,10 +49,41 @@ class UnauthorizedError(AppError):
 
 
 class ServiceUnavailableError(AppError):
-    def __init__(self, message: str = "Service unavailable", details: Any = None):
+    def __init__(
+        self,
+        message: str = "Service unavailable",
+        details: Any = None,
+        retry_after: Optional[int] = None,
+    ):
         super().__init__(
             code="service_unavailable",
             message=message,
             status_code=503,
             details=details,
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None,
         )
+
+
+class PayloadTooLargeError(AppError):
+    def __init__(self, max_bytes: int, details: Any = None):
+        super().__init__(
+            code="payload_too_large",
+            message=f"Request body exceeds {max_bytes} bytes after decompression",
+            status_code=413,
+            details=details,
+        )
+
+
+class UnsupportedMediaTypeError(AppError):
+    def __init__(self, message: str, details: Any = None):
+        super().__init__(
+            code="unsupported_media_type",
+            message=message,
+            status_code=415,
+            details=details,
+        )
+
+
+class ConflictError(AppError):
+    def __init__(self, message: str, details: Any = None):
+        super().__init__(code="conflict", message=message, status_code=409, details=details)
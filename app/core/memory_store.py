@@ -0,0 +1,275 @@
+"""RAM-resident store mode (``CHROMA_MODE=memory``).
+
+Collections live in a Chroma ``EphemeralClient``. Every committed write is
+appended to a journal, and a background thread checkpoints the collections to
+``CHROMA_DB_PATH/memory_mode`` every ``MEMORY_CHECKPOINT_INTERVAL_SECONDS`` or
+after ``MEMORY_CHECKPOINT_EVERY_WRITES`` writes. Startup loads the last
+checkpoint and replays the journals written since.
+
+A checkpoint starts a new journal file, lists each collection's ids in one read
+and then fetches the rows by id without holding any lock, so queries and writes
+keep running (writes only hold the journal lock for their own apply-and-append).
+Writes that land while it reads are in the new journal; replaying them on top
+of the checkpoint is safe because every journaled operation is idempotent. Writes
+since the last journal flush to disk can be lost on a crash.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import LOGICAL_COLLECTIONS, TOMBSTONE_COLLECTION, hnsw_metadata
+
+logger = logging.getLogger(__name__)
+
+_JOURNALED_METHODS = ("add", "upsert", "update", "delete")
+_CHECKPOINT_FILE = "checkpoint.jsonl"
+_CHECKPOINT_PAGE_SIZE = 1000
+
+
+def _plain(value: Any) -> Any:
+    """JSON-safe copy of Chroma write arguments (embeddings may be numpy arrays)."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+class JournaledCollection:
+    """Proxy that journals each successful write to an in-memory collection."""
+
+    def __init__(self, collection: Any, store: "MemoryStore"):
+        self._collection = collection
+        self._store = store
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._collection, name)
+        if name not in _JOURNALED_METHODS:
+            return attr
+
+        def call(**kwargs):
+            return self._store.apply(self._collection.name, name, attr, kwargs)
+
+        return call
+
+
+class MemoryStore:
+    def __init__(
+        self,
+        client: Any,
+        directory: str,
+        checkpoint_interval: float = 30.0,
+        checkpoint_every_writes: int = 1000,
+        fsync: bool = False,
+    ):
+        self.client = client
+        self.directory = directory
+        self.checkpoint_interval = max(0.1, checkpoint_interval)
+        self.checkpoint_every_writes = max(1, checkpoint_every_writes)
+        self.fsync = fsync
+        self.checkpoints_total = 0
+        self.writes_since_checkpoint = 0
+        self._raw: Dict[str, Any] = {}
+        self._journal_lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._journal = None
+        self._journal_seq = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def collection(self, name: str) -> JournaledCollection:
+        return JournaledCollection(self._raw[name], self)
+
+    def recover(self) -> int:
+        """Rebuild the collections from the checkpoint and journals; returns records replayed."""
+        for name in LOGICAL_COLLECTIONS + (TOMBSTONE_COLLECTION,):
+            try:
+                self.client.delete_collection(name)
+            except Exception:
+                pass
+            self._raw[name] = self.client.get_or_create_collection(
+                name=name, metadata=hnsw_metadata()
+            )
+
+        replayed = 0
+        first_journal = 0
+        checkpoint_path = os.path.join(self.directory, _CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as handle:
+                header = json.loads(handle.readline())
+                first_journal = int(header["journal"])
+                for line in handle:
+                    record = json.loads(line)
+                    self._raw[record["collection"]].upsert(**record["rows"])
+
+        seqs = sorted(seq for seq in self._journal_seqs() if seq >= first_journal)
+        for seq in seqs:
+            for record in self._read_journal(seq):
+                getattr(self._raw[record["collection"]], record["op"])(**record["kwargs"])
+                replayed += 1
+        for seq in self._journal_seqs():
+            if seq < first_journal:
+                os.remove(self._journal_path(seq))
+
+        self._open_journal((seqs[-1] + 1) if seqs else first_journal)
+        return replayed
+
+    def apply(self, collection: str, op: str, fn, kwargs: dict) -> Any:
+        """Run a write and journal it; the lock keeps journal order equal to apply order."""
+        line = json.dumps({"collection": collection, "op": op, "kwargs": _plain(kwargs)})
+        with self._journal_lock:
+            result = fn(**kwargs)
+            self._journal.write(line + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self.writes_since_checkpoint += 1
+            due = self.writes_since_checkpoint >= self.checkpoint_every_writes
+        if due:
+            self._wake.set()
+        return result
+
+    def checkpoint(self) -> None:
+        with self._checkpoint_lock:
+            with self._journal_lock:
+                new_seq = self._journal_seq + 1
+                self._open_journal(new_seq)
+                self.writes_since_checkpoint = 0
+
+            tmp_path = os.path.join(self.directory, f"{_CHECKPOINT_FILE}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps({"journal": new_seq}) + "\n")
+                for name, collection in self._raw.items():
+                    for rows in self._pages(collection):
+                        handle.write(json.dumps({"collection": name, "rows": rows}) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, os.path.join(self.directory, _CHECKPOINT_FILE))
+            for seq in self._journal_seqs():
+                if seq < new_seq:
+                    os.remove(self._journal_path(seq))
+            self.checkpoints_total += 1
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="statelock-memory-checkpoint", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, checkpoint: bool = True) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        if checkpoint:
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("Final checkpoint failed; the journal still holds recent writes")
+        with self._journal_lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.checkpoint_interval)
+            self._wake.clear()
+            if self._stop.is_set() or self.writes_since_checkpoint == 0:
+                continue
+            try:
+                self.checkpoint()
+            except Exception:
+                logger.exception("Memory-mode checkpoint failed; retrying")
+                self._stop.wait(1.0)
+
+    def _pages(self, collection: Any):
+        # Offset paging would skip rows when a concurrent delete shifts the pages, and
+        # a skipped row is in neither the checkpoint nor the new journal. Every row that
+        # exists once the journal has switched is in this one id listing instead.
+        all_ids = collection.get(include=[]).get("ids") or []
+        for start in range(0, len(all_ids), _CHECKPOINT_PAGE_SIZE):
+            page = collection.get(
+                ids=all_ids[start : start + _CHECKPOINT_PAGE_SIZE],
+                include=["embeddings", "metadatas", "documents"],
+            )
+            ids = page.get("ids") or []
+            if ids:
+                yield {
+                    "ids": ids,
+                    "embeddings": _plain(page["embeddings"]),
+                    "metadatas": page["metadatas"],
+                    "documents": page["documents"],
+                }
+
+    def _journal_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"journal.{seq}.jsonl")
+
+    def _journal_seqs(self) -> List[int]:
+        seqs = []
+        for filename in os.listdir(self.directory):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] == "journal" and parts[1].isdigit():
+                seqs.append(int(parts[1]))
+        return sorted(seqs)
+
+    def _read_journal(self, seq: int):
+        with open(self._journal_path(seq), "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append.
+                    logger.warning("Skipping unreadable journal line in journal.%d", seq)
+
+    def _open_journal(self, seq: int) -> None:
+        """Switch appends to ``journal.<seq>``. Caller holds ``_journal_lock`` after startup."""
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self._journal_path(seq), "a", encoding="utf-8")
+        self._journal_seq = seq
+
+
+memory_store: Optional[MemoryStore] = None
+
+
+def open_memory_store(client: Any) -> MemoryStore:
+    """Recover the in-memory collections into ``client`` and start checkpointing."""
+    global memory_store
+    reset_memory_store()
+    store = MemoryStore(
+        client,
+        os.path.join(settings.CHROMA_DB_PATH, "memory_mode"),
+        checkpoint_interval=settings.MEMORY_CHECKPOINT_INTERVAL_SECONDS,
+        checkpoint_every_writes=settings.MEMORY_CHECKPOINT_EVERY_WRITES,
+        fsync=settings.MEMORY_JOURNAL_FSYNC,
+    )
+    replayed = store.recover()
+    if replayed:
+        logger.info("Replayed %d journaled writes into the in-memory store", replayed)
+    store.start()
+    memory_store = store
+    return store
+
+
+def get_memory_store() -> Optional[MemoryStore]:
+    return memory_store
+
+
+def reset_memory_store(checkpoint: bool = True) -> None:
+    global memory_store
+    if memory_store is not None:
+        memory_store.stop(checkpoint=checkpoint)
+    memory_store = None
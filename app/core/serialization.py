@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from fastapi import Query
+
+from app.core.errors import ValidationError
+from app.models.schemas import MemoryResponse
+
+# ``ingest_action`` only describes a write; rows read back by query, list or snapshot never
+# carry it, so it is not offered as a projection.
+MEMORY_FIELDS: Tuple[str, ...] = tuple(
+    name for name in MemoryResponse.model_fields if name != "ingest_action"
+)
+
+
+def parse_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if raw is None:
+        return None
+    requested = [part.strip() for part in raw.split(",") if part.strip()]
+    if not requested:
+        return None
+    unknown = sorted(set(requested) - set(MEMORY_FIELDS))
+    if unknown:
+        raise ValidationError(
+            "Unknown memory fields requested",
+            details={"unknown": unknown, "allowed": list(MEMORY_FIELDS)},
+        )
+    return tuple(dict.fromkeys(requested))
+
+
+@dataclass(frozen=True)
+class MemoryProjection:
+    fields: Optional[Tuple[str, ...]] = None
+    content_max_chars: Optional[int] = None
+
+    def apply(self, rows: List[dict]) -> List[dict]:
+        if self.fields is None and self.content_max_chars is None:
+            return rows
+        projected: List[dict] = []
+        for row in rows:
+            item = dict(row) if self.fields is None else {k: row.get(k) for k in self.fields}
+            content = item.get("content")
+            if self.content_max_chars is not None and content:
+                item["content"] = content[: self.content_max_chars]
+            projected.append(item)
+        return projected
+
+
+def memory_projection(
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated memory fields to return, e.g. id,score,name.",
+    ),
+    content_max_chars: Optional[int] = Query(
+        default=None,
+        ge=1,
+        description="Truncate returned content to this many characters.",
+    ),
+) -> MemoryProjection:
+    return MemoryProjection(fields=parse_fields(fields), content_max_chars=content_max_chars)
+
+
+def stream_snapshot_json(
+    header: dict,
+    pages: Iterable[List[dict]],
+    projection: MemoryProjection,
+) -> Iterator[bytes]:
+    """Encode a snapshot as JSON one page at a time.
+
+    Produces the same document as serializing the whole payload, except that
+    ``total`` is written after ``memories`` because it is only known at the end.
+    """
+    yield orjson.dumps(header)[:-1] + b',"memories":['
+    total = 0
+    for page in pages:
+        rows = projection.apply(page)
+        if not rows:
+            continue
+        yield (b"," if total else b"") + orjson.dumps(rows)[1:-1]
+        total += len(rows)
+    yield b'],"total":' + str(total).encode("ascii") + b"}"
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import uuid
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+class WriteVersions:
+    """In-process write counters used for ETags and read coalescing.
+
+    ``global_version`` moves on every committed write or delete; each touched
+    session records the global version of its latest change. The random epoch
+    keeps ETags from a previous process from matching after a restart.
+    """
+
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.global_version = 0
+        self._sessions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, session_ids: Iterable[str]) -> int:
+        with self._lock:
+            self.global_version += 1
+            for session_id in session_ids:
+                self._sessions[session_id] = self.global_version
+            return self.global_version
+
+    def session_version(self, session_id: str) -> int:
+        return self._sessions.get(session_id, 0)
+
+    def etag(self, request: Request, session_id: Optional[str] = None) -> str:
+        """Weak ETag for ``request``'s representation at the current version.
+
+        Scoped to one session when ``session_id`` is given, otherwise to the
+        whole store. The query string is folded in so pagination, projection and
+        limits get distinct tags.
+        """
+        if session_id is None:
+            scope = f"g{self.global_version}"
+        else:
+            scope = f"s{self.session_version(session_id)}"
+        variant = hashlib.blake2b(
+            f"{request.url.path}?{request.url.query}".encode("utf-8"), digest_size=6
+        ).hexdigest()
+        return f'W/"{self.epoch}-{scope}-{variant}"'
+
+
+def etags_enabled() -> bool:
+    """``ETAG_ENABLED``, defaulting to off in ``CHROMA_MODE=http``.
+
+    Write versions are per process; with several workers on a shared server one
+    worker's ETag can match after another worker's write and answer a stale 304.
+    """
+    if settings.ETAG_ENABLED is None:
+        return settings.CHROMA_MODE != "http"
+    return settings.ETAG_ENABLED
+
+
+def current_etag(request: Request, session_id: Optional[str] = None) -> Optional[str]:
+    """ETag to attach to ``request``'s response, or None when ETags are disabled."""
+    if not etags_enabled():
+        return None
+    return get_write_versions().etag(request, session_id)
+
+
+def etag_headers(etag: Optional[str]) -> Dict[str, str]:
+    return {"ETag": etag} if etag is not None else {}
+
+
+def if_none_match(request: Request, etag: Optional[str]) -> bool:
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+write_versions: Optional[WriteVersions] = None
+_write_versions_lock = threading.Lock()
+
+
+def reset_write_versions() -> None:
+    global write_versions
+    write_versions = None
+
+
+def get_write_versions() -> WriteVersions:
+    global write_versions
+    if write_versions is not None:
+        return write_versions
+
+    with _write_versions_lock:
+        if write_versions is None:
+            write_versions = WriteVersions()
+    return write_versions
@@ -1,10 +1,22 @@
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
 from app.core.config import settings
 
 
+def _clean_tags(value: List[str]) -> List[str]:
+    cleaned: List[str] = []
+    for tag in value:
+        tag_text = str(tag).strip()
+        if not tag_text:
+            continue
+        if len(tag_text) > settings.API_TAG_MAX_CHARS:
+            raise ValueError(f"Tag exceeds max length {settings.API_TAG_MAX_CHARS}")
+        cleaned.append(tag_text)
+    return cleaned
+
+
 class MemoryBase(BaseModel):
     content: str = Field(
         ...,
@@ -32,19 +44,14 @@ class MemoryBase(BaseModel):
     @field_validator("tags")
     @classmethod
     def validate_tags(cls, value: List[str]) -> List[str]:
-        cleaned: List[str] = []
-        for tag in value:
-            tag_text = str(tag).strip()
-            if not tag_text:
-                continue
-            if len(tag_text) > settings.API_TAG_MAX_CHARS:
-                raise ValueError(f"Tag exceeds max length {settings.API_TAG_MAX_CHARS}")
-            cleaned.append(tag_text)
-        return cleaned
+        return _clean_tags(value)
 
 
 class MemoryCreate(MemoryBase):
-    pass
+    dedup: Optional[bool] = Field(
+        None,
+        description="Check for a near-duplicate in the session first. Defaults to DEDUP_ENABLED.",
+    )
 
 
 class MemoryUpsert(MemoryBase):
@@ -64,6 +71,13 @@ class MemoryResponse(MemoryBase):
     updated_at: Optional[str] = None
     distance: Optional[float] = None
     score: Optional[float] = None
+    ingest_action: Optional[Literal["inserted", "refreshed", "merged", "queued"]] = Field(
+        None,
+        description=(
+            "On add: whether a new memory was inserted, a near-duplicate was reused, "
+            "or the write was journaled for write-behind flushing."
+        ),
+    )
 
 
 class MemoryQuery(BaseModel):
@@ -79,6 +93,17 @@ class HybridMemoryQuery(MemoryQuery):
     candidate_k: int = Field(default=20, gt=0, le=500)
     recency_weight: float = Field(default=0.25, ge=0.0, le=1.0)
     similarity_weight: float = Field(default=0.75, ge=0.0, le=1.0)
+    lexical_weight: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="Weight of the BM25 keyword score; lexical hits join the vector candidates.",
+    )
+    lexical_only: bool = Field(
+        default=False,
+        description="Rank by BM25 (and recency) alone without embedding the query. "
+        "A zero lexical_weight counts as 1.0 in this mode.",
+    )
 
 
 class MemoryQueryResponse(BaseModel):
@@ -104,14 +129,88 @@ class SessionSnapshotResponse(BaseModel):
 
 
 class SessionRestoreRequest(BaseModel):
-    mode: Literal["replace", "append"] = "append"
+    mode: Literal["replace", "append", "delta"] = "append"
     memories: List[MemoryUpsert] = Field(default_factory=list)
+    deleted: List[str] = Field(
+        default_factory=list,
+        description="Delta mode: ids to delete from the session before applying memories.",
+    )
 
 
 class SessionRestoreResponse(BaseModel):
     session_id: str
     restored: int
-    mode: Literal["replace", "append"]
+    mode: Literal["replace", "append", "delta"]
+    deleted: int = 0
+    unchanged: int = Field(
+        0, description="Delta mode: restored memories whose content matched and kept their vectors."
+    )
+
+
+class SessionCopyRequest(BaseModel):
+    target_session_id: str = Field(
+        ...,
+        min_length=1,
+        max_length=settings.API_SESSION_ID_MAX_CHARS,
+        description="Session that receives the copied or moved memories.",
+    )
+
+
+class SessionCopyResponse(BaseModel):
+    source_session_id: str
+    target_session_id: str
+    processed: int
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    state: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    params: Dict[str, Any]
+    done: int = Field(..., description="Units processed so far (memories, for session jobs).")
+    total: Optional[int] = None
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class JobListResponse(BaseModel):
+    items: List[JobResponse]
+
+
+class KnownMemory(BaseModel):
+    id: str
+    content_hash: str
+    updated_at: Optional[str] = None
+
+
+class DeltaSyncRequest(BaseModel):
+    since: Optional[str] = Field(
+        None, description="Watermark from a previous delta; ignored when `known` is given."
+    )
+    known: List[KnownMemory] = Field(
+        default_factory=list, description="The (id, content_hash, updated_at) tuples held."
+    )
+
+
+class DeltaMemory(MemoryResponse):
+    content_hash: str
+
+
+class DeltaSyncResponse(BaseModel):
+    session_id: str
+    watermark: str = Field(..., description="Pass back as `since` on the next delta.")
+    reset: bool = Field(
+        ...,
+        description=(
+            "True when `memories` is the whole session (no watermark, or one older than the "
+            "tombstone window); drop anything not listed."
+        ),
+    )
+    memories: List[DeltaMemory]
+    deleted: List[str]
 
 
 class SessionSummary(BaseModel):
@@ -144,3 +243,165 @@ class StatsOverviewResponse(BaseModel):
     total_sessions: int
     recent_writes_24h: int
     top_tags: List[TagSummary]
+
+
+class RetentionReportResponse(BaseModel):
+    policy_active: bool
+    candidates: int
+    by_reason: Dict[str, int]
+    sample_ids: List[str]
+
+
+class RetentionMetricsResponse(BaseModel):
+    enabled: bool
+    running: bool
+    runs: int
+    deleted_total: int
+    seconds_total: float
+    last_run_at: Optional[str] = None
+    last_run_deleted: int
+    last_run_seconds: float
+    last_error: Optional[str] = None
+    deleted_by_reason: Dict[str, int]
+
+
+class RetentionRunResponse(BaseModel):
+    deleted: int
+    seconds: float
+
+
+class ReindexStatusResponse(BaseModel):
+    state: Literal["idle", "running", "succeeded", "failed"]
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    source: Dict[str, str]
+    target: Dict[str, str]
+    params: Dict[str, Any]
+    total: int
+    copied: int
+    caught_up: int
+    error: Optional[str] = None
+
+
+class EmbeddingMigrationRequest(BaseModel):
+    provider: str = Field(..., min_length=1, description="hash | ngram | local | server")
+    model_name: Optional[str] = Field(None, description="Model for the local provider.")
+
+
+class EmbeddingMigrationStatusResponse(BaseModel):
+    state: Literal["idle", "copying", "ready", "switching", "switched"]
+    provider: Optional[str] = None
+    model_name: Optional[str] = None
+    model_id: Optional[str] = None
+    source: Dict[str, str] = {}
+    target: Dict[str, str] = {}
+    offset: int = 0
+    copied: int = 0
+    total: int = 0
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class EmbeddingModelReportResponse(BaseModel):
+    configured: str
+    active: Optional[str] = None
+    counts: Dict[str, int]
+    mixed: bool
+
+
+class IndexReportResponse(BaseModel):
+    collection: str
+    count: int
+    space: str
+    params: Dict[str, Any]
+    configured: Dict[str, Any]
+    sample_size: int
+    k: int
+    recall_at_k: Optional[float] = None
+    latency_ms_p50: Optional[float] = None
+    latency_ms_p95: Optional[float] = None
+    exact_latency_ms_mean: Optional[float] = None
+
+
+class PolicyTurn(BaseModel):
+    user_input: str = ""
+    model_output: str = ""
+    always_save: bool = False
+    explicit_memory_command: bool = False
+
+
+class PolicyEvaluateRequest(BaseModel):
+    turns: List[PolicyTurn] = Field(..., min_length=1, max_length=settings.POLICY_MAX_BATCH)
+
+
+class PolicyDecisionResponse(BaseModel):
+    save: bool
+    save_reason: str = Field(
+        ...,
+        description="always_save, explicit_command, trigger:<name>, or none.",
+    )
+    confidence_low: bool
+    confidence_reason: str
+
+
+class PolicyEvaluateResponse(BaseModel):
+    results: List[PolicyDecisionResponse]
+
+
+class TurnRequest(BaseModel):
+    session_id: str = Field(
+        ...,
+        min_length=1,
+        max_length=settings.API_SESSION_ID_MAX_CHARS,
+    )
+    prompt: str = Field(
+        ...,
+        min_length=1,
+        max_length=settings.API_CONTENT_MAX_CHARS,
+        description="The new user prompt to retrieve for.",
+    )
+    previous_input: str = Field("", description="User input of the turn that just finished.")
+    previous_output: str = Field(
+        "",
+        max_length=settings.API_CONTENT_MAX_CHARS,
+        description="Model output of the turn that just finished; saved if the policy fires.",
+    )
+    always_save: bool = False
+    explicit_memory_command: bool = False
+    memory_name: Optional[str] = Field(None, max_length=settings.API_NAME_MAX_CHARS)
+    memory_tags: List[str] = Field(default_factory=list, max_length=settings.API_TAG_MAX_COUNT)
+    memory_external_id: Optional[str] = Field(
+        None,
+        description="Stable id for the saved memory, so repeated turns update one block.",
+    )
+    top_k: int = Field(default=5, gt=0, le=100)
+    candidate_k: int = Field(default=20, gt=0, le=500)
+    recency_weight: float = Field(default=0.25, ge=0.0, le=1.0)
+    similarity_weight: float = Field(default=0.75, ge=0.0, le=1.0)
+
+    @field_validator("memory_tags")
+    @classmethod
+    def validate_memory_tags(cls, value: List[str]) -> List[str]:
+        return _clean_tags(value)
+
+
+class TurnResponse(BaseModel):
+    session_id: str
+    saved: bool
+    save_reason: str
+    confidence_low: bool
+    confidence_reason: str
+    memory: Optional[MemoryResponse] = None
+    results: List[MemoryResponse]
+
+
+class AdmissionStatusResponse(BaseModel):
+    enabled: bool
+    max_concurrent: int
+    bulk_max_concurrent: int
+    in_flight: int
+    queued: int
+    service_ms_ewma: float
+    admitted_total: int
+    shed_total: Dict[str, int]
@@ -0,0 +1,127 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, Query
+
+from app.core.admission import AdmissionController, admit, get_admission_controller
+from app.core.auth import require_api_key
+from app.core.config import settings
+from app.models.schemas import (
+    AdmissionStatusResponse,
+    EmbeddingMigrationRequest,
+    EmbeddingMigrationStatusResponse,
+    EmbeddingModelReportResponse,
+    IndexReportResponse,
+    ReindexStatusResponse,
+    RetentionMetricsResponse,
+    RetentionReportResponse,
+    RetentionRunResponse,
+)
+from app.services.embedding_migration import (
+    EmbeddingMigration,
+    embedding_model_report,
+    get_embedding_migration,
+)
+from app.services.reindex import ReindexJob, get_reindex_job, index_report
+from app.services.retention import RetentionWorker, get_retention_worker
+
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+
+@router.get(
+    "/retention/report",
+    response_model=RetentionReportResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def retention_report(
+    sample_limit: int = Query(default=20, ge=0, le=500),
+    worker: RetentionWorker = Depends(get_retention_worker),
+):
+    return worker.report(sample_limit=sample_limit)
+
+
+@router.get("/retention/metrics", response_model=RetentionMetricsResponse)
+def retention_metrics(worker: RetentionWorker = Depends(get_retention_worker)):
+    return RetentionMetricsResponse(
+        enabled=settings.RETENTION_ENABLED,
+        running=worker.running,
+        **asdict(worker.metrics),
+    )
+
+
+@router.post(
+    "/retention/run",
+    response_model=RetentionRunResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def retention_run(worker: RetentionWorker = Depends(get_retention_worker)):
+    deleted = worker.run_once()
+    return RetentionRunResponse(deleted=deleted, seconds=worker.metrics.last_run_seconds)
+
+
+@router.get("/admission", response_model=AdmissionStatusResponse)
+def admission_status(controller: AdmissionController = Depends(get_admission_controller)):
+    return controller.snapshot()
+
+
+@router.post(
+    "/reindex",
+    status_code=202,
+    response_model=ReindexStatusResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def reindex_start(job: ReindexJob = Depends(get_reindex_job)):
+    return asdict(job.start())
+
+
+@router.get("/reindex", response_model=ReindexStatusResponse)
+def reindex_status(job: ReindexJob = Depends(get_reindex_job)):
+    return asdict(job.status)
+
+
+@router.get(
+    "/index/report",
+    response_model=IndexReportResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def index_recall_report(
+    sample_size: int = Query(default=50, ge=1, le=1000),
+    k: int = Query(default=10, ge=1, le=100),
+):
+    return index_report(sample_size=sample_size, k=k)
+
+
+@router.post(
+    "/embedding-migration",
+    status_code=202,
+    response_model=EmbeddingMigrationStatusResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def embedding_migration_start(
+    request: EmbeddingMigrationRequest,
+    migration: EmbeddingMigration = Depends(get_embedding_migration),
+):
+    return migration.start(request.provider, request.model_name)
+
+
+@router.get("/embedding-migration", response_model=EmbeddingMigrationStatusResponse)
+def embedding_migration_status(migration: EmbeddingMigration = Depends(get_embedding_migration)):
+    return migration.state
+
+
+@router.post(
+    "/embedding-migration/switch",
+    status_code=202,
+    response_model=EmbeddingMigrationStatusResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def embedding_migration_switch(migration: EmbeddingMigration = Depends(get_embedding_migration)):
+    return migration.switch()
+
+
+@router.get(
+    "/embedding-models",
+    response_model=EmbeddingModelReportResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def embedding_models():
+    return embedding_model_report()
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
+from app.core.admission import admit
 from app.core.auth import require_api_key
+from app.core.versions import current_etag, etag_headers, if_none_match, not_modified
 from app.models.schemas import SessionsResponse, StatsOverviewResponse, TagsResponse
 from app.services.memory_service import MemoryService
 
@@ -11,7 +13,11 @@ def get_memory_service() -> MemoryService:
     return MemoryService()
 
 
-@router.get("/stats/overview", response_model=StatsOverviewResponse)
+@router.get(
+    "/stats/overview",
+    response_model=StatsOverviewResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
 def get_stats_overview(
     top_tags_limit: int = Query(default=5, ge=1, le=20),
     service: MemoryService = Depends(get_memory_service),
@@ -19,21 +25,33 @@ def get_stats_overview(
     return service.stats_overview(top_tags_limit=top_tags_limit)
 
 
-@router.get("/sessions", response_model=SessionsResponse)
+@router.get("/sessions", response_model=SessionsResponse, dependencies=[Depends(admit("bulk"))])
 def list_sessions(
+    request: Request,
+    response: Response,
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     service: MemoryService = Depends(get_memory_service),
 ):
+    etag = current_etag(request)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
     items, total = service.list_sessions(limit=limit, offset=offset)
     return SessionsResponse(items=items, limit=limit, offset=offset, total=total)
 
 
-@router.get("/tags", response_model=TagsResponse)
+@router.get("/tags", response_model=TagsResponse, dependencies=[Depends(admit("bulk"))])
 def list_tags(
+    request: Request,
+    response: Response,
     limit: int = Query(default=20, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
     service: MemoryService = Depends(get_memory_service),
 ):
+    etag = current_etag(request)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
     items, total = service.list_tags(limit=limit, offset=offset)
     return TagsResponse(items=items, limit=limit, offset=offset, total=total)
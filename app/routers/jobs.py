@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse, ORJSONResponse
+
+from app.core.auth import require_api_key
+from app.models.schemas import JobListResponse, JobResponse
+from app.services.jobs import JobManager, get_job_manager
+
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+
+@router.get("", response_model=JobListResponse)
+def list_jobs(
+    state: Optional[str] = Query(default=None),
+    kind: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return {"items": jobs.store.list(state=state, kind=kind, limit=limit)}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    return jobs.get(job_id)
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    path = jobs.result_file(job_id)
+    if path is not None:
+        # Streamed from disk in chunks; large snapshots are never loaded whole.
+        return FileResponse(path, media_type="application/json")
+    return ORJSONResponse(jobs.result(job_id))
+
+
+@router.post("/{job_id}/cancel", status_code=202, response_model=JobResponse)
+def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    return jobs.cancel(job_id)
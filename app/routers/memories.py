@@ -1,100 +1,295 @@
+from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
+from app.core.admission import AdmissionSlot, admit
 from app.core.auth import require_api_key
+from app.core.compression import DecompressingRoute
 from app.core.config import settings
+from app.core.errors import ValidationError
+from app.core.serialization import MemoryProjection, memory_projection, stream_snapshot_json
+from app.core.versions import current_etag, etag_headers, if_none_match, not_modified
 from app.models.schemas import (
     BulkDeleteRequest,
+    DeltaSyncRequest,
+    DeltaSyncResponse,
     HybridMemoryQuery,
+    JobResponse,
     MemoryCreate,
     MemoryQuery,
     MemoryQueryResponse,
     MemoryResponse,
     MemoryUpsert,
     PaginatedMemoriesResponse,
+    SessionCopyRequest,
+    SessionCopyResponse,
     SessionRestoreRequest,
     SessionRestoreResponse,
     SessionSnapshotResponse,
 )
+from app.services.jobs import JobManager, get_job_manager
 from app.services.memory_service import MemoryService
 
-router = APIRouter(dependencies=[Depends(require_api_key)])
+router = APIRouter(dependencies=[Depends(require_api_key)], route_class=DecompressingRoute)
 
 
 def get_memory_service() -> MemoryService:
     return MemoryService()
 
 
-@router.post("/", response_model=MemoryResponse, status_code=201)
+def run_async(
+    value: bool = Query(
+        default=False,
+        alias="async",
+        description="Run as a background job: 202 with the job; poll GET /jobs/{id}.",
+    ),
+) -> bool:
+    return value
+
+
+def _accepted(job: dict) -> ORJSONResponse:
+    return ORJSONResponse(job, status_code=202)
+
+
+@router.post(
+    "/",
+    response_model=MemoryResponse,
+    status_code=201,
+    dependencies=[Depends(admit("write"))],
+)
 def add_memory(memory: MemoryCreate, service: MemoryService = Depends(get_memory_service)):
     return service.add_memory(memory)
 
 
-@router.post("/upsert", response_model=MemoryResponse, status_code=200)
+@router.post(
+    "/upsert",
+    response_model=MemoryResponse,
+    status_code=200,
+    dependencies=[Depends(admit("write"))],
+)
 def upsert_memory(memory: MemoryUpsert, service: MemoryService = Depends(get_memory_service)):
     return service.upsert_memory(memory)
 
 
-@router.post("/query", response_model=MemoryQueryResponse)
-def query_memories(query: MemoryQuery, service: MemoryService = Depends(get_memory_service)):
-    results = service.query_memories(query)
-    return MemoryQueryResponse(results=results)
+@router.post("/query", response_model=MemoryQueryResponse, dependencies=[Depends(admit("query"))])
+def query_memories(
+    query: MemoryQuery,
+    projection: MemoryProjection = Depends(memory_projection),
+    service: MemoryService = Depends(get_memory_service),
+):
+    rows = service.query_memory_rows(query)
+    return ORJSONResponse({"results": projection.apply(rows)})
 
 
-@router.post("/query-hybrid", response_model=MemoryQueryResponse)
+@router.post(
+    "/query-hybrid",
+    response_model=MemoryQueryResponse,
+    dependencies=[Depends(admit("query"))],
+)
 def query_memories_hybrid(
     query: HybridMemoryQuery,
+    projection: MemoryProjection = Depends(memory_projection),
     service: MemoryService = Depends(get_memory_service),
 ):
-    results = service.query_memories_hybrid(query)
-    return MemoryQueryResponse(results=results)
+    rows = service.query_hybrid_rows(query)
+    return ORJSONResponse({"results": projection.apply(rows)})
 
 
-@router.get("/", response_model=PaginatedMemoriesResponse)
+@router.get("/", response_model=PaginatedMemoriesResponse, dependencies=[Depends(admit("bulk"))])
 def list_memories(
+    request: Request,
     session_id: Optional[str] = None,
     limit: int = Query(default=settings.API_DEFAULT_PAGE_SIZE, ge=1, le=settings.API_MAX_PAGE_SIZE),
     offset: int = Query(default=0, ge=0),
+    projection: MemoryProjection = Depends(memory_projection),
     service: MemoryService = Depends(get_memory_service),
 ):
-    items = service.list_memories(session_id=session_id, limit=limit, offset=offset)
+    etag = current_etag(request, session_id)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    rows = service.list_memory_rows(session_id=session_id, limit=limit, offset=offset)
     total = service.count_memories(session_id=session_id)
-    return PaginatedMemoriesResponse(items=items, limit=limit, offset=offset, total=total)
+    return ORJSONResponse(
+        {"items": projection.apply(rows), "limit": limit, "offset": offset, "total": total},
+        headers=etag_headers(etag),
+    )
 
 
-@router.delete("/bulk", status_code=200)
+@router.delete("/bulk", status_code=200, dependencies=[Depends(admit("bulk"))])
 def delete_bulk(request: BulkDeleteRequest, service: MemoryService = Depends(get_memory_service)):
     service.delete_bulk(request.ids)
     return {"message": f"Deleted {len(request.ids)} blocks."}
 
 
-@router.delete("/session/{session_id}", status_code=200)
-def delete_session(session_id: str, service: MemoryService = Depends(get_memory_service)):
+@router.delete(
+    "/session/{session_id}",
+    status_code=200,
+    responses={202: {"model": JobResponse}},
+    dependencies=[Depends(admit("write"))],
+)
+def delete_session(
+    session_id: str,
+    background: bool = Depends(run_async),
+    service: MemoryService = Depends(get_memory_service),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    if background:
+        return _accepted(
+            jobs.submit(
+                "delete_session",
+                {"session_id": session_id},
+                total=service.count_memories(session_id),
+                resources=[f"session:{session_id}"],
+            )
+        )
     service.delete_session(session_id)
     return {"message": f"Deleted all blocks for session {session_id}."}
 
 
-@router.get("/session/{session_id}/snapshot", response_model=SessionSnapshotResponse)
+@router.get(
+    "/session/{session_id}/snapshot",
+    response_model=SessionSnapshotResponse,
+    responses={202: {"model": JobResponse}},
+)
 def snapshot_session(
+    request: Request,
     session_id: str,
     limit: int = Query(default=1000, ge=1, le=10000),
+    slot: AdmissionSlot = Depends(admit("bulk")),
+    background: bool = Depends(run_async),
+    projection: MemoryProjection = Depends(memory_projection),
     service: MemoryService = Depends(get_memory_service),
+    jobs: JobManager = Depends(get_job_manager),
 ):
-    return service.snapshot_session(session_id=session_id, limit=limit)
+    if background:
+        # The snapshot is the job's result: GET /jobs/{id}/result.
+        total = min(limit, service.count_memories(session_id))
+        return _accepted(
+            jobs.submit("snapshot", {"session_id": session_id, "limit": limit}, total=total)
+        )
+    etag = current_etag(request, session_id)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    header = {"session_id": session_id, "exported_at": datetime.now(timezone.utc).isoformat()}
+    pages = service.iter_snapshot_pages(session_id=session_id, limit=limit)
+    # The body streams after this returns; the bulk slot is held until it has been sent.
+    return slot.hold_until_sent(
+        StreamingResponse(
+            stream_snapshot_json(header, pages, projection),
+            media_type="application/json",
+            headers=etag_headers(etag),
+        )
+    )
 
 
-@router.post("/session/{session_id}/restore", response_model=SessionRestoreResponse)
+@router.post(
+    "/session/{session_id}/restore",
+    response_model=SessionRestoreResponse,
+    responses={202: {"model": JobResponse}},
+    dependencies=[Depends(admit("bulk"))],
+)
 def restore_session(
     session_id: str,
     request: SessionRestoreRequest,
+    background: bool = Depends(run_async),
     service: MemoryService = Depends(get_memory_service),
+    jobs: JobManager = Depends(get_job_manager),
 ):
+    if background:
+        return _accepted(
+            jobs.submit(
+                "restore",
+                {"session_id": session_id, "mode": request.mode, "count": len(request.memories)},
+                total=len(request.memories),
+                resources=[f"session:{session_id}"],
+                payload=request.model_dump(),
+            )
+        )
+    if request.mode == "delta":
+        counts = service.restore_delta(session_id=session_id, request=request)
+        return SessionRestoreResponse(session_id=session_id, mode=request.mode, **counts)
     restored = service.restore_session(session_id=session_id, request=request)
     return SessionRestoreResponse(session_id=session_id, restored=restored, mode=request.mode)
 
 
-@router.delete("/{block_id}", status_code=200)
+def _copy_session(
+    kind: str,
+    session_id: str,
+    request: SessionCopyRequest,
+    background: bool,
+    service: MemoryService,
+    jobs: JobManager,
+):
+    target = request.target_session_id
+    if target == session_id:
+        raise ValidationError("target_session_id must differ from the source session")
+    total = service.count_memories(session_id)
+    # Large sessions always become jobs so the request cannot time out.
+    if background or total > settings.SESSION_COPY_INLINE_MAX:
+        return _accepted(
+            jobs.submit(
+                f"{kind}_session",
+                {"session_id": session_id, "target_session_id": target},
+                total=total,
+                resources=[f"session:{session_id}", f"session:{target}"],
+            )
+        )
+    method = service.fork_session if kind == "fork" else service.move_session
+    processed = method(session_id, target, batch_size=settings.SESSION_COPY_BATCH_SIZE)
+    return SessionCopyResponse(
+        source_session_id=session_id, target_session_id=target, processed=processed
+    )
+
+
+@router.post(
+    "/session/{session_id}/fork",
+    response_model=SessionCopyResponse,
+    responses={202: {"model": JobResponse}},
+    dependencies=[Depends(admit("bulk"))],
+)
+def fork_session(
+    session_id: str,
+    request: SessionCopyRequest,
+    background: bool = Depends(run_async),
+    service: MemoryService = Depends(get_memory_service),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return _copy_session("fork", session_id, request, background, service, jobs)
+
+
+@router.post(
+    "/session/{session_id}/move",
+    response_model=SessionCopyResponse,
+    responses={202: {"model": JobResponse}},
+    dependencies=[Depends(admit("bulk"))],
+)
+def move_session(
+    session_id: str,
+    request: SessionCopyRequest,
+    background: bool = Depends(run_async),
+    service: MemoryService = Depends(get_memory_service),
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return _copy_session("move", session_id, request, background, service, jobs)
+
+
+@router.post(
+    "/session/{session_id}/delta",
+    response_model=DeltaSyncResponse,
+    dependencies=[Depends(admit("bulk"))],
+)
+def session_delta(
+    session_id: str,
+    request: DeltaSyncRequest,
+    service: MemoryService = Depends(get_memory_service),
+):
+    delta = service.session_delta(session_id=session_id, since=request.since, known=request.known)
+    return ORJSONResponse(delta)
+
+
+@router.delete("/{block_id}", status_code=200, dependencies=[Depends(admit("write"))])
 def delete_memory(block_id: str, service: MemoryService = Depends(get_memory_service)):
     service.delete_memory(block_id)
     return {"message": f"Deleted block {block_id}."}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from app.core.admission import admit
+from app.core.auth import require_api_key
+from app.models.schemas import PolicyEvaluateRequest, PolicyEvaluateResponse
+from app.services.automation_policy import PolicyEngine, get_policy_engine
+
+router = APIRouter(dependencies=[Depends(require_api_key)])
+
+
+@router.post(
+    "/evaluate",
+    response_model=PolicyEvaluateResponse,
+    dependencies=[Depends(admit("query"))],
+)
+def evaluate_policy(
+    request: PolicyEvaluateRequest,
+    engine: PolicyEngine = Depends(get_policy_engine),
+):
+    decisions = engine.evaluate_batch(turn.model_dump() for turn in request.turns)
+    return {"results": [decision.as_dict() for decision in decisions]}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+
+from app.core.admission import admit
+from app.core.auth import require_api_key
+from app.core.compression import DecompressingRoute
+from app.core.serialization import MemoryProjection, memory_projection
+from app.models.schemas import TurnRequest, TurnResponse
+from app.services.automation_policy import get_policy_engine
+from app.services.memory_service import MemoryService
+from app.services.turn_service import TurnService
+
+router = APIRouter(dependencies=[Depends(require_api_key)], route_class=DecompressingRoute)
+
+
+def get_turn_service() -> TurnService:
+    return TurnService(MemoryService(), get_policy_engine())
+
+
+@router.post("/turns", response_model=TurnResponse, dependencies=[Depends(admit("query"))])
+def run_turn(
+    request: TurnRequest,
+    projection: MemoryProjection = Depends(memory_projection),
+    service: TurnService = Depends(get_turn_service),
+):
+    result = service.run(request)
+    memory = result["memory"]
+    if memory is not None:
+        result["memory"] = memory.model_dump(mode="json")
+    result["results"] = projection.apply(result["results"])
+    return ORJSONResponse(result)
@@ -1,19 +1,169 @@
 import re
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
 
+from app.core.config import settings
+
+DEFAULT_LOW_CONFIDENCE_PATTERNS = [
+    r"i\s+am\s+not\s+sure",
+    r"i\s+think",
+    r"maybe",
+    r"might",
+    r"uncertain",
+    r"not\s+confident",
+]
+
+DEFAULT_SAVE_TRIGGERS = ["decision", "preference", "todo", "policy"]
+
+# Kept for callers that imported the per-pattern lists; the engine below does not use them.
 LOW_CONFIDENCE_PATTERNS = [
     re.compile(r"\b(i\s+am\s+not\s+sure|i\s+think|maybe|might|uncertain)\b", re.IGNORECASE),
     re.compile(r"\bnot\s+confident\b", re.IGNORECASE),
 ]
 
 SAVE_TRIGGER_PATTERNS = [
-    re.compile(r"\bdecision\b", re.IGNORECASE),
-    re.compile(r"\bpreference\b", re.IGNORECASE),
-    re.compile(r"\btodo\b", re.IGNORECASE),
-    re.compile(r"\bpolicy\b", re.IGNORECASE),
+    re.compile(rf"\b{trigger}\b", re.IGNORECASE) for trigger in DEFAULT_SAVE_TRIGGERS
 ]
 
 
+def _compile_alternation(patterns: Sequence[str]) -> Optional["re.Pattern[str]"]:
+    """Compile word-bounded patterns into one regex; group ``pN`` names the Nth pattern."""
+    if not patterns:
+        return None
+    branches = "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(patterns))
+    return re.compile(rf"\b(?:{branches})\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class PolicyDecision:
+    save: bool
+    save_reason: str
+    confidence_low: bool
+    confidence_reason: str
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "save": self.save,
+            "save_reason": self.save_reason,
+            "confidence_low": self.confidence_low,
+            "confidence_reason": self.confidence_reason,
+        }
+
+
+class PolicyEngine:
+    """Save and low-confidence rules compiled into one regex scan each.
+
+    ``save_triggers`` and ``low_confidence_patterns`` are regex fragments
+    (plain words work as-is); each set is joined into a single word-bounded
+    alternation so a turn is scanned once per rule set, however many triggers
+    are configured.
+    """
+
+    def __init__(
+        self,
+        save_triggers: Sequence[str] = tuple(DEFAULT_SAVE_TRIGGERS),
+        low_confidence_patterns: Sequence[str] = tuple(DEFAULT_LOW_CONFIDENCE_PATTERNS),
+        min_words: int = 8,
+    ):
+        self.save_triggers = list(save_triggers)
+        self.low_confidence_patterns = list(low_confidence_patterns)
+        self.min_words = min_words
+        self._save_re = _compile_alternation(self.save_triggers)
+        self._low_re = _compile_alternation(self.low_confidence_patterns)
+
+    @classmethod
+    def from_settings(cls) -> "PolicyEngine":
+        return cls(
+            save_triggers=settings.POLICY_SAVE_TRIGGERS,
+            low_confidence_patterns=settings.POLICY_LOW_CONFIDENCE_PATTERNS,
+            min_words=settings.POLICY_MIN_WORDS,
+        )
+
+    def save_trigger(self, user_input: str, model_output: str) -> Optional[str]:
+        """The configured trigger that fires for this turn, or None."""
+        if self._save_re is None:
+            return None
+        text = f"{user_input}\n{model_output}".strip()
+        if not text:
+            return None
+        match = self._save_re.search(text)
+        if match is None:
+            return None
+        return self.save_triggers[int(match.lastgroup[1:])]
+
+    def should_save(
+        self,
+        user_input: str,
+        model_output: str,
+        always_save: bool = False,
+        explicit_memory_command: bool = False,
+    ) -> bool:
+        if always_save or explicit_memory_command:
+            return True
+        return self.save_trigger(user_input, model_output) is not None
+
+    def confidence(self, model_output: str) -> Dict[str, object]:
+        output = (model_output or "").strip()
+        if not output:
+            return {"confidence_low": True, "reason": "empty_response"}
+        if self._low_re is not None and self._low_re.search(output):
+            return {"confidence_low": True, "reason": "uncertainty_language"}
+        # Only need to know whether there are at least ``min_words`` words.
+        if len(output.split(maxsplit=self.min_words)) < self.min_words:
+            return {"confidence_low": True, "reason": "too_short"}
+        return {"confidence_low": False, "reason": "none"}
+
+    def evaluate(
+        self,
+        user_input: str,
+        model_output: str,
+        always_save: bool = False,
+        explicit_memory_command: bool = False,
+    ) -> PolicyDecision:
+        if always_save:
+            save_reason = "always_save"
+        elif explicit_memory_command:
+            save_reason = "explicit_command"
+        else:
+            trigger = self.save_trigger(user_input, model_output)
+            save_reason = f"trigger:{trigger}" if trigger is not None else "none"
+        confidence = self.confidence(model_output)
+        return PolicyDecision(
+            save=save_reason != "none",
+            save_reason=save_reason,
+            confidence_low=bool(confidence["confidence_low"]),
+            confidence_reason=str(confidence["reason"]),
+        )
+
+    def evaluate_batch(self, turns: Iterable[dict]) -> List[PolicyDecision]:
+        return [
+            self.evaluate(
+                turn.get("user_input") or "",
+                turn.get("model_output") or "",
+                always_save=bool(turn.get("always_save")),
+                explicit_memory_command=bool(turn.get("explicit_memory_command")),
+            )
+            for turn in turns
+        ]
+
+
+policy_engine: Optional[PolicyEngine] = None
+
+
+def reset_policy_engine() -> None:
+    global policy_engine
+    policy_engine = None
+
+
+def get_policy_engine() -> PolicyEngine:
+    global policy_engine
+    if policy_engine is not None:
+        return policy_engine
+
+    policy_engine = PolicyEngine.from_settings()
+    return policy_engine
+
+
 def derive_session_id(
     channel: str,
     chat_or_thread: Optional[str],
@@ -34,26 +184,13 @@ def should_save_memory(
     always_save: bool = False,
     explicit_memory_command: bool = False,
 ) -> bool:
-    if always_save or explicit_memory_command:
-        return True
-
-    text = f"{user_input}\n{model_output}".strip()
-    if not text:
-        return False
-
-    return any(pattern.search(text) for pattern in SAVE_TRIGGER_PATTERNS)
+    return get_policy_engine().should_save(
+        user_input,
+        model_output,
+        always_save=always_save,
+        explicit_memory_command=explicit_memory_command,
+    )
 
 
 def build_confidence_signal(model_output: str) -> Dict[str, object]:
-    output = (model_output or "").strip()
-    if not output:
-        return {"confidence_low": True, "reason": "empty_response"}
-
-    for pattern in LOW_CONFIDENCE_PATTERNS:
-        if pattern.search(output):
-            return {"confidence_low": True, "reason": "uncertainty_language"}
-
-    if len(output.split()) < 8:
-        return {"confidence_low": True, "reason": "too_short"}
-
-    return {"confidence_low": False, "reason": "none"}
+    return get_policy_engine().confidence(model_output)
@@ -0,0 +1,217 @@
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.database import get_chunk_collection
+
+# Whether the chunk collection last looked at holds any chunks, so queries skip the
+# ``count()`` round trip. Chunk writes in this process set it; with CHROMA_MODE=http other
+# workers write too, so a cached "empty" is re-checked there until chunks show up.
+_known_collection = None
+_known_has_chunks = False
+_known_lock = threading.Lock()
+
+
+@dataclass
+class EmbeddedDocument:
+    """A document's stored embedding, plus its chunk windows when it was split."""
+
+    embedding: List[float]
+    chunks: List[str] = field(default_factory=list)
+    chunk_embeddings: List[List[float]] = field(default_factory=list)
+
+
+def split_chunks(text: str) -> List[str]:
+    """Overlapping windows of ``CHUNK_SIZE_CHARS``; empty when the text fits in one.
+
+    Window ends are pulled back to the last whitespace in their final fifth so
+    words are not cut in half.
+    """
+    size = settings.CHUNK_SIZE_CHARS
+    if not settings.CHUNKING_ENABLED or size <= 0 or len(text) <= size:
+        return []
+    overlap = min(max(settings.CHUNK_OVERLAP_CHARS, 0), size // 2)
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + size * 4 // 5, end)
+            if cut > start:
+                end = cut
+        chunks.append(text[start:end])
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def embedding_inputs(text: str) -> List[str]:
+    return split_chunks(text) or [text]
+
+
+def assemble(text: str, vectors: Sequence[Sequence[float]]) -> EmbeddedDocument:
+    """Build an ``EmbeddedDocument`` from the vectors of ``embedding_inputs(text)``."""
+    if len(vectors) == 1:
+        return EmbeddedDocument(embedding=list(vectors[0]))
+    return EmbeddedDocument(
+        embedding=_mean_vector(vectors),
+        chunks=split_chunks(text),
+        chunk_embeddings=[list(vector) for vector in vectors],
+    )
+
+
+def embed_documents(embedder, texts: Sequence[str]) -> List[EmbeddedDocument]:
+    """Embed every text (all chunks of all texts) with one ``encode_batch`` call."""
+    inputs = [embedding_inputs(text) for text in texts]
+    flat = [chunk for chunks in inputs for chunk in chunks]
+    vectors = embedder.encode_batch(flat) if flat else []
+    documents: List[EmbeddedDocument] = []
+    offset = 0
+    for text, chunks in zip(texts, inputs):
+        documents.append(assemble(text, vectors[offset : offset + len(chunks)]))
+        offset += len(chunks)
+    return documents
+
+
+def _mean_vector(vectors: Sequence[Sequence[float]]) -> List[float]:
+    mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+    norm = math.sqrt(sum(value * value for value in mean))
+    return [value / norm for value in mean] if norm else mean
+
+
+def write_chunks(
+    documents: Iterable[Tuple[str, str, EmbeddedDocument]],
+    replace: bool = True,
+    collection=None,
+) -> None:
+    """Store chunk windows for ``(parent_id, session_id, document)`` triples.
+
+    With ``replace``, chunks previously stored for those parents are removed
+    first, so a memory that shrank below one window loses its stale chunks.
+    ``collection`` defaults to the active chunk collection.
+    """
+    documents = list(documents)
+    if not documents:
+        return
+    if collection is None:
+        collection = get_chunk_collection()
+    if replace:
+        delete_chunks(
+            parent_ids=[parent_id for parent_id, _, _ in documents], collection=collection
+        )
+    ids: List[str] = []
+    embeddings: List[List[float]] = []
+    metadatas: List[dict] = []
+    texts: List[str] = []
+    for parent_id, session_id, document in documents:
+        for index, (chunk, vector) in enumerate(zip(document.chunks, document.chunk_embeddings)):
+            ids.append(f"{parent_id}#{index}")
+            embeddings.append(vector)
+            metadatas.append(
+                {"parent_id": parent_id, "session_id": session_id, "chunk_index": index}
+            )
+            texts.append(chunk)
+    if ids:
+        collection.upsert(
+            ids=ids, embeddings=embeddings, metadatas=metadatas, documents=texts
+        )
+        _mark_has_chunks(collection)
+
+
+def delete_chunks(
+    parent_ids: Optional[List[str]] = None,
+    session_id: Optional[str] = None,
+    collection=None,
+) -> None:
+    if collection is None:
+        collection = get_chunk_collection()
+    if parent_ids:
+        collection.delete(where={"parent_id": {"$in": list(parent_ids)}})
+    if session_id is not None:
+        collection.delete(where={"session_id": session_id})
+
+
+def copy_chunks(parents: Dict[str, str], session_id: str) -> None:
+    """Copy the chunks of each ``source -> copy`` parent pair, stored vectors included."""
+    if not parents:
+        return
+    collection = get_chunk_collection()
+    page = collection.get(
+        where={"parent_id": {"$in": list(parents)}},
+        include=["embeddings", "metadatas", "documents"],
+    )
+    ids = page.get("ids") or []
+    delete_chunks(parent_ids=list(parents.values()), collection=collection)
+    if not ids:
+        return
+    metadatas = []
+    for meta in page["metadatas"]:
+        metadatas.append(
+            {**meta, "parent_id": parents[meta["parent_id"]], "session_id": session_id}
+        )
+    collection.upsert(
+        ids=[f"{meta['parent_id']}#{meta['chunk_index']}" for meta in metadatas],
+        embeddings=[list(map(float, vector)) for vector in page["embeddings"]],
+        metadatas=metadatas,
+        documents=page["documents"],
+    )
+    _mark_has_chunks(collection)
+
+
+def relabel_chunks(parent_ids: List[str], session_id: str) -> None:
+    """Move the chunks of ``parent_ids`` to ``session_id`` without touching their vectors."""
+    if not parent_ids:
+        return
+    collection = get_chunk_collection()
+    page = collection.get(where={"parent_id": {"$in": list(parent_ids)}}, include=["metadatas"])
+    ids = page.get("ids") or []
+    if ids:
+        collection.update(
+            ids=ids,
+            metadatas=[{**meta, "session_id": session_id} for meta in page["metadatas"]],
+        )
+
+
+def _mark_has_chunks(collection) -> None:
+    global _known_collection, _known_has_chunks
+    with _known_lock:
+        _known_collection, _known_has_chunks = collection, True
+
+
+def _has_chunks(collection) -> bool:
+    """Cached ``collection.count() > 0``; deletes leave it set, which only costs a query."""
+    global _known_collection, _known_has_chunks
+    with _known_lock:
+        if _known_collection is collection and (
+            _known_has_chunks or settings.CHROMA_MODE != "http"
+        ):
+            return _known_has_chunks
+        _known_collection, _known_has_chunks = collection, collection.count() > 0
+        return _known_has_chunks
+
+
+def query_chunks(
+    query_embedding: List[float],
+    n_results: int,
+    where: Optional[dict],
+) -> Dict[str, float]:
+    """Best chunk distance per parent id among the nearest ``n_results`` chunks."""
+    collection = get_chunk_collection()
+    if n_results <= 0 or not _has_chunks(collection):
+        return {}
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=n_results,
+        where=where,
+        include=["metadatas", "distances"],
+    )
+    best: Dict[str, float] = {}
+    if results and results.get("ids"):
+        for meta, distance in zip(results["metadatas"][0], results["distances"][0]):
+            parent_id = (meta or {}).get("parent_id")
+            if parent_id and (parent_id not in best or distance < best[parent_id]):
+                best[parent_id] = distance
+    return best
@@ -0,0 +1,86 @@
+"""Content hashes and delete tombstones for incremental session sync.
+
+Every stored memory carries a ``content_hash`` in its metadata. Deletes leave a
+tombstone ``(id, session_id, deleted_at)`` in the tombstone collection for
+``TOMBSTONE_RETENTION_SECONDS``, so a replica syncing from a ``since`` watermark
+learns about deletes without holding a list of ids. Expired tombstones are
+purged at most once a minute, on the next delete, and by the periodic
+compaction job.
+"""
+
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import TOMBSTONE_COLLECTION, Database
+
+_PURGE_INTERVAL_SECONDS = 60.0
+
+_tombstones: Optional[Tuple[Any, Any]] = None  # (client, collection)
+_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _collection():
+    # Reopened whenever the client changes (tests and reconnects reset it).
+    global _tombstones
+    client = Database.get_client()
+    with _lock:
+        if _tombstones is None or _tombstones[0] is not client:
+            _tombstones = (client, Database.open_physical(TOMBSTONE_COLLECTION))
+        return _tombstones[1]
+
+
+def tombstone_horizon() -> datetime:
+    """Deletes before this instant may have been forgotten."""
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.TOMBSTONE_RETENTION_SECONDS)
+
+
+def record_tombstones(deleted: Iterable[Tuple[str, str]]) -> None:
+    """Remember deleted ``(id, session_id)`` pairs."""
+    deleted = list(deleted)
+    if not deleted or settings.TOMBSTONE_RETENTION_SECONDS <= 0:
+        return
+    now = datetime.now(timezone.utc)
+    stamp = {"deleted_at": now.isoformat(), "deleted_ts": now.timestamp()}
+    collection = _collection()
+    collection.upsert(
+        ids=[item_id for item_id, _ in deleted],
+        # Chroma requires a vector per record; tombstones are never searched.
+        embeddings=[[0.0]] * len(deleted),
+        metadatas=[{"session_id": session_id, **stamp} for _, session_id in deleted],
+    )
+    if now.timestamp() - _last_purge >= _PURGE_INTERVAL_SECONDS:
+        purge_tombstones()
+
+
+def purge_tombstones() -> int:
+    """Forget tombstones older than the retention window; returns how many."""
+    global _last_purge
+    _last_purge = datetime.now(timezone.utc).timestamp()
+    collection = _collection()
+    where = {"deleted_ts": {"$lt": tombstone_horizon().timestamp()}}
+    expired = collection.get(where=where, include=[]).get("ids") or []
+    if expired:
+        collection.delete(ids=expired)
+    return len(expired)
+
+
+def deleted_since(session_id: str, since: datetime, page_size: int = 1000) -> List[str]:
+    collection = _collection()
+    where = {"$and": [{"session_id": session_id}, {"deleted_ts": {"$gte": since.timestamp()}}]}
+    ids: List[str] = []
+    offset = 0
+    while True:
+        page = collection.get(where=where, limit=page_size, offset=offset, include=[])
+        batch = page.get("ids") or []
+        ids.extend(batch)
+        if len(batch) < page_size:
+            return ids
+        offset += len(batch)
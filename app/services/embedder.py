@@ -1,25 +1,44 @@
 import hashlib
+import re
+import zlib
 from abc import ABC, abstractmethod
-from typing import List, Optional
-
-from sentence_transformers import SentenceTransformer
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy and sentence-transformers (which pulls in torch) are imported by the
+# embedders that use them, so hash-mode processes never pay for them.
+
 
 class BaseEmbedder(ABC):
+    # Stored with every vector as ``embedding_model``; set by ``build_embedder``.
+    model_id: str = "unknown"
+
     @abstractmethod
     def encode(self, text: str) -> List[float]:
         pass
 
+    def encode_batch(self, texts: List[str]) -> List[List[float]]:
+        return [self.encode(text) for text in texts]
+
 
 class LocalEmbedder(BaseEmbedder):
     def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
         self.model = SentenceTransformer(model_name)
 
     def encode(self, text: str) -> List[float]:
         return self.model.encode(text).tolist()
 
+    def encode_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self.model.encode(texts).tolist()
+
 
 class HashEmbedder(BaseEmbedder):
     """
@@ -39,6 +58,105 @@ class HashEmbedder(BaseEmbedder):
         return out
 
 
+class FeatureHashEmbedder(BaseEmbedder):
+    """
+    CPU-cheap lexical embedder: signed feature hashing of word unigrams, word
+    bigrams and character n-grams, L2-normalized. Texts sharing words, phrases
+    or word fragments get high cosine similarity, so it is usable as a retrieval
+    tier on nodes that cannot run a transformer model.
+    """
+
+    _WORD_RE = re.compile(r"\w+", re.UNICODE)
+    _PRIME = 0x100000001B3
+    _BIGRAM_SEED = 0x9E3779B97F4A7C15
+    _MIX_1 = 0xBF58476D1CE4E5B9
+    _MIX_2 = 0x94D049BB133111EB
+
+    def __init__(self, dim: int = 1024, char_ngram_range: Tuple[int, int] = (3, 5)):
+        self.dim = max(32, dim)
+        low, high = char_ngram_range
+        self.ngram_sizes = list(range(max(1, low), max(low, high) + 1))
+
+    @classmethod
+    def _mix(cls, h: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        # splitmix64 finalizer: spreads polynomial hashes over all 64 bits.
+        h = h ^ (h >> np.uint64(30))
+        h = h * np.uint64(cls._MIX_1)
+        h = h ^ (h >> np.uint64(27))
+        h = h * np.uint64(cls._MIX_2)
+        return h ^ (h >> np.uint64(31))
+
+    def _features(self, texts: List[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Feature hashes of the whole batch, and the row (text index) of each one."""
+        import numpy as np
+
+        lowered = [text.lower() for text in texts]
+        hashes: List["np.ndarray"] = []
+        rows: List["np.ndarray"] = []
+        prime = np.uint64(self._PRIME)
+
+        words = [self._WORD_RE.findall(text) for text in lowered]
+        word_rows = np.repeat(np.arange(len(texts)), [len(found) for found in words])
+        if word_rows.size:
+            word_hashes = np.fromiter(
+                (zlib.crc32(word.encode("utf-8")) for found in words for word in found),
+                dtype=np.uint64,
+                count=word_rows.size,
+            )
+            hashes.append(self._mix(word_hashes))
+            rows.append(word_rows)
+            # Bigrams pair each word with the next one in the same text.
+            same_text = word_rows[:-1] == word_rows[1:]
+            pairs = word_hashes[:-1] * prime + word_hashes[1:]
+            hashes.append(self._mix(pairs[same_text] ^ np.uint64(self._BIGRAM_SEED)))
+            rows.append(word_rows[:-1][same_text])
+
+        # Character n-grams are rolled over every text at once; windows that would
+        # span two texts are masked out.
+        normalized = [" " + " ".join(text.split()) + " " for text in lowered]
+        codes = np.frombuffer("".join(normalized).encode("utf-32-le"), dtype=np.uint32)
+        codes = codes.astype(np.uint64)
+        code_rows = np.repeat(np.arange(len(texts)), [len(text) for text in normalized])
+        for n in self.ngram_sizes:
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+            h = np.full(count, n, dtype=np.uint64)
+            for k in range(n):
+                h = h * prime + codes[k : k + count]
+            same_text = code_rows[:count] == code_rows[n - 1 :]
+            hashes.append(self._mix(h[same_text]))
+            rows.append(code_rows[:count][same_text])
+
+        if not hashes:
+            return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+        return np.concatenate(hashes), np.concatenate(rows)
+
+    def _matrix(self, texts: List[str]) -> "np.ndarray":
+        """One L2-normalized row per text, built with a single ``bincount`` over the batch."""
+        import numpy as np
+
+        hashes, rows = self._features(texts)
+        indices = rows * self.dim + (hashes % np.uint64(self.dim)).astype(np.int64)
+        signs = np.where((hashes >> np.uint64(63)) == 0, 1.0, -1.0)
+        matrix = np.bincount(indices, weights=signs, minlength=len(texts) * self.dim)
+        # bincount returns ints when there are no features at all.
+        matrix = matrix.astype(np.float64, copy=False).reshape(len(texts), self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def encode(self, text: str) -> List[float]:
+        return self._matrix([text])[0].tolist()
+
+    def encode_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._matrix(list(texts)).tolist()
+
+
 embedder: Optional[BaseEmbedder] = None
 
 
@@ -47,14 +165,52 @@ def reset_embedder() -> None:
     embedder = None
 
 
+def embedding_model_id(provider: str, model_name: Optional[str] = None) -> str:
+    """Identity of the vectors a provider produces, e.g. ``local:all-MiniLM-L6-v2``."""
+    provider = provider.strip().lower()
+    if provider == "hash":
+        return f"hash:{max(32, settings.HASH_EMBEDDING_DIM)}"
+    if provider == "ngram":
+        return (
+            f"ngram:{max(32, settings.NGRAM_EMBEDDING_DIM)}:"
+            f"{settings.NGRAM_CHAR_MIN}-{settings.NGRAM_CHAR_MAX}"
+        )
+    if provider == "server" and settings.EMBEDDING_SERVER_PROVIDER.strip().lower() != "server":
+        # The server encodes with its own provider; the fallback uses the same one.
+        return embedding_model_id(settings.EMBEDDING_SERVER_PROVIDER, model_name)
+    return f"local:{model_name or settings.EMBEDDING_MODEL_NAME}"
+
+
+def build_embedder(provider: str, model_name: Optional[str] = None) -> BaseEmbedder:
+    built = _build(provider.strip().lower(), model_name)
+    built.model_id = embedding_model_id(provider, model_name)
+    return built
+
+
+def _build(provider: str, model_name: Optional[str]) -> BaseEmbedder:
+    if provider == "hash":
+        return HashEmbedder(settings.HASH_EMBEDDING_DIM)
+    if provider == "ngram":
+        return FeatureHashEmbedder(
+            settings.NGRAM_EMBEDDING_DIM,
+            (settings.NGRAM_CHAR_MIN, settings.NGRAM_CHAR_MAX),
+        )
+    if provider == "server":
+        from app.services.embedding_server import RemoteEmbedder
+
+        return RemoteEmbedder(
+            socket_path=settings.EMBEDDING_SERVER_SOCKET,
+            timeout=settings.EMBEDDING_SERVER_TIMEOUT_SECONDS,
+            retry_after=settings.EMBEDDING_SERVER_RETRY_SECONDS,
+            fallback_factory=lambda: build_embedder(settings.EMBEDDING_SERVER_PROVIDER),
+        )
+    return LocalEmbedder(model_name or settings.EMBEDDING_MODEL_NAME)
+
+
 def get_embedder() -> BaseEmbedder:
     global embedder
     if embedder is not None:
         return embedder
 
-    provider = settings.EMBEDDING_PROVIDER.strip().lower()
-    if provider == "hash":
-        embedder = HashEmbedder(settings.HASH_EMBEDDING_DIM)
-    else:
-        embedder = LocalEmbedder(settings.EMBEDDING_MODEL_NAME)
+    embedder = build_embedder(settings.EMBEDDING_PROVIDER)
     return embedder
@@ -0,0 +1,365 @@
+"""Background re-embedding into shadow collections for an embedding-model change.
+
+``EmbeddingMigration.start`` streams every stored memory through the target model
+in batches of ``EMBEDDING_MIGRATION_BATCH_SIZE``, throttled to
+``EMBEDDING_MIGRATION_MAX_ROWS_PER_SECOND``, and writes the new vectors (chunk
+vectors included) into shadow collections. Reads stay on the active collections
+and model. Progress is checkpointed to ``CHROMA_DB_PATH/embedding_migration.json``
+after every batch, and startup resumes an unfinished copy from there.
+
+``switch`` brings the shadow up to date and swaps it in. Rows written since they
+were copied (including while the process was down) are found by comparing
+documents and metadata, so the copy itself does not need to track writes. Writes
+made during the comparison are tracked and replayed under the write lock, as in
+a reindex, before the catalog pointer and the process embedder are switched.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import app.services.embedder as embedder_module
+from app.core.config import settings
+from app.core.database import LOGICAL_COLLECTIONS, Database, get_db_collection
+from app.core.errors import ConflictError, ValidationError
+from app.services.chunking import delete_chunks, embed_documents, write_chunks
+from app.services.embedder import BaseEmbedder, build_embedder, embedding_model_id
+from app.services.reindex import ReindexJob, Rows, TrackingCollection, _rows, get_reindex_job
+
+logger = logging.getLogger(__name__)
+
+# Written per record by the migration itself; ignored when comparing copies.
+_DERIVED_KEYS = ("embedding_model", "chunk_count")
+_COMPARE_INCLUDE = ["metadatas", "documents"]
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _checkpoint_path() -> str:
+    return os.path.join(settings.CHROMA_DB_PATH, "embedding_migration.json")
+
+
+def migration_pending() -> bool:
+    """True while a migration has shadow collections that are not switched in yet."""
+    return os.path.exists(_checkpoint_path())
+
+
+def _comparable(meta: Optional[dict]) -> dict:
+    return {key: value for key, value in (meta or {}).items() if key not in _DERIVED_KEYS}
+
+
+def _refuse_http_mode() -> None:
+    # The switch swaps collections and embedder in this process only; other workers
+    # would keep embedding with the old model into the new collections.
+    if settings.CHROMA_MODE == "http":
+        raise ValidationError(
+            "Embedding migration is not available in http mode",
+            details="Other workers would keep embedding with the old model",
+        )
+
+
+class EmbeddingMigration(ReindexJob):
+    def __init__(
+        self,
+        batch_size: int = 256,
+        max_rows_per_second: float = 200.0,
+        embedder_factory=build_embedder,
+    ):
+        super().__init__(batch_size=batch_size)
+        self.max_rows_per_second = max_rows_per_second
+        self.embedder_factory = embedder_factory
+        self.state: Dict[str, Any] = {"state": "idle"}
+        self._target_embedder: Optional[BaseEmbedder] = None
+        self._stop = threading.Event()
+
+    def start(self, provider: str, model_name: Optional[str] = None) -> Dict[str, Any]:
+        if settings.CHROMA_MODE == "memory":
+            raise ValidationError("Embedding migration is not available in memory mode")
+        _refuse_http_mode()
+        if self.running:
+            raise ConflictError("An embedding migration step is already running")
+        if get_reindex_job().running:
+            raise ConflictError("A reindex is running")
+        model_id = embedding_model_id(provider, model_name)
+        saved = self._load_checkpoint()
+        if saved is not None and saved.get("model_id") != model_id:
+            raise ConflictError(
+                "Another embedding migration is pending",
+                details={"model_id": saved.get("model_id")},
+            )
+        if saved is None:
+            if model_id == embedder_module.get_embedder().model_id:
+                raise ValidationError("The store already uses this embedding model")
+            suffix = datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S%f")
+            saved = {
+                "state": "copying",
+                "provider": provider,
+                "model_name": model_name,
+                "model_id": model_id,
+                "source": Database.active_names(),
+                "target": {logical: f"{logical}_{suffix}" for logical in LOGICAL_COLLECTIONS},
+                "offset": 0,
+                "copied": 0,
+                "total": get_db_collection().count(),
+                "started_at": _utc_now(),
+                "error": None,
+            }
+        self.state = saved
+        self._spawn(self._copy if saved["state"] != "ready" else self._mark_ready)
+        return self.state
+
+    def resume(self) -> bool:
+        """Continue an unfinished copy after a restart; True when one was resumed."""
+        saved = self._load_checkpoint()
+        if saved is None or saved.get("state") == "ready" or self.running:
+            if saved is not None:
+                self.state = saved
+            return False
+        self.state = saved
+        self._spawn(self._copy)
+        return True
+
+    def switch(self) -> Dict[str, Any]:
+        _refuse_http_mode()
+        if self.running:
+            raise ConflictError("An embedding migration step is already running")
+        saved = self._load_checkpoint()
+        if saved is None or saved.get("state") != "ready":
+            raise ConflictError("No finished embedding migration to switch to")
+        self.state = {**saved, "state": "switching"}
+        self._spawn(self._switch)
+        return self.state
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.wait(timeout=30)
+
+    def _spawn(self, target) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=target, name="embedding-migration", daemon=True)
+        self._thread.start()
+
+    def _open(self) -> None:
+        self._sources = {
+            logical: Database.open_physical(name) for logical, name in self.state["source"].items()
+        }
+        self._targets = {
+            logical: Database.open_physical(name) for logical, name in self.state["target"].items()
+        }
+        if self._target_embedder is None:
+            self._target_embedder = self.embedder_factory(
+                self.state["provider"], self.state.get("model_name")
+            )
+
+    def _copy(self) -> None:
+        try:
+            self._open()
+            source = self._sources["memory_blocks"]
+            while not self._stop.is_set():
+                batch_started = time.monotonic()
+                page = source.get(
+                    limit=self.batch_size, offset=self.state["offset"], include=_COMPARE_INCLUDE
+                )
+                ids = page.get("ids") or []
+                if ids:
+                    self._put("memory_blocks", _rows(page))
+                self.state["offset"] += len(ids)
+                self.state["copied"] += len(ids)
+                if len(ids) < self.batch_size:
+                    self._mark_ready()
+                    return
+                self._save_checkpoint()
+                if self.max_rows_per_second > 0:
+                    pause = len(ids) / self.max_rows_per_second - (
+                        time.monotonic() - batch_started
+                    )
+                    if pause > 0:
+                        self._stop.wait(pause)
+            self._save_checkpoint()
+        except Exception as exc:
+            logger.exception("Embedding migration copy failed; it resumes from its checkpoint")
+            self.state["error"] = str(exc)
+            self._save_checkpoint()
+
+    def _mark_ready(self) -> None:
+        self.state["state"] = "ready"
+        self.state["error"] = None
+        self._save_checkpoint()
+
+    def _put(self, logical: str, rows: Rows) -> None:
+        """Re-embed block rows into the shadow; chunks are rebuilt from their parents."""
+        if logical != "memory_blocks" or not rows["ids"]:
+            return
+        documents = embed_documents(self._target_embedder, rows["documents"])
+        metadatas = []
+        for meta, document in zip(rows["metadatas"], documents):
+            metadatas.append(
+                {
+                    **(meta or {}),
+                    "chunk_count": len(document.chunks),
+                    "embedding_model": self.state["model_id"],
+                }
+            )
+        self._targets["memory_blocks"].upsert(
+            ids=rows["ids"],
+            embeddings=[document.embedding for document in documents],
+            metadatas=metadatas,
+            documents=rows["documents"],
+        )
+        write_chunks(
+            (
+                (item_id, str(meta.get("session_id", "default")), document)
+                for item_id, meta, document in zip(rows["ids"], metadatas, documents)
+            ),
+            collection=self._targets["memory_chunks"],
+        )
+
+    def _recopy(self, logical: str, ids: List[str]) -> None:
+        if logical != "memory_blocks":
+            return
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start : start + self.batch_size]
+            rows = _rows(self._sources[logical].get(ids=batch, include=_COMPARE_INCLUDE))
+            self._put(logical, rows)
+            gone = sorted(set(batch) - set(rows["ids"]))
+            if gone:
+                self._targets[logical].delete(ids=gone)
+                delete_chunks(parent_ids=gone, collection=self._targets["memory_chunks"])
+            self.status.caught_up += len(batch)
+
+    def _stale_ids(self) -> List[str]:
+        """Ids whose shadow copy is missing, outdated or no longer in the source."""
+        source, target = self._sources["memory_blocks"], self._targets["memory_blocks"]
+        stale: List[str] = []
+        seen = set()
+        offset = 0
+        while True:
+            page = source.get(limit=self.batch_size, offset=offset, include=_COMPARE_INCLUDE)
+            ids = page.get("ids") or []
+            if ids:
+                copies = target.get(ids=ids, include=_COMPARE_INCLUDE)
+                by_id = {
+                    item_id: (document, _comparable(meta))
+                    for item_id, document, meta in zip(
+                        copies.get("ids") or [], copies["documents"], copies["metadatas"]
+                    )
+                }
+                for item_id, document, meta in zip(ids, page["documents"], page["metadatas"]):
+                    seen.add(item_id)
+                    if by_id.get(item_id) != (document, _comparable(meta)):
+                        stale.append(item_id)
+            if len(ids) < self.batch_size:
+                break
+            offset += len(ids)
+        stale.extend(sorted(self._all_ids(target) - seen))
+        return stale
+
+    def _switch(self) -> None:
+        try:
+            self._open()
+            self._dirty = {logical: set() for logical in LOGICAL_COLLECTIONS}
+            self._deletes = {logical: [] for logical in LOGICAL_COLLECTIONS}
+            self._swapped = False
+            self._install_trackers()
+            self._recopy("memory_blocks", self._stale_ids())
+            self._catch_up()
+            with self._write_lock:
+                self._catch_up(holding_lock=True)
+                Database.activate(
+                    self.state["target"],
+                    self._targets,
+                    extra={"embedding_model": self.state["model_id"]},
+                )
+                embedder_module.embedder = self._target_embedder
+                self._swapped = True
+            self._drop(self.state["source"].values())
+            os.remove(_checkpoint_path())
+            self.state["state"] = "switched"
+            self.state["error"] = None
+        except Exception as exc:
+            logger.exception("Embedding migration switch failed")
+            if not self._swapped:
+                Database.install(self._sources)
+                self.state["state"] = "ready"
+            self.state["error"] = str(exc)
+
+    def _install_trackers(self) -> None:
+        Database.install(
+            {
+                logical: TrackingCollection(logical, collection, self)
+                for logical, collection in self._sources.items()
+            }
+        )
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(_checkpoint_path(), "r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self) -> None:
+        self.state["updated_at"] = _utc_now()
+        path = _checkpoint_path()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle)
+        os.replace(f"{path}.tmp", path)
+
+
+def embedding_model_report(page_size: int = 1000) -> Dict[str, Any]:
+    """Which models produced the stored vectors; more than one means a mixed store."""
+    collection = get_db_collection()
+    counts: Dict[str, int] = {}
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["metadatas"])
+        ids = page.get("ids") or []
+        for meta in page.get("metadatas") or []:
+            model = str((meta or {}).get("embedding_model") or "unknown")
+            counts[model] = counts.get(model, 0) + 1
+        if len(ids) < page_size:
+            break
+        offset += len(ids)
+    return {
+        "configured": embedder_module.get_embedder().model_id,
+        "active": Database.catalog().get("embedding_model"),
+        "counts": counts,
+        "mixed": len(counts) > 1,
+    }
+
+
+def check_embedding_model() -> None:
+    """Raise if the store was migrated to a model this process is not configured for."""
+    active = Database.catalog().get("embedding_model")
+    configured = embedder_module.get_embedder().model_id
+    if active and active != configured:
+        raise RuntimeError(
+            f"store vectors come from {active} but this process embeds with {configured}"
+        )
+
+
+embedding_migration: Optional[EmbeddingMigration] = None
+
+
+def get_embedding_migration() -> EmbeddingMigration:
+    global embedding_migration
+    if embedding_migration is None:
+        embedding_migration = EmbeddingMigration(
+            batch_size=settings.EMBEDDING_MIGRATION_BATCH_SIZE,
+            max_rows_per_second=settings.EMBEDDING_MIGRATION_MAX_ROWS_PER_SECOND,
+        )
+    return embedding_migration
+
+
+def reset_embedding_migration() -> None:
+    global embedding_migration
+    if embedding_migration is not None:
+        embedding_migration.stop()
+    embedding_migration = None
@@ -0,0 +1,324 @@
+"""Shared embedding process for multi-worker deployments.
+
+One process owns the embedding model and serves ``encode_batch`` over a UNIX
+socket. Requests from every connected API worker land in a single queue and
+are encoded together, so concurrent workers share both the model's memory and
+its batch throughput.
+
+Run with ``python -m app.services.embedding_server`` and point workers at it
+with ``EMBEDDING_PROVIDER=server``.
+
+Wire format: every frame is a 4-byte big-endian length followed by the payload.
+A request is one JSON frame. A reply is one JSON header frame and, for
+successful encodes, one frame of little-endian float32 values.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Callable, List, Optional
+
+from app.core.config import settings
+from app.services.embedder import BaseEmbedder, build_embedder
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("embedding server connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return _recv_exact(sock, size)
+
+
+def _pack_vectors(vectors: List[List[float]]) -> bytes:
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+    if sys.byteorder != "little":
+        flat.byteswap()
+    return flat.tobytes()
+
+
+def _unpack_vectors(raw: bytes, count: int, dim: int) -> List[List[float]]:
+    flat = array("f")
+    flat.frombytes(raw)
+    if sys.byteorder != "little":
+        flat.byteswap()
+    values = flat.tolist()
+    return [values[i * dim : (i + 1) * dim] for i in range(count)]
+
+
+class _PendingEncode:
+    __slots__ = ("texts", "vectors", "error", "done")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.vectors: List[List[float]] = []
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class EmbeddingServer:
+    """Serves one embedder to many clients with cross-connection batching."""
+
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        socket_path: str,
+        max_batch: int = 64,
+        batch_window_ms: float = 5.0,
+    ):
+        self.embedder = embedder
+        self.socket_path = socket_path
+        self.max_batch = max(1, max_batch)
+        self.batch_window = max(batch_window_ms, 0.0) / 1000.0
+        self.requests_served = 0
+        self.batches_run = 0
+        self._queue: "queue.Queue[_PendingEncode]" = queue.Queue()
+        self._stopping = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(128)
+        listener.settimeout(0.5)
+        self._listener = listener
+        for target in (self._accept_loop, self._batch_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def serve_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stopping.is_set():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _accept_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn:
+            while not self._stopping.is_set():
+                try:
+                    request = json.loads(recv_frame(conn))
+                except (ConnectionError, OSError, ValueError):
+                    return
+                try:
+                    self._handle(conn, request)
+                except OSError:
+                    return
+
+    def _handle(self, conn: socket.socket, request: dict) -> None:
+        op = request.get("op")
+        if op == "ping":
+            send_frame(conn, json.dumps({"ok": True, "pid": os.getpid()}).encode("utf-8"))
+            return
+        if op != "encode_batch":
+            send_frame(conn, json.dumps({"error": f"unknown op {op!r}"}).encode("utf-8"))
+            return
+
+        pending = _PendingEncode([str(text) for text in request.get("texts") or []])
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            send_frame(conn, json.dumps({"error": pending.error}).encode("utf-8"))
+            return
+        dim = len(pending.vectors[0]) if pending.vectors else 0
+        header = {"count": len(pending.vectors), "dim": dim}
+        send_frame(conn, json.dumps(header).encode("utf-8"))
+        send_frame(conn, _pack_vectors(pending.vectors))
+
+    def _batch_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.batch_window
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item.texts)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_PendingEncode]) -> None:
+        texts = [text for item in batch for text in item.texts]
+        try:
+            vectors = self.embedder.encode_batch(texts) if texts else []
+        except Exception as exc:
+            logger.exception("Embedding batch failed")
+            for item in batch:
+                item.error = str(exc)
+                item.done.set()
+            return
+        offset = 0
+        for item in batch:
+            item.vectors = vectors[offset : offset + len(item.texts)]
+            offset += len(item.texts)
+            item.done.set()
+        self.batches_run += 1
+        self.requests_served += len(batch)
+
+
+class RemoteEmbedder(BaseEmbedder):
+    """Thin client for ``EmbeddingServer`` that encodes in-process when it is down.
+
+    Each thread keeps its own connection. After a failure the server is not
+    retried for ``retry_after`` seconds; calls use the fallback embedder, which
+    is built on first need.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        timeout: float = 10.0,
+        retry_after: float = 5.0,
+        fallback_factory: Optional[Callable[[], BaseEmbedder]] = None,
+    ):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.fallback_factory = fallback_factory
+        self._fallback: Optional[BaseEmbedder] = None
+        self._fallback_lock = threading.Lock()
+        self._local = threading.local()
+        self._down_lock = threading.Lock()
+        self._down_until = 0.0
+
+    def encode(self, text: str) -> List[float]:
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if self._server_up():
+            try:
+                return self._remote_encode(texts)
+            except (OSError, ConnectionError, ValueError) as exc:
+                logger.warning("Embedding server unavailable, encoding in-process: %s", exc)
+                self._drop_connection()
+                self._mark_down()
+        return self._get_fallback().encode_batch(texts)
+
+    def _server_up(self) -> bool:
+        with self._down_lock:
+            return time.monotonic() >= self._down_until
+
+    def _mark_down(self) -> None:
+        with self._down_lock:
+            self._down_until = max(self._down_until, time.monotonic() + self.retry_after)
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            try:
+                conn.connect(self.socket_path)
+            except OSError:
+                conn.close()
+                raise
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+            self._local.conn = None
+
+    def _remote_encode(self, texts: List[str]) -> List[List[float]]:
+        conn = self._connection()
+        send_frame(conn, json.dumps({"op": "encode_batch", "texts": texts}).encode("utf-8"))
+        header = json.loads(recv_frame(conn))
+        if "error" in header:
+            raise ValueError(header["error"])
+        return _unpack_vectors(recv_frame(conn), header["count"], header["dim"])
+
+    def _get_fallback(self) -> BaseEmbedder:
+        if self.fallback_factory is None:
+            raise ConnectionError(f"embedding server at {self.socket_path} is unavailable")
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    self._fallback = self.fallback_factory()
+        return self._fallback
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    embedder = build_embedder(settings.EMBEDDING_SERVER_PROVIDER)
+    server = EmbeddingServer(
+        embedder,
+        socket_path=settings.EMBEDDING_SERVER_SOCKET,
+        max_batch=settings.EMBEDDING_SERVER_MAX_BATCH,
+        batch_window_ms=settings.EMBEDDING_SERVER_BATCH_WINDOW_MS,
+    )
+    logger.info("Embedding server listening on %s", settings.EMBEDDING_SERVER_SOCKET)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
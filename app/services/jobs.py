@@ -0,0 +1,655 @@
+"""Background jobs for long-running maintenance, persisted in a SQLite job table.
+
+Heavy ``MemoryService`` operations (session delete, snapshot, restore, fork and
+move) can be submitted as jobs instead of running inside a request, and the
+periodic maintenance jobs (retention, compaction, counter rebuilds) are
+scheduled here. Jobs run on a pool of ``JOBS_MAX_WORKERS`` threads; at most
+``JOBS_MAX_QUEUED`` wait per process. State, progress, cancellation requests
+and results live in ``JOBS_DB_PATH``, so every worker process on the host can
+report on or cancel any job. Large results (snapshots) and large inputs (restore
+bodies) are kept in files beside the table instead of in it, so job rows and
+``GET /jobs`` stay small.
+
+Cancellation is cooperative: handlers report progress between batches, and a
+requested cancel takes effect there. Each process heartbeats the jobs it owns;
+queued or running jobs whose owner stopped heartbeating (a crash or a restart)
+are marked failed as interrupted rather than re-run, since not every handler is
+idempotent.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.errors import ConflictError, NotFoundError, ServiceUnavailableError
+from app.models.schemas import SessionRestoreRequest
+from app.services.delta_sync import purge_tombstones
+from app.services.lexical_index import get_lexical_index
+from app.services.memory_service import MemoryService
+from app.services.retention import get_retention_worker
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ("queued", "running")
+# Progress is written (and cancellation read back) at most this often per job.
+_PERSIST_INTERVAL_SECONDS = 0.5
+# Heartbeats missed before another process treats a job's owner as gone.
+_STALE_HEARTBEATS = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    state TEXT NOT NULL,
+    params TEXT NOT NULL,
+    resources TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    result_path TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    heartbeat_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+"""
+_PUBLIC_COLUMNS = (
+    "id, kind, state, params, done, total, cancel_requested, error, created_at, started_at, "
+    "finished_at"
+)
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _db_path() -> str:
+    return settings.JOBS_DB_PATH or os.path.join(settings.CHROMA_DB_PATH, "jobs.sqlite3")
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _to_job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStore:
+    """The job table. One connection, serialized by a lock; WAL lets processes share it."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.results_dir = os.path.join(os.path.dirname(path) or ".", "job-results")
+        self.payloads_dir = os.path.join(os.path.dirname(path) or ".", "job-payloads")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def insert(self, job: Dict[str, Any], resources: List[str]) -> Optional[str]:
+        """Insert ``job`` unless an active job holds one of ``resources``; returns its id."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if resources:
+                    wanted = set(resources)
+                    for row in self._conn.execute(
+                        "SELECT id, resources FROM jobs WHERE state IN (?, ?)", ACTIVE_STATES
+                    ):
+                        if wanted & set(json.loads(row["resources"])):
+                            self._conn.execute("ROLLBACK")
+                            return row["id"]
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, state, params, resources, owner, total, "
+                    "created_at, heartbeat_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                    (
+                        job["id"],
+                        job["kind"],
+                        json.dumps(job["params"]),
+                        json.dumps(resources),
+                        job["owner"],
+                        job["total"],
+                        job["created_at"],
+                        time.time(),
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_PUBLIC_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _to_job(row) if row is not None else None
+
+    def list(
+        self, state: Optional[str] = None, kind: Optional[str] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        clauses, values = [], []
+        if state is not None:
+            clauses.append("state = ?")
+            values.append(state)
+        if kind is not None:
+            clauses.append("kind = ?")
+            values.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_PUBLIC_COLUMNS} FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+                (*values, limit),
+            ).fetchall()
+        return [_to_job(row) for row in rows]
+
+    def result(self, job_id: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["result"]) if row is not None and row["result"] else None
+
+    def result_path(self, job_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result_path FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row["result_path"] if row is not None else None
+
+    def result_file(self, job_id: str) -> str:
+        """Where a job's file-backed result is written."""
+        os.makedirs(self.results_dir, exist_ok=True)
+        return os.path.join(self.results_dir, f"{job_id}.json")
+
+    def payload_file(self, job_id: str) -> str:
+        """Where a job's bulky input is spooled; removed once the job has run."""
+        os.makedirs(self.payloads_dir, exist_ok=True)
+        return os.path.join(self.payloads_dir, f"{job_id}.json")
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    def start(self, job_id: str) -> bool:
+        """Mark a queued job running; False if it was cancelled while queued."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = 'running', started_at = ? "
+                "WHERE id = ? AND state = 'queued'",
+                (_utc_now(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row is not None and row["cancel_requested"])
+
+    def request_cancel(self, job_id: str) -> None:
+        """Cancel a queued job outright; flag a running one to stop at its next batch."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = 'cancelled', cancel_requested = 1, finished_at = ? "
+                "WHERE id = ? AND state = 'queued'",
+                (_utc_now(), job_id),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND state = 'running'",
+                (job_id,),
+            )
+
+    def cancel_owned(self, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE owner = ? AND state = 'running'",
+                (owner,),
+            )
+
+    def count_queued(self, owner: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE owner = ? AND state = 'queued'", (owner,)
+            ).fetchone()
+        return int(row[0])
+
+    def heartbeat(self, owner: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND state IN (?, ?)",
+                (time.time(), owner, *ACTIVE_STATES),
+            )
+
+    def fail_active(self, error: str, owner: Optional[str] = None, before: float = 0.0) -> int:
+        """Fail active jobs of ``owner``, or of any owner whose heartbeat is before ``before``."""
+        scope, values = ("owner = ?", (owner,)) if owner else ("heartbeat_at < ?", (before,))
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET state = 'failed', error = ?, finished_at = ? "
+                f"WHERE state IN (?, ?) AND {scope}",
+                (error, _utc_now(), *ACTIVE_STATES, *values),
+            )
+        return cursor.rowcount
+
+    def prune(self, finished_before: str) -> int:
+        scope = "state NOT IN (?, ?) AND finished_at < ?"
+        values = (*ACTIVE_STATES, finished_before)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, result_path FROM jobs WHERE {scope}", values
+            ).fetchall()
+            cursor = self._conn.execute(f"DELETE FROM jobs WHERE {scope}", values)
+        for row in rows:
+            if row["result_path"]:
+                _remove(row["result_path"])
+            # Left behind by jobs cancelled while queued or interrupted by a crash.
+            _remove(os.path.join(self.payloads_dir, f"{row['id']}.json"))
+        return cursor.rowcount
+
+
+class JobContext:
+    """Handed to a running handler for progress reports and cancellation checks."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.done = 0
+        self.result_path: Optional[str] = None
+        self._persisted_at = 0.0
+
+    def advance(self, count: int = 1, total: Optional[int] = None) -> None:
+        """Record ``count`` more units done; raises ``JobCancelled`` once a cancel is seen."""
+        self.done += count
+        now = time.monotonic()
+        if now - self._persisted_at < _PERSIST_INTERVAL_SECONDS:
+            return
+        self._persisted_at = now
+        fields: Dict[str, Any] = {"done": self.done}
+        if total is not None:
+            fields["total"] = total
+        self.store.update(self.job_id, **fields)
+        if self.store.cancel_requested(self.job_id):
+            raise JobCancelled()
+
+    def cancelled(self) -> bool:
+        return self.store.cancel_requested(self.job_id)
+
+    def payload(self) -> Any:
+        """The input passed to ``JobManager.submit(payload=...)``."""
+        with open(self.store.payload_file(self.job_id), encoding="utf-8") as payload:
+            return json.load(payload)
+
+    def open_result(self) -> IO[str]:
+        """Write the result to a file instead of returning it; it is served as written."""
+        self.result_path = self.store.result_file(self.job_id)
+        return open(self.result_path, "w", encoding="utf-8")
+
+
+Handler = Callable[[JobContext, Dict[str, Any]], Any]
+_HANDLERS: Dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(handler: Handler) -> Handler:
+        _HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+class JobManager:
+    def __init__(
+        self,
+        store: JobStore,
+        max_workers: int = 2,
+        max_queued: int = 100,
+        heartbeat_seconds: float = 5.0,
+    ):
+        self.store = store
+        self.owner = uuid.uuid4().hex
+        self.max_queued = max_queued
+        self.heartbeat_seconds = heartbeat_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self._periodic: Dict[str, float] = {}
+        self._local: Dict[str, Tuple[float, Callable[[], Any]]] = {}
+        self._next_run: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        kind: str,
+        params: Optional[Dict[str, Any]] = None,
+        total: Optional[int] = None,
+        resources: Iterable[str] = (),
+        payload: Any = None,
+    ) -> Dict[str, Any]:
+        """Queue a job; ``resources`` it shares with an active job raise ``ConflictError``.
+
+        ``params`` are stored in the job row and returned with the job, so keep them
+        small; a bulky ``payload`` is spooled to a file and read by the handler through
+        ``JobContext.payload()``.
+        """
+        if kind not in _HANDLERS:
+            raise NotFoundError("Unknown job kind", details={"kind": kind})
+        if self.store.count_queued(self.owner) >= self.max_queued:
+            raise ServiceUnavailableError("Too many queued jobs", retry_after=5)
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params or {},
+            "owner": self.owner,
+            "total": total,
+            "created_at": _utc_now(),
+        }
+        if payload is not None:
+            with open(self.store.payload_file(job["id"]), "w", encoding="utf-8") as spool:
+                json.dump(payload, spool)
+        conflict = self.store.insert(job, list(resources))
+        if conflict is not None:
+            _remove(self.store.payload_file(job["id"]))
+            raise ConflictError(
+                "Another job is running on the same resource", details={"job_id": conflict}
+            )
+        self._pool.submit(self._execute, job["id"], kind, job["params"])
+        return self.get(job["id"])
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        job = self.store.get(job_id)
+        if job is None:
+            raise NotFoundError("Job not found", details={"id": job_id})
+        return job
+
+    def result(self, job_id: str) -> Any:
+        path = self.result_file(job_id)
+        if path is not None:
+            with open(path, encoding="utf-8") as result:
+                return json.load(result)
+        return self.store.result(job_id)
+
+    def result_file(self, job_id: str) -> Optional[str]:
+        """Path of a succeeded job's file-backed result, or None if it is stored inline."""
+        job = self.get(job_id)
+        if job["state"] != "succeeded":
+            raise ConflictError("Job has no result", details={"state": job["state"]})
+        path = self.store.result_path(job_id)
+        if path is not None and not os.path.exists(path):
+            raise NotFoundError("Job result file is missing", details={"id": job_id})
+        return path
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = self.get(job_id)
+        if job["state"] not in ACTIVE_STATES:
+            raise ConflictError("Job already finished", details={"state": job["state"]})
+        self.store.request_cancel(job_id)
+        return self.get(job_id)
+
+    def schedule(self, kind: str, interval_seconds: float) -> None:
+        """Run ``kind`` every ``interval_seconds`` (first run one interval from now)."""
+        if interval_seconds > 0:
+            self._periodic[kind] = interval_seconds
+            self._next_run[kind] = time.monotonic() + interval_seconds
+
+    def every(self, name: str, interval_seconds: float, task: Callable[[], Any]) -> None:
+        """Run ``task`` on this process's scheduler thread, outside the job table.
+
+        For upkeep of per-process state, which every worker has to do for itself.
+        """
+        if interval_seconds > 0:
+            self._local[name] = (interval_seconds, task)
+            self._next_run[name] = time.monotonic() + interval_seconds
+
+    def prune(self) -> int:
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=settings.JOBS_RETENTION_SECONDS)
+        return self.store.prune(horizon.isoformat())
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._reap()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop scheduling, cancel this process's jobs and wait for running ones to stop."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.store.cancel_owned(self.owner)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.store.fail_active("interrupted by shutdown", owner=self.owner)
+
+    def _execute(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        try:
+            if self.store.start(job_id):
+                self._run(job_id, kind, params)
+        finally:
+            _remove(os.path.join(self.store.payloads_dir, f"{job_id}.json"))
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        context = JobContext(self.store, job_id)
+        try:
+            result = _HANDLERS[kind](context, params)
+        except JobCancelled:
+            self._discard_result(context)
+            self.store.update(
+                job_id, state="cancelled", done=context.done, finished_at=_utc_now()
+            )
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            self._discard_result(context)
+            self.store.update(
+                job_id, state="failed", done=context.done, error=str(exc), finished_at=_utc_now()
+            )
+        else:
+            stored = (
+                {"result_path": context.result_path}
+                if context.result_path is not None
+                else {"result": result}
+            )
+            self.store.update(
+                job_id, state="succeeded", done=context.done, finished_at=_utc_now(), **stored
+            )
+
+    @staticmethod
+    def _discard_result(context: JobContext) -> None:
+        if context.result_path is not None:
+            _remove(context.result_path)
+
+    def _reap(self) -> None:
+        stale = time.time() - self.heartbeat_seconds * _STALE_HEARTBEATS
+        reaped = self.store.fail_active("interrupted (owner stopped)", before=stale)
+        if reaped:
+            logger.warning("Marked %d interrupted jobs as failed", reaped)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.store.heartbeat(self.owner)
+                self._reap()
+                self._run_due()
+            except Exception:
+                logger.exception("Job scheduler tick failed")
+
+    def _run_due(self) -> None:
+        now = time.monotonic()
+        for name, (interval, task) in self._local.items():
+            if now < self._next_run[name]:
+                continue
+            self._next_run[name] = now + interval
+            try:
+                task()
+            except Exception:
+                logger.exception("Periodic %s task failed", name)
+        for kind, interval in self._periodic.items():
+            if now < self._next_run[kind]:
+                continue
+            self._next_run[kind] = now + interval
+            try:
+                # One instance per kind across processes; a still-active run wins.
+                self.submit(kind, resources=[f"periodic:{kind}"])
+            except (ConflictError, ServiceUnavailableError):
+                logger.info("Skipped periodic %s job; one is still active or queue is full", kind)
+
+
+@job_handler("delete_session")
+def _delete_session(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    service = MemoryService()
+    deleted = service.delete_session(
+        params["session_id"], batch_size=settings.JOBS_BATCH_SIZE, progress=context.advance
+    )
+    return {"session_id": params["session_id"], "deleted": deleted}
+
+
+@job_handler("snapshot")
+def _snapshot(context: JobContext, params: Dict[str, Any]) -> None:
+    """Stream the snapshot to the result file page by page; it never sits in memory whole."""
+    service = MemoryService()
+    total = 0
+    with context.open_result() as out:
+        session_id, exported_at = json.dumps(params["session_id"]), json.dumps(_utc_now())
+        out.write(f'{{"session_id": {session_id}, "exported_at": {exported_at}, "memories": [')
+        for batch in service.iter_snapshot_pages(params["session_id"], params["limit"]):
+            for item in batch:
+                out.write((", " if total else "") + json.dumps(item))
+                total += 1
+            context.advance(len(batch))
+        out.write(f'], "total": {total}}}')
+
+
+@job_handler("restore")
+def _restore(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    service = MemoryService()
+    session_id = params["session_id"]
+    request = SessionRestoreRequest(**context.payload())
+    if request.mode == "delta":
+        counts = service.restore_delta(session_id, request)
+        context.advance(counts["restored"])
+        return {"session_id": session_id, "mode": request.mode, **counts}
+    restored = service.restore_session(session_id, request, progress=context.advance)
+    return {"session_id": session_id, "mode": request.mode, "restored": restored}
+
+
+def _copy_session(method: Callable[..., int], context: JobContext, params: Dict[str, Any]):
+    processed = method(
+        params["session_id"],
+        params["target_session_id"],
+        batch_size=settings.SESSION_COPY_BATCH_SIZE,
+        progress=context.advance,
+    )
+    return {
+        "source_session_id": params["session_id"],
+        "target_session_id": params["target_session_id"],
+        "processed": processed,
+    }
+
+
+@job_handler("fork_session")
+def _fork_session(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    return _copy_session(MemoryService().fork_session, context, params)
+
+
+@job_handler("move_session")
+def _move_session(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    return _copy_session(MemoryService().move_session, context, params)
+
+
+@job_handler("retention")
+def _retention(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {"deleted": get_retention_worker().run_once(should_stop=context.cancelled)}
+
+
+@job_handler("compaction")
+def _compaction(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop expired delete tombstones and finished job rows past ``JOBS_RETENTION_SECONDS``."""
+    return {"tombstones_purged": purge_tombstones(), "jobs_pruned": get_job_manager().prune()}
+
+
+def _rebuild_counters() -> None:
+    """Recount BM25 term statistics from the store, picking up other workers' writes."""
+    index = get_lexical_index()
+    if index is not None:
+        index.invalidate()
+
+
+job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global job_manager
+    if job_manager is not None:
+        return job_manager
+
+    with _job_manager_lock:
+        if job_manager is None:
+            job_manager = JobManager(
+                JobStore(_db_path()),
+                max_workers=settings.JOBS_MAX_WORKERS,
+                max_queued=settings.JOBS_MAX_QUEUED,
+                heartbeat_seconds=settings.JOBS_HEARTBEAT_SECONDS,
+            )
+    return job_manager
+
+
+def start_job_manager() -> JobManager:
+    """Start the scheduler with the periodic jobs enabled in settings."""
+    manager = get_job_manager()
+    if settings.RETENTION_ENABLED:
+        manager.schedule("retention", get_retention_worker().interval_seconds)
+    manager.schedule("compaction", settings.JOBS_COMPACTION_INTERVAL_SECONDS)
+    # The lexical index lives in each process, so every process rebuilds its own.
+    manager.every(
+        "counter_rebuild", settings.JOBS_COUNTER_REBUILD_INTERVAL_SECONDS, _rebuild_counters
+    )
+    manager.start()
+    return manager
+
+
+def reset_job_manager() -> None:
+    global job_manager
+    if job_manager is not None:
+        job_manager.stop()
+        job_manager.store.close()
+    job_manager = None
@@ -0,0 +1,231 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import get_db_collection
+
+# Whole identifiers ("PROJ-1234", "main.py", "@alice") are kept as one token and
+# also split on their punctuation, so "1234" or "alice" still match them.
+_TOKEN_RE = re.compile(r"[@#]?\w[\w.\-/@#:]*")
+_SPLIT_RE = re.compile(r"[.\-/@#:]+")
+_TRAILING = ".-/:"
+
+Document = Tuple[str, str, str]  # (id, session_id, document)
+Loader = Callable[[Optional[str]], Iterable[Document]]
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer((text or "").lower()):
+        token = match.group().rstrip(_TRAILING)
+        if not token:
+            continue
+        tokens.append(token)
+        parts = [part for part in _SPLIT_RE.split(token) if part]
+        if len(parts) > 1 or (parts and parts[0] != token):
+            tokens.extend(parts)
+    return tokens
+
+
+class _SessionIndex:
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.terms: Dict[str, List[str]] = {}
+        self.total_length = 0
+
+    def add(self, doc_id: str, tokens: List[str]) -> None:
+        self.remove(doc_id)
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.terms[doc_id] = list(counts)
+        self.lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        length = self.lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        for term in self.terms.pop(doc_id):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+    def score(self, terms: List[str], k1: float, b: float) -> Dict[str, float]:
+        count = len(self.lengths)
+        if count == 0:
+            return {}
+        avg_length = self.total_length / count or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1.0 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = k1 * (1.0 - b + b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+
+class LexicalIndex:
+    """Per-session BM25 inverted index kept next to the Chroma collection.
+
+    Sessions are loaded from the store the first time they are searched; after
+    that every write and delete is applied in place. Writes to sessions that
+    were never searched are skipped, since loading reads them from the store.
+    Global searches load every session and merge per-session scores.
+    """
+
+    def __init__(self, loader: Loader, k1: float = 1.2, b: float = 0.75):
+        self.loader = loader
+        self.k1 = k1
+        self.b = b
+        self._sessions: Dict[str, _SessionIndex] = {}
+        self._doc_sessions: Dict[str, str] = {}
+        self._all_loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def document_count(self) -> int:
+        with self._lock:
+            return len(self._doc_sessions)
+
+    def add(self, session_id: str, doc_id: str, document: str) -> None:
+        with self._lock:
+            previous = self._doc_sessions.get(doc_id)
+            if previous is not None and previous != session_id:
+                self._sessions[previous].remove(doc_id)
+                del self._doc_sessions[doc_id]
+            index = self._sessions.get(session_id)
+            if index is None:
+                if not self._all_loaded:
+                    return
+                index = self._sessions[session_id] = _SessionIndex()
+            index.add(doc_id, tokenize(document))
+            self._doc_sessions[doc_id] = session_id
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in doc_ids:
+                session_id = self._doc_sessions.pop(doc_id, None)
+                if session_id is not None:
+                    self._sessions[session_id].remove(doc_id)
+
+    def drop_session(self, session_id: str) -> None:
+        with self._lock:
+            index = self._sessions.get(session_id)
+            if index is None:
+                return
+            for doc_id in index.lengths:
+                self._doc_sessions.pop(doc_id, None)
+            self._sessions[session_id] = _SessionIndex()
+
+    def invalidate(self) -> int:
+        """Drop every loaded session so its term counts are rebuilt from the store on use."""
+        with self._lock:
+            dropped = len(self._sessions)
+            self._sessions.clear()
+            self._doc_sessions.clear()
+            self._all_loaded = False
+            return dropped
+
+    def search(self, session_id: Optional[str], text: str, limit: int) -> List[Tuple[str, float]]:
+        """Top ``limit`` ``(id, bm25_score)`` pairs for ``text``, best first."""
+        terms = tokenize(text)
+        if not terms or limit <= 0:
+            return []
+        with self._lock:
+            self._ensure_loaded(session_id)
+            if session_id is not None:
+                scores = self._sessions[session_id].score(terms, self.k1, self.b)
+            else:
+                scores = {}
+                for index in self._sessions.values():
+                    scores.update(index.score(terms, self.k1, self.b))
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def _ensure_loaded(self, session_id: Optional[str]) -> None:
+        if self._all_loaded or (session_id is not None and session_id in self._sessions):
+            return
+        if session_id is not None:
+            self._sessions[session_id] = _SessionIndex()
+        for doc_id, doc_session, document in self.loader(session_id):
+            index = self._sessions.get(doc_session)
+            if index is None:
+                index = self._sessions[doc_session] = _SessionIndex()
+            if doc_id in self._doc_sessions:
+                continue
+            index.add(doc_id, tokenize(document))
+            self._doc_sessions[doc_id] = doc_session
+        if session_id is None:
+            self._all_loaded = True
+
+
+def load_from_store(session_id: Optional[str], page_size: int = 1000) -> Iterable[Document]:
+    collection = get_db_collection()
+    where_clause = {"session_id": session_id} if session_id else None
+    offset = 0
+    while True:
+        page = collection.get(
+            where=where_clause,
+            limit=page_size,
+            offset=offset,
+            include=["metadatas", "documents"],
+        )
+        ids = page.get("ids") or []
+        for doc_id, meta, document in zip(ids, page["metadatas"], page["documents"]):
+            yield doc_id, str((meta or {}).get("session_id", "default")), document or ""
+        if len(ids) < page_size:
+            return
+        offset += len(ids)
+
+
+lexical_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+
+def index_documents(documents: Iterable[Document]) -> None:
+    """Apply committed writes to the index, if it is enabled."""
+    index = get_lexical_index()
+    if index is not None:
+        for doc_id, session_id, document in documents:
+            index.add(session_id, doc_id, document)
+
+
+def reset_lexical_index() -> None:
+    global lexical_index
+    lexical_index = None
+
+
+def lexical_index_enabled() -> bool:
+    """``LEXICAL_INDEX_ENABLED``, defaulting to off in ``CHROMA_MODE=http`` without rebuilds.
+
+    The index is per process: with several workers on a shared server, nothing but
+    the periodic counter rebuild shows a worker the others' writes and deletes.
+    """
+    if settings.LEXICAL_INDEX_ENABLED is None:
+        return (
+            settings.CHROMA_MODE != "http" or settings.JOBS_COUNTER_REBUILD_INTERVAL_SECONDS > 0
+        )
+    return settings.LEXICAL_INDEX_ENABLED
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """The process-wide index, or None when the lexical index is disabled."""
+    global lexical_index
+    if not lexical_index_enabled():
+        return None
+    with _index_lock:
+        if lexical_index is None:
+            lexical_index = LexicalIndex(
+                load_from_store, k1=settings.LEXICAL_BM25_K1, b=settings.LEXICAL_BM25_B
+            )
+        return lexical_index
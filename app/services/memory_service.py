@@ -1,14 +1,19 @@
 import hashlib
 import json
+import logging
+import math
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from app.core.config import settings
-from app.core.database import get_db_collection
+from app.core.database import distance_space, get_db_collection
 from app.core.errors import ValidationError
+from app.core.singleflight import SingleFlight
+from app.core.versions import get_write_versions
 from app.models.schemas import (
     HybridMemoryQuery,
+    KnownMemory,
     MemoryCreate,
     MemoryQuery,
     MemoryResponse,
@@ -19,7 +24,29 @@ from app.models.schemas import (
     StatsOverviewResponse,
     TagSummary,
 )
+from app.services.chunking import (
+    EmbeddedDocument,
+    copy_chunks,
+    delete_chunks,
+    embed_documents,
+    query_chunks,
+    relabel_chunks,
+    split_chunks,
+    write_chunks,
+)
+from app.services.delta_sync import (
+    content_hash,
+    deleted_since,
+    record_tombstones,
+    tombstone_horizon,
+)
 from app.services.embedder import get_embedder
+from app.services.lexical_index import get_lexical_index, index_documents
+from app.services.metadata import as_utc, extract_tags, parse_iso
+from app.services.retrieval_tracker import get_retrieval_tracker
+from app.services.write_buffer import WriteBehindBuffer, get_write_buffer
+
+logger = logging.getLogger(__name__)
 
 
 def _now_iso() -> str:
@@ -34,42 +61,94 @@ def _derive_memory_id(memory: MemoryUpsert) -> str:
     return f"mem_{digest}"
 
 
-def _extract_tags(meta: dict) -> List[str]:
-    tags_json = meta.get("tags_json")
-    if isinstance(tags_json, str) and tags_json:
-        try:
-            parsed = json.loads(tags_json)
-            if isinstance(parsed, list):
-                return [str(item) for item in parsed]
-        except json.JSONDecodeError:
-            pass
-
-    legacy = meta.get("tags")
-    if isinstance(legacy, list):
-        return [str(item) for item in legacy]
-    if isinstance(legacy, str) and legacy:
-        return [tag for tag in legacy.split(",") if tag]
-    return []
+def _fork_memory_id(target_session_id: str, source_id: str) -> str:
+    # Deterministic, so re-running a fork updates the earlier copies instead of duplicating.
+    digest = hashlib.sha256(f"{target_session_id}|{source_id}".encode("utf-8")).hexdigest()[:32]
+    return f"mem_{digest}"
 
 
 def _parse_created_at(meta: dict) -> Optional[datetime]:
     raw = meta.get("created_at")
-    if not isinstance(raw, str):
-        return None
-    try:
-        normalized = raw.replace("Z", "+00:00")
-        return datetime.fromisoformat(normalized)
-    except ValueError:
-        return None
+    return parse_iso(raw) if isinstance(raw, str) else None
+
+
+def _is_newer(stamp: Optional[str], than: datetime) -> bool:
+    """Whether ISO ``stamp`` is at or after ``than``.
+
+    Unparseable stamps count as newer, so doubtful rows are re-sent rather than missed.
+    """
+    parsed = as_utc(stamp)
+    if parsed is None:
+        return True
+    if than.tzinfo is None:
+        than = than.replace(tzinfo=timezone.utc)
+    return parsed >= than
+
+
+def _similarity(distance: Optional[float], space: str) -> float:
+    """Similarity-like score from a distance (lower is better); lexical-only hits have none.
+
+    Cosine and inner-product distances are doubled to squared-L2 units, so unit
+    vectors score the same whichever space the collection was built with.
+    """
+    if distance is None:
+        return 0.0
+    if space != "l2":
+        distance *= 2.0
+    return 1.0 / (1.0 + (distance or 1.0))
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def _lru_tracking_enabled() -> bool:
+    return settings.SESSION_MEMORY_CAP > 0 and settings.SESSION_EVICTION_POLICY == "lru"
+
+
+# Identical concurrent reads share one computation. Keys include the global
+# write version, bumped after every committed write, so a caller never joins a
+# read that started before its own write landed.
+_inflight = SingleFlight()
+
+
+def _bump_versions(*session_ids: Optional[str]) -> None:
+    get_write_versions().bump(sid for sid in session_ids if sid)
+
+
+def _copy_rows(rows: List[dict]) -> List[dict]:
+    return [dict(row) for row in rows]
+
+
+def _coalesce(key: tuple, fn, share=None):
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return fn()
+    return _inflight.do((get_write_versions().global_version,) + key, fn, share)
+
+
+def _write_buffer() -> Optional[WriteBehindBuffer]:
+    return get_write_buffer() if settings.WRITE_BEHIND_ENABLED else None
 
 
-def _parse_iso(raw: Optional[str]) -> Optional[datetime]:
-    if not raw:
-        return None
-    try:
-        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
-    except ValueError:
-        return None
+def _eviction_key(item_id: str, meta: dict, pending: Dict[str, str]) -> Tuple[datetime, str]:
+    """Sort key for cap enforcement: the memory to evict first sorts lowest."""
+    if settings.SESSION_EVICTION_POLICY == "lru":
+        raw = [
+            pending.get(item_id),
+            meta.get("last_retrieved_at"),
+            meta.get("updated_at"),
+            meta.get("created_at"),
+        ]
+        stamps = [stamp for stamp in (as_utc(value) for value in raw) if stamp]
+        touched = max(stamps) if stamps else None
+    else:
+        touched = as_utc(meta.get("created_at"))
+    return touched or datetime.fromtimestamp(0, tz=timezone.utc), item_id
 
 
 class MemoryService:
@@ -77,27 +156,63 @@ class MemoryService:
         self.collection = get_db_collection()
         self.embedder = get_embedder()
 
-    def _to_response(
+    def _to_row(
         self,
         item_id: str,
         document: str,
         meta: dict,
         distance: Optional[float] = None,
-    ) -> MemoryResponse:
-        return MemoryResponse(
-            id=item_id,
-            content=document,
-            name=meta.get("name"),
-            session_id=meta.get("session_id", "default"),
-            tags=_extract_tags(meta),
-            created_at=meta.get("created_at"),
-            updated_at=meta.get("updated_at"),
-            distance=distance,
-        )
+    ) -> dict:
+        return {
+            "content": document,
+            "name": meta.get("name"),
+            "session_id": meta.get("session_id", "default"),
+            "tags": extract_tags(meta),
+            "id": item_id,
+            "created_at": meta.get("created_at"),
+            "updated_at": meta.get("updated_at"),
+            "distance": distance,
+            "score": None,
+        }
+
+    def _to_response(self, row: dict) -> MemoryResponse:
+        # Rows are built from stored records that already passed validation on write.
+        return MemoryResponse.model_construct(**row)
+
+    def _encode(self, text: str) -> List[float]:
+        return _coalesce(("encode", text), lambda: self.embedder.encode(text), share=list)
+
+    def _embed_document(self, text: str) -> EmbeddedDocument:
+        """Embed stored content, chunk by chunk when it is longer than one window."""
+        if not split_chunks(text):
+            return EmbeddedDocument(embedding=self._encode(text))
+        return embed_documents(self.embedder, [text])[0]
+
+    def _read_barrier(self, session_id: Optional[str] = None) -> None:
+        """Flush queued writes (for one session, or all) so reads observe them."""
+        buffer = _write_buffer()
+        if buffer is not None and buffer.has_pending(session_id):
+            buffer.flush(session_id)
+
+    def _flush_pending_ids(self, ids: List[str]) -> None:
+        buffer = _write_buffer()
+        if buffer is not None and buffer.has_pending(ids=ids):
+            buffer.flush()
 
     def add_memory(self, memory: MemoryCreate) -> MemoryResponse:
+        dedup = settings.DEDUP_ENABLED if memory.dedup is None else memory.dedup
+        buffer = _write_buffer()
+        if buffer is not None and not dedup:
+            return self._queue_memory(buffer, memory)
+
+        embedded = self._embed_document(memory.content)
+        if dedup:
+            self._read_barrier(memory.session_id)
+            duplicate = self._find_duplicate(memory.session_id, embedded.embedding)
+            if duplicate is not None:
+                return self._absorb_duplicate(duplicate, memory, embedded)
+
         block_id = str(uuid.uuid4())
-        embedding = self.embedder.encode(memory.content)
         now = _now_iso()
 
         metadata = {
@@ -107,13 +222,20 @@ class MemoryService:
             "updated_at": now,
             "tags_json": json.dumps(memory.tags),
         }
+        metadata["chunk_count"] = len(embedded.chunks)
+        metadata["embedding_model"] = self.embedder.model_id
+        metadata["content_hash"] = content_hash(memory.content)
 
         self.collection.add(
             ids=[block_id],
-            embeddings=[embedding],
+            embeddings=[embedded.embedding],
             metadatas=[metadata],
             documents=[memory.content],
         )
+        write_chunks([(block_id, memory.session_id, embedded)], replace=False)
+        index_documents([(block_id, memory.session_id, memory.content)])
+        _bump_versions(memory.session_id)
+        self._enforce_session_cap(memory.session_id)
 
         return MemoryResponse(
             id=block_id,
@@ -123,19 +245,169 @@ class MemoryService:
             tags=memory.tags,
             created_at=now,
             updated_at=now,
+            ingest_action="inserted",
+        )
+
+    def _queue_memory(self, buffer: WriteBehindBuffer, memory: MemoryCreate) -> MemoryResponse:
+        block_id = str(uuid.uuid4())
+        now = _now_iso()
+        metadata = {
+            "name": memory.name or "Unnamed Block",
+            "session_id": memory.session_id,
+            "created_at": now,
+            "updated_at": now,
+            "tags_json": json.dumps(memory.tags),
+        }
+        buffer.submit(block_id, memory.session_id, memory.content, metadata)
+        _bump_versions(memory.session_id)
+        return MemoryResponse(
+            id=block_id,
+            content=memory.content,
+            name=memory.name,
+            session_id=memory.session_id,
+            tags=memory.tags,
+            created_at=now,
+            updated_at=now,
+            ingest_action="queued",
+        )
+
+    def _find_duplicate(self, session_id: str, embedding: List[float]) -> Optional[dict]:
+        results = self.collection.query(
+            query_embeddings=[embedding],
+            n_results=1,
+            where={"session_id": session_id},
+            include=["metadatas", "documents", "embeddings"],
+        )
+        ids = (results.get("ids") or [[]])[0] if results else []
+        if not ids:
+            return None
+        stored = [float(value) for value in results["embeddings"][0][0]]
+        if _cosine_similarity(embedding, stored) < settings.DEDUP_SIMILARITY_THRESHOLD:
+            return None
+        return {
+            "id": ids[0],
+            "document": results["documents"][0][0],
+            "meta": results["metadatas"][0][0] or {},
+        }
+
+    def _absorb_duplicate(
+        self,
+        duplicate: dict,
+        memory: MemoryCreate,
+        embedded: EmbeddedDocument,
+    ) -> MemoryResponse:
+        meta = dict(duplicate["meta"])
+        tags = list(dict.fromkeys(extract_tags(meta) + memory.tags))
+        now = _now_iso()
+        meta["updated_at"] = now
+        meta["tags_json"] = json.dumps(tags)
+
+        if settings.DEDUP_ACTION == "merge":
+            action = "merged"
+            content = memory.content
+            if memory.name:
+                meta["name"] = memory.name
+            had_chunks = bool(meta.get("chunk_count"))
+            meta["chunk_count"] = len(embedded.chunks)
+            meta["embedding_model"] = self.embedder.model_id
+            meta["content_hash"] = content_hash(content)
+            self.collection.update(
+                ids=[duplicate["id"]],
+                embeddings=[embedded.embedding],
+                metadatas=[meta],
+                documents=[content],
+            )
+            if had_chunks or embedded.chunks:
+                write_chunks([(duplicate["id"], memory.session_id, embedded)])
+            index_documents([(duplicate["id"], memory.session_id, content)])
+        else:
+            action = "refreshed"
+            content = duplicate["document"]
+            self.collection.update(ids=[duplicate["id"]], metadatas=[meta])
+        _bump_versions(memory.session_id)
+
+        return MemoryResponse(
+            id=duplicate["id"],
+            content=content,
+            name=meta.get("name"),
+            session_id=memory.session_id,
+            tags=tags,
+            created_at=meta.get("created_at"),
+            updated_at=now,
+            ingest_action=action,
+        )
+
+    def upsert_memory(
+        self,
+        memory: MemoryUpsert,
+        embedded: Optional[EmbeddedDocument] = None,
+    ) -> MemoryResponse:
+        buffer = _write_buffer()
+        if buffer is not None:
+            return self._queue_upsert(buffer, memory, embedded)
+        response = self._upsert_memory(memory, embedded)
+        self._enforce_session_cap(memory.session_id)
+        return response
+
+    def _queue_upsert(
+        self,
+        buffer: WriteBehindBuffer,
+        memory: MemoryUpsert,
+        embedded: Optional[EmbeddedDocument] = None,
+    ) -> MemoryResponse:
+        block_id = _derive_memory_id(memory)
+        now = _now_iso()
+        previous = buffer.pending_metadata(block_id)
+        if previous is None:
+            existing = self.collection.get(ids=[block_id], include=["metadatas"])
+            previous = ((existing.get("metadatas") or [None])[0] if existing else None) or {}
+        created_at = previous.get("created_at") or now
+
+        metadata = {
+            "name": memory.name or "Unnamed Block",
+            "session_id": memory.session_id,
+            "created_at": created_at,
+            "updated_at": now,
+            "tags_json": json.dumps(memory.tags),
+        }
+        if memory.external_id is not None:
+            metadata["external_id"] = memory.external_id
+        buffer.submit(block_id, memory.session_id, memory.content, metadata, embedded)
+        previous_session = previous.get("session_id")
+        if previous_session and previous_session != memory.session_id:
+            record_tombstones([(block_id, previous_session)])
+        _bump_versions(memory.session_id, previous_session)
+        return MemoryResponse(
+            id=block_id,
+            content=memory.content,
+            name=memory.name,
+            session_id=memory.session_id,
+            tags=memory.tags,
+            created_at=created_at,
+            updated_at=now,
+            ingest_action="queued",
         )
 
-    def upsert_memory(self, memory: MemoryUpsert) -> MemoryResponse:
+    def _upsert_memory(
+        self,
+        memory: MemoryUpsert,
+        embedded: Optional[EmbeddedDocument] = None,
+    ) -> MemoryResponse:
         block_id = _derive_memory_id(memory)
-        embedding = self.embedder.encode(memory.content)
+        if embedded is None:
+            embedded = self._embed_document(memory.content)
         now = _now_iso()
 
         existing = self.collection.get(ids=[block_id], include=["metadatas", "documents"])
         created_at = now
+        previous_session = None
+        had_chunks = False
         if existing and existing.get("ids"):
             if existing["ids"]:
                 existing_meta = (existing.get("metadatas") or [{}])[0] or {}
                 created_at = existing_meta.get("created_at") or now
+                previous_session = existing_meta.get("session_id")
+                had_chunks = bool(existing_meta.get("chunk_count"))
 
         metadata = {
             "name": memory.name or "Unnamed Block",
@@ -146,13 +418,23 @@ class MemoryService:
         }
         if memory.external_id is not None:
             metadata["external_id"] = memory.external_id
+        metadata["chunk_count"] = len(embedded.chunks)
+        metadata["embedding_model"] = self.embedder.model_id
+        metadata["content_hash"] = content_hash(memory.content)
 
         self.collection.upsert(
             ids=[block_id],
-            embeddings=[embedding],
+            embeddings=[embedded.embedding],
             metadatas=[metadata],
             documents=[memory.content],
         )
+        if had_chunks or embedded.chunks:
+            write_chunks([(block_id, memory.session_id, embedded)])
+        index_documents([(block_id, memory.session_id, memory.content)])
+        if previous_session and previous_session != memory.session_id:
+            # Moved: replicas of the old session must drop it.
+            record_tombstones([(block_id, previous_session)])
+        _bump_versions(memory.session_id, previous_session)
 
         return MemoryResponse(
             id=block_id,
@@ -164,8 +446,62 @@ class MemoryService:
             updated_at=now,
         )
 
-    def query_memories(self, query: MemoryQuery) -> List[MemoryResponse]:
-        query_embedding = self.embedder.encode(query.query_text)
+    def _track_retrievals(self, rows: List[dict]) -> None:
+        if rows and _lru_tracking_enabled():
+            get_retrieval_tracker().record(row["id"] for row in rows)
+
+    def _enforce_session_cap(self, session_id: str) -> List[str]:
+        """Evict the session's oldest or least-recently-retrieved memories above the cap."""
+        cap = settings.SESSION_MEMORY_CAP
+        if cap <= 0:
+            return []
+        where_clause = {"session_id": session_id}
+        current = self.collection.get(where=where_clause, include=[])
+        overflow = len(current.get("ids") or []) - cap
+        if overflow <= 0:
+            return []
+
+        results = self.collection.get(where=where_clause, include=["metadatas"])
+        ids = results.get("ids") or []
+        metadatas = results.get("metadatas") or []
+        exempt = set(settings.EVICTION_EXEMPT_TAGS)
+        pending = get_retrieval_tracker().pending(ids) if _lru_tracking_enabled() else {}
+        candidates = [
+            (_eviction_key(item_id, meta or {}, pending), item_id)
+            for item_id, meta in zip(ids, metadatas)
+            if not exempt.intersection(extract_tags(meta or {}))
+        ]
+        candidates.sort()
+        evicted = [item_id for _, item_id in candidates[:overflow]]
+        if evicted:
+            self.delete_bulk(evicted)
+            get_retrieval_tracker().forget(evicted)
+            logger.info("Evicted %d memories from session %s", len(evicted), session_id)
+        return evicted
+
+    def query_memory_rows(
+        self,
+        query: MemoryQuery,
+        track: bool = True,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[dict]:
+        rows = _coalesce(
+            ("query", query.model_dump_json()),
+            lambda: self._query_memory_rows(query, query_embedding),
+            share=_copy_rows,
+        )
+        if track:
+            self._track_retrievals(rows)
+        return rows
+
+    def _query_memory_rows(
+        self,
+        query: MemoryQuery,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[dict]:
+        self._read_barrier(query.session_id)
+        if query_embedding is None:
+            query_embedding = self._encode(query.query_text)
         where_clause = {"session_id": query.session_id} if query.session_id else None
 
         results = self.collection.query(
@@ -175,47 +511,101 @@ class MemoryService:
             include=["metadatas", "distances", "documents"],
         )
 
-        formatted: List[MemoryResponse] = []
+        rows: List[dict] = []
         if results and results.get("ids"):
             ids = results["ids"][0]
             distances = results["distances"][0]
             metadatas = results["metadatas"][0]
             documents = results["documents"][0]
             for i in range(len(ids)):
-                formatted.append(
-                    self._to_response(
-                        item_id=ids[i],
-                        document=documents[i],
-                        meta=metadatas[i],
-                        distance=distances[i],
-                    )
-                )
-        return formatted
+                rows.append(self._to_row(ids[i], documents[i], metadatas[i], distances[i]))
+        if settings.CHUNKING_ENABLED:
+            rows = self._merge_chunk_hits(rows, query_embedding, query.top_k, where_clause)
+        return rows
 
-    def query_memories_hybrid(self, query: HybridMemoryQuery) -> List[MemoryResponse]:
-        if query.recency_weight + query.similarity_weight <= 0:
+    def _merge_chunk_hits(
+        self,
+        rows: List[dict],
+        query_embedding: List[float],
+        top_k: int,
+        where_clause: Optional[dict],
+    ) -> List[dict]:
+        """Collapse chunk matches onto their parent memory, keeping each parent's best distance."""
+        # Several chunks of one parent can crowd the nearest hits, so over-fetch a little.
+        best = query_chunks(query_embedding, top_k * 3, where_clause)
+        if not best:
+            return rows
+        by_id = {row["id"]: row for row in rows}
+        for parent_id, distance in best.items():
+            row = by_id.get(parent_id)
+            if row is not None and distance < row["distance"]:
+                row["distance"] = distance
+        missing = [parent_id for parent_id in best if parent_id not in by_id]
+        if missing:
+            found = self.collection.get(ids=missing, include=["metadatas", "documents"])
+            for item_id, document, meta in zip(
+                found.get("ids") or [], found["documents"], found["metadatas"]
+            ):
+                by_id[item_id] = self._to_row(item_id, document, meta or {}, best[item_id])
+        merged = sorted(by_id.values(), key=lambda row: (row["distance"], row["id"]))
+        return merged[:top_k]
+
+    def query_memories(self, query: MemoryQuery) -> List[MemoryResponse]:
+        return [self._to_response(row) for row in self.query_memory_rows(query)]
+
+    def query_hybrid_rows(
+        self,
+        query: HybridMemoryQuery,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[dict]:
+        if query.lexical_weight > 0 or query.lexical_only:
+            if get_lexical_index() is None:
+                raise ValidationError("Lexical retrieval requires LEXICAL_INDEX_ENABLED")
+        elif query.recency_weight + query.similarity_weight <= 0:
             raise ValidationError("recency_weight + similarity_weight must be > 0")
+        results = _coalesce(
+            ("hybrid", query.model_dump_json()),
+            lambda: self._query_hybrid_rows(query, query_embedding),
+            share=_copy_rows,
+        )
+        self._track_retrievals(results)
+        return results
 
+    def _query_hybrid_rows(
+        self,
+        query: HybridMemoryQuery,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[dict]:
         candidate_k = max(
             query.top_k,
             query.candidate_k,
             query.top_k * settings.QUERY_CANDIDATE_MULTIPLIER,
         )
         candidate_k = min(candidate_k, 500)
-        candidates = self.query_memories(
-            MemoryQuery(
-                query_text=query.query_text,
-                session_id=query.session_id,
-                top_k=candidate_k,
+        candidates: List[dict] = []
+        if not query.lexical_only:
+            candidates = self.query_memory_rows(
+                MemoryQuery(
+                    query_text=query.query_text,
+                    session_id=query.session_id,
+                    top_k=candidate_k,
+                ),
+                track=False,
+                query_embedding=query_embedding,
+            )
+        lexical_weight = query.lexical_weight or (1.0 if query.lexical_only else 0.0)
+        lexical_scores: Dict[str, float] = {}
+        if lexical_weight > 0:
+            candidates, lexical_scores = self._merge_lexical_candidates(
+                query, candidate_k, candidates
             )
-        )
 
         if not candidates:
             return []
 
-        # Lower distance is better. Convert to similarity-like score.
-        similarities = [(1.0 / (1.0 + (item.distance or 1.0))) for item in candidates]
-        created = [_parse_created_at({"created_at": item.created_at}) for item in candidates]
+        space = distance_space(self.collection)
+        similarities = [_similarity(item["distance"], space) for item in candidates]
+        created = [_parse_created_at(item) for item in candidates]
 
         now = datetime.now(timezone.utc)
         ages_hours: List[float] = []
@@ -235,32 +625,60 @@ class MemoryService:
             for age in ages_hours:
                 recencies.append(1.0 - ((age - min_age) / (max_age - min_age)))
 
-        scored: List[MemoryResponse] = []
         for idx, item in enumerate(candidates):
             score = (query.similarity_weight * similarities[idx]) + (
                 query.recency_weight * recencies[idx]
             )
-            item.score = float(score)
-            scored.append(item)
+            if lexical_scores:
+                score += lexical_weight * lexical_scores.get(item["id"], 0.0)
+            item["score"] = float(score)
 
-        scored.sort(
+        candidates.sort(
             key=lambda item: (
-                -(item.score or 0.0),
+                -(item["score"] or 0.0),
                 -(
-                    _parse_iso(item.updated_at or item.created_at)
+                    parse_iso(item["updated_at"] or item["created_at"])
                     or datetime.fromtimestamp(0, tz=timezone.utc)
                 ).timestamp(),
-                item.id,
+                item["id"],
             )
         )
-        return scored[: query.top_k]
+        return candidates[: query.top_k]
 
-    def list_memories(
+    def _merge_lexical_candidates(
+        self,
+        query: HybridMemoryQuery,
+        candidate_k: int,
+        candidates: List[dict],
+    ) -> Tuple[List[dict], Dict[str, float]]:
+        """Add BM25 hits to the vector candidates; scores are scaled to [0, 1]."""
+        if query.lexical_only:
+            self._read_barrier(query.session_id)
+        hits = get_lexical_index().search(query.session_id, query.query_text, candidate_k)
+        if not hits:
+            return candidates, {}
+        top = hits[0][1]
+        scores = {doc_id: score / top for doc_id, score in hits}
+        known = {row["id"] for row in candidates}
+        missing = [doc_id for doc_id, _ in hits if doc_id not in known]
+        if missing:
+            found = self.collection.get(ids=missing, include=["metadatas", "documents"])
+            for item_id, document, meta in zip(
+                found.get("ids") or [], found["documents"], found["metadatas"]
+            ):
+                candidates.append(self._to_row(item_id, document, meta or {}))
+        return candidates, scores
+
+    def query_memories_hybrid(self, query: HybridMemoryQuery) -> List[MemoryResponse]:
+        return [self._to_response(row) for row in self.query_hybrid_rows(query)]
+
+    def list_memory_rows(
         self,
         session_id: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> List[MemoryResponse]:
+    ) -> List[dict]:
+        self._read_barrier(session_id)
         where_clause = {"session_id": session_id} if session_id else None
         results = self.collection.get(
             where=where_clause,
@@ -269,30 +687,38 @@ class MemoryService:
             include=["metadatas", "documents"],
         )
 
-        formatted: List[MemoryResponse] = []
+        rows: List[dict] = []
         if results and results.get("ids"):
             ids = results["ids"]
             metadatas = results["metadatas"]
             documents = results["documents"]
             for i in range(len(ids)):
-                formatted.append(
-                    self._to_response(
-                        item_id=ids[i],
-                        document=documents[i],
-                        meta=metadatas[i],
-                    )
-                )
-        return formatted
+                rows.append(self._to_row(ids[i], documents[i], metadatas[i]))
+        return rows
+
+    def list_memories(
+        self,
+        session_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[MemoryResponse]:
+        rows = self.list_memory_rows(session_id=session_id, limit=limit, offset=offset)
+        return [self._to_response(row) for row in rows]
 
     def count_memories(self, session_id: Optional[str] = None) -> int:
+        self._read_barrier(session_id)
         if session_id is None:
             return int(self.collection.count())
 
-        results = self.collection.get(where={"session_id": session_id})
+        results = self.collection.get(where={"session_id": session_id}, include=[])
         ids = results.get("ids") if results else []
         return len(ids or [])
 
     def list_sessions(self, limit: int = 50, offset: int = 0) -> Tuple[List[SessionSummary], int]:
+        return _coalesce(("sessions", limit, offset), lambda: self._list_sessions(limit, offset))
+
+    def _list_sessions(self, limit: int, offset: int) -> Tuple[List[SessionSummary], int]:
+        self._read_barrier()
         results = self.collection.get(include=["metadatas"])
         metadatas = results.get("metadatas") if results else []
 
@@ -311,8 +737,8 @@ class MemoryService:
                 )
             else:
                 row.memory_count += 1
-                current_dt = _parse_iso(row.last_updated) if row.last_updated else None
-                candidate_dt = _parse_iso(updated) if isinstance(updated, str) else None
+                current_dt = parse_iso(row.last_updated) if row.last_updated else None
+                candidate_dt = parse_iso(updated) if isinstance(updated, str) else None
                 if candidate_dt and (current_dt is None or candidate_dt > current_dt):
                     row.last_updated = updated
 
@@ -320,8 +746,7 @@ class MemoryService:
             session_map.values(),
             key=lambda item: (
                 -(
-                    _parse_iso(item.last_updated)
-                    or datetime.fromtimestamp(0, tz=timezone.utc)
+                    parse_iso(item.last_updated) or datetime.fromtimestamp(0, tz=timezone.utc)
                 ).timestamp(),
                 item.session_id,
             ),
@@ -331,12 +756,16 @@ class MemoryService:
         return paged, total
 
     def list_tags(self, limit: int = 20, offset: int = 0) -> Tuple[List[TagSummary], int]:
+        return _coalesce(("tags", limit, offset), lambda: self._list_tags(limit, offset))
+
+    def _list_tags(self, limit: int, offset: int) -> Tuple[List[TagSummary], int]:
+        self._read_barrier()
         results = self.collection.get(include=["metadatas"])
         metadatas = results.get("metadatas") if results else []
 
         counts: Dict[str, int] = {}
         for meta in metadatas or []:
-            for tag in _extract_tags(meta):
+            for tag in extract_tags(meta):
                 counts[tag] = counts.get(tag, 0) + 1
 
         ordered = [TagSummary(tag=tag, count=count) for tag, count in counts.items()]
@@ -346,6 +775,9 @@ class MemoryService:
         return paged, total
 
     def stats_overview(self, top_tags_limit: int = 5) -> StatsOverviewResponse:
+        return _coalesce(("stats", top_tags_limit), lambda: self._stats_overview(top_tags_limit))
+
+    def _stats_overview(self, top_tags_limit: int) -> StatsOverviewResponse:
         total_memories = self.count_memories()
         _, total_sessions = self.list_sessions(limit=1, offset=0)
         top_tags, _ = self.list_tags(limit=top_tags_limit, offset=0)
@@ -357,8 +789,8 @@ class MemoryService:
         for meta in metadatas or []:
             updated_raw = meta.get("updated_at")
             created_raw = meta.get("created_at")
-            updated = _parse_iso(updated_raw) if isinstance(updated_raw, str) else None
-            created = _parse_iso(created_raw) if isinstance(created_raw, str) else None
+            updated = parse_iso(updated_raw) if isinstance(updated_raw, str) else None
+            created = parse_iso(created_raw) if isinstance(created_raw, str) else None
             ts = updated or created
             if not ts:
                 continue
@@ -372,27 +804,50 @@ class MemoryService:
             top_tags=top_tags,
         )
 
-    def snapshot_session(self, session_id: str, limit: int = 1000) -> SessionSnapshotResponse:
+    def iter_snapshot_pages(self, session_id: str, limit: int = 1000) -> Iterator[List[dict]]:
+        """Yield a session's rows page by page, ``limit`` rows at most."""
         offset = 0
-        items: List[MemoryResponse] = []
-        while True:
-            batch = self.list_memories(session_id=session_id, limit=min(limit, 500), offset=offset)
+        page_size = min(limit, 500)
+        while offset < limit:
+            want = min(page_size, limit - offset)
+            batch = self.list_memory_rows(session_id=session_id, limit=want, offset=offset)
             if not batch:
                 break
-            items.extend(batch)
-            if len(batch) < min(limit, 500):
+            yield batch
+            if len(batch) < want:
                 break
             offset += len(batch)
-            if len(items) >= limit:
-                break
-        return SessionSnapshotResponse(
-            session_id=session_id,
-            exported_at=_now_iso(),
-            total=len(items),
-            memories=items,
-        )
 
-    def restore_session(self, session_id: str, request: SessionRestoreRequest) -> int:
+    def snapshot_rows(self, session_id: str, limit: int = 1000) -> List[dict]:
+        items: List[dict] = []
+        for batch in self.iter_snapshot_pages(session_id, limit):
+            items.extend(batch)
+        return items
+
+    def snapshot_payload(self, session_id: str, limit: int = 1000) -> dict:
+        items = self.snapshot_rows(session_id, limit)
+        return {
+            "session_id": session_id,
+            "exported_at": _now_iso(),
+            "total": len(items),
+            "memories": items,
+        }
+
+    def snapshot_session(self, session_id: str, limit: int = 1000) -> SessionSnapshotResponse:
+        payload = self.snapshot_payload(session_id, limit)
+        payload["memories"] = [self._to_response(row) for row in payload["memories"]]
+        return SessionSnapshotResponse(**payload)
+
+    def restore_session(
+        self,
+        session_id: str,
+        request: SessionRestoreRequest,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        if request.mode == "delta":
+            return self.restore_delta(session_id, request)["restored"]
+        # Restores write synchronously; queued writes must land first so they can't clobber them.
+        self._read_barrier(session_id)
         if request.mode == "replace":
             self.delete_session(session_id)
 
@@ -406,17 +861,305 @@ class MemoryService:
                 session_id=session_id,
                 tags=item.tags,
             )
-            self.upsert_memory(upsert)
+            self._upsert_memory(upsert)
             count += 1
+            if progress is not None:
+                progress(1)
+        self._enforce_session_cap(session_id)
         return count
 
+    def restore_delta(self, session_id: str, request: SessionRestoreRequest) -> Dict[str, int]:
+        """Apply a delta: delete ``request.deleted``, then upsert ``request.memories``.
+
+        A memory whose stored content hash matches keeps its vectors; only its
+        name, tags and ``updated_at`` are rewritten.
+        """
+        self._read_barrier(session_id)
+        # Only ids this session owns; a replica cannot delete another session's memories.
+        owners = self._owners_of(list(dict.fromkeys(request.deleted))) if request.deleted else []
+        doomed = [item_id for item_id, owner in owners if owner == session_id]
+        self.delete_bulk(doomed)
+
+        upserts = [
+            MemoryUpsert(
+                id=item.id,
+                external_id=item.external_id,
+                content=item.content,
+                name=item.name,
+                session_id=session_id,
+                tags=item.tags,
+            )
+            for item in request.memories
+        ]
+        ids = [_derive_memory_id(upsert) for upsert in upserts]
+        stored: Dict[str, dict] = {}
+        if ids:
+            found = self.collection.get(ids=list(dict.fromkeys(ids)), include=["metadatas"])
+            stored = {
+                item_id: meta or {}
+                for item_id, meta in zip(found.get("ids") or [], found.get("metadatas") or [])
+            }
+
+        unchanged = 0
+        for block_id, upsert in zip(ids, upserts):
+            meta = stored.get(block_id)
+            if (
+                meta is not None
+                and meta.get("session_id") == session_id
+                and meta.get("content_hash") == content_hash(upsert.content)
+            ):
+                self._refresh_metadata(block_id, upsert, meta)
+                unchanged += 1
+            else:
+                self._upsert_memory(upsert)
+        if upserts:
+            _bump_versions(session_id)
+        self._enforce_session_cap(session_id)
+        return {"restored": len(upserts), "deleted": len(doomed), "unchanged": unchanged}
+
+    def _refresh_metadata(self, block_id: str, upsert: MemoryUpsert, meta: dict) -> None:
+        meta = dict(meta)
+        meta["name"] = upsert.name or "Unnamed Block"
+        meta["tags_json"] = json.dumps(upsert.tags)
+        meta["updated_at"] = _now_iso()
+        if upsert.external_id is not None:
+            meta["external_id"] = upsert.external_id
+        self.collection.update(ids=[block_id], metadatas=[meta])
+
+    def session_delta(
+        self,
+        session_id: str,
+        since: Optional[str] = None,
+        known: Optional[List[KnownMemory]] = None,
+    ) -> dict:
+        """Memories added or changed and ids deleted relative to ``known`` or ``since``."""
+        self._read_barrier(session_id)
+        # Taken before reading, so writes racing this read show up in the next delta too.
+        watermark = _now_iso()
+        held = {item.id: item for item in known or []}
+        since_at = None
+        if not held and since:
+            since_at = parse_iso(since)
+            if since_at is None:
+                raise ValidationError("since must be an ISO-8601 timestamp", details=since)
+            if since_at.tzinfo is None:
+                since_at = since_at.replace(tzinfo=timezone.utc)
+        reset = not held and (since_at is None or since_at < tombstone_horizon())
+
+        memories: List[dict] = []
+        present = set()
+        for row in self._iter_session_rows(session_id):
+            present.add(row["id"])
+            if reset:
+                changed = True
+            elif held:
+                mine = held.get(row["id"])
+                # A differing stamp catches name/tag edits, which leave the hash alone.
+                changed = (
+                    mine is None
+                    or mine.content_hash != row["content_hash"]
+                    or (mine.updated_at is not None and mine.updated_at != row["updated_at"])
+                )
+            else:
+                changed = _is_newer(row["updated_at"] or row["created_at"], since_at)
+            if changed:
+                memories.append(row)
+
+        if reset:
+            deleted: List[str] = []
+        elif held:
+            deleted = sorted(set(held) - present)
+        else:
+            deleted = sorted(set(deleted_since(session_id, since_at)) - present)
+        return {
+            "session_id": session_id,
+            "watermark": watermark,
+            "reset": reset,
+            "memories": memories,
+            "deleted": deleted,
+        }
+
+    def _iter_session_rows(self, session_id: str, page_size: int = 500) -> Iterator[dict]:
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where={"session_id": session_id},
+                limit=page_size,
+                offset=offset,
+                include=["metadatas", "documents"],
+            )
+            ids = page.get("ids") or []
+            for item_id, document, meta in zip(ids, page["documents"], page["metadatas"]):
+                meta = meta or {}
+                row = self._to_row(item_id, document, meta)
+                del row["distance"], row["score"]
+                row["content_hash"] = meta.get("content_hash") or content_hash(document or "")
+                yield row
+            if len(ids) < page_size:
+                return
+            offset += len(ids)
+
+    def fork_session(
+        self,
+        session_id: str,
+        target_session_id: str,
+        batch_size: int = 500,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Copy a session's memories into another session, reusing the stored vectors.
+
+        Copies get ids derived from the target session and the source id, and are
+        stamped ``forked_from``. ``progress`` is called with each batch's size.
+        """
+        self._read_barrier(session_id)
+        copied = 0
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where={"session_id": session_id},
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "metadatas", "documents"],
+            )
+            ids = page.get("ids") or []
+            if ids:
+                now = _now_iso()
+                parents = {item_id: _fork_memory_id(target_session_id, item_id) for item_id in ids}
+                metadatas = [
+                    {
+                        **meta,
+                        "session_id": target_session_id,
+                        "updated_at": now,
+                        "forked_from": item_id,
+                    }
+                    for item_id, meta in zip(ids, page["metadatas"])
+                ]
+                self.collection.upsert(
+                    ids=list(parents.values()),
+                    embeddings=[list(map(float, vector)) for vector in page["embeddings"]],
+                    metadatas=metadatas,
+                    documents=page["documents"],
+                )
+                copy_chunks(parents, target_session_id)
+                index_documents(
+                    (parents[item_id], target_session_id, document)
+                    for item_id, document in zip(ids, page["documents"])
+                )
+                copied += len(ids)
+                if progress is not None:
+                    progress(len(ids))
+            if len(ids) < batch_size:
+                break
+            offset += len(ids)
+        _bump_versions(target_session_id)
+        self._enforce_session_cap(target_session_id)
+        return copied
+
+    def move_session(
+        self,
+        session_id: str,
+        target_session_id: str,
+        batch_size: int = 500,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Relabel a session's memories to another session; ids and vectors are kept."""
+        self._read_barrier(session_id)
+        self._read_barrier(target_session_id)
+        moved = 0
+        while True:
+            # Relabeled rows leave the filter, so every pass reads the first page.
+            page = self.collection.get(
+                where={"session_id": session_id},
+                limit=batch_size,
+                include=["metadatas", "documents"],
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            now = _now_iso()
+            self.collection.update(
+                ids=ids,
+                metadatas=[
+                    {**meta, "session_id": target_session_id, "updated_at": now}
+                    for meta in page["metadatas"]
+                ],
+            )
+            relabel_chunks(ids, target_session_id)
+            index = get_lexical_index()
+            if index is not None:
+                index.remove(ids)
+            index_documents(
+                (item_id, target_session_id, document)
+                for item_id, document in zip(ids, page["documents"])
+            )
+            record_tombstones((item_id, session_id) for item_id in ids)
+            moved += len(ids)
+            if progress is not None:
+                progress(len(ids))
+        _bump_versions(session_id, target_session_id)
+        self._enforce_session_cap(target_session_id)
+        return moved
+
+    def _owners_of(self, ids: List[str]) -> List[Tuple[str, str]]:
+        found = self.collection.get(ids=ids, include=["metadatas"])
+        return [
+            (item_id, str(meta.get("session_id", "default")))
+            for item_id, meta in zip(found.get("ids") or [], found.get("metadatas") or [])
+            if meta
+        ]
+
     def delete_memory(self, block_id: str) -> None:
-        self.collection.delete(ids=[block_id])
+        self.delete_bulk([block_id])
 
     def delete_bulk(self, ids: List[str]) -> None:
         if not ids:
             return
+        self._flush_pending_ids(ids)
+        owners = self._owners_of(ids)
         self.collection.delete(ids=ids)
+        delete_chunks(parent_ids=ids)
+        index = get_lexical_index()
+        if index is not None:
+            index.remove(ids)
+        record_tombstones(owners)
+        _bump_versions(*sorted({session_id for _, session_id in owners}))
+
+    def delete_session(
+        self,
+        session_id: str,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """Delete every memory in a session; returns how many.
 
-    def delete_session(self, session_id: str) -> None:
+        With ``batch_size``, memories go ``batch_size`` at a time and ``progress``
+        is called after each batch, so a caller can report on or stop a large delete.
+        """
+        self._read_barrier(session_id)
+        index = get_lexical_index()
+        deleted = 0
+        if batch_size is not None:
+            while True:
+                ids = self.collection.get(
+                    where={"session_id": session_id}, limit=batch_size, include=[]
+                ).get("ids") or []
+                if not ids:
+                    break
+                self.collection.delete(ids=ids)
+                delete_chunks(parent_ids=ids)
+                if index is not None:
+                    index.remove(ids)
+                record_tombstones((item_id, session_id) for item_id in ids)
+                # Per batch, so a delete stopped halfway still invalidates cached reads.
+                _bump_versions(session_id)
+                deleted += len(ids)
+                if progress is not None:
+                    progress(len(ids))
+        ids = self.collection.get(where={"session_id": session_id}, include=[]).get("ids") or []
         self.collection.delete(where={"session_id": session_id})
+        record_tombstones((item_id, session_id) for item_id in ids)
+        delete_chunks(session_id=session_id)
+        if index is not None:
+            index.drop_session(session_id)
+        _bump_versions(session_id)
+        return deleted + len(ids)
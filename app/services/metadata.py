@@ -0,0 +1,41 @@
+"""Readers for the fields stored in each memory's Chroma metadata."""
+
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+
+
+def extract_tags(meta: dict) -> List[str]:
+    """Tags from ``tags_json``, falling back to the legacy ``tags`` list or CSV string."""
+    tags_json = meta.get("tags_json")
+    if isinstance(tags_json, str) and tags_json:
+        try:
+            parsed = json.loads(tags_json)
+            if isinstance(parsed, list):
+                return [str(item) for item in parsed]
+        except json.JSONDecodeError:
+            pass
+
+    legacy = meta.get("tags")
+    if isinstance(legacy, list):
+        return [str(item) for item in legacy]
+    if isinstance(legacy, str) and legacy:
+        return [tag for tag in legacy.split(",") if tag]
+    return []
+
+
+def parse_iso(raw: Optional[str]) -> Optional[datetime]:
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def as_utc(raw: object) -> Optional[datetime]:
+    """``raw`` as an aware datetime (naive stamps are UTC); None if it is not a valid stamp."""
+    parsed = parse_iso(raw) if isinstance(raw, str) else None
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
@@ -0,0 +1,386 @@
+"""Online rebuild of the memory collections with the configured HNSW settings.
+
+``ReindexJob`` copies every stored record, embeddings included (nothing is
+re-encoded), into new collections on a background thread and then swaps them in
+by rewriting the catalog pointer. While it copies, callers get
+``TrackingCollection`` wrappers: writes still land in the live collections and
+the ids (or delete filters) they touch are recorded. Those are replayed onto the
+new collections, the last time under the write lock right before the swap, so
+writes pause only for that final catch-up.
+"""
+
+import logging
+import random
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.database import (
+    LOGICAL_COLLECTIONS,
+    Database,
+    distance_space,
+    get_db_collection,
+    hnsw_metadata,
+)
+from app.core.errors import ConflictError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_WRITE_METHODS = ("add", "upsert", "update", "delete")
+_INCLUDE = ["embeddings", "metadatas", "documents"]
+
+Rows = Dict[str, list]
+# Applied to every copied page as ``transform(logical_name, rows)``.
+Transform = Callable[[str, Rows], Rows]
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _rows(page: dict) -> Rows:
+    embeddings = page.get("embeddings")
+    return {
+        "ids": list(page.get("ids") or []),
+        "embeddings": [list(map(float, vector)) for vector in embeddings]
+        if embeddings is not None
+        else [],
+        "metadatas": list(page.get("metadatas") or []),
+        "documents": list(page.get("documents") or []),
+    }
+
+
+@dataclass
+class ReindexStatus:
+    state: str = "idle"  # idle | running | succeeded | failed
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    source: Dict[str, str] = field(default_factory=dict)
+    target: Dict[str, str] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+    total: int = 0
+    copied: int = 0
+    caught_up: int = 0
+    error: Optional[str] = None
+
+
+class TrackingCollection:
+    """Live-collection wrapper handed out while a reindex copies; see module docstring."""
+
+    def __init__(self, logical: str, collection: Any, job: "ReindexJob"):
+        self._logical = logical
+        self._collection = collection
+        self._job = job
+
+    def __getattr__(self, name: str) -> Any:
+        current = self._job._current(self._logical, self._collection)
+        attr = getattr(current, name)
+        if name not in _WRITE_METHODS:
+            return attr
+
+        def call(**kwargs):
+            return self._job._write(self._logical, self._collection, name, kwargs)
+
+        return call
+
+
+class ReindexJob:
+    def __init__(self, batch_size: int = 500, transform: Optional[Transform] = None):
+        self.batch_size = max(1, batch_size)
+        self.transform = transform
+        self.status = ReindexStatus()
+        self._write_lock = threading.Lock()
+        self._dirty: Dict[str, Set[str]] = {}
+        self._deletes: Dict[str, List[dict]] = {}
+        self._sources: Dict[str, Any] = {}
+        self._targets: Dict[str, Any] = {}
+        self._swapped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> ReindexStatus:
+        if settings.CHROMA_MODE == "memory":
+            raise ValidationError(
+                "Reindex is not available in memory mode",
+                details="Memory mode rebuilds its collections with the current settings on restart",
+            )
+        if settings.CHROMA_MODE == "http":
+            # The swap only reaches this process: other workers would keep writing to the
+            # old collections, untracked during the copy and dropped after it.
+            raise ValidationError(
+                "Reindex is not available in http mode",
+                details="Other workers keep their collection handles and would lose writes",
+            )
+        if self.running:
+            raise ConflictError("A reindex is already running", details=self.status.target)
+        from app.services.embedding_migration import migration_pending
+
+        if migration_pending():
+            raise ConflictError("Finish or switch the pending embedding migration first")
+        self.status = ReindexStatus(
+            state="running", started_at=_utc_now(), params=hnsw_metadata()
+        )
+        self._thread = threading.Thread(target=self._run, name="reindex", daemon=True)
+        self._thread.start()
+        return self.status
+
+    def wait(self, timeout: Optional[float] = None) -> ReindexStatus:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status
+
+    def _run(self) -> None:
+        try:
+            self._prepare()
+            for logical in LOGICAL_COLLECTIONS:
+                self._copy_all(logical)
+            for logical in LOGICAL_COLLECTIONS:
+                self._copy_missing(logical)
+            self._catch_up()
+            with self._write_lock:
+                self._catch_up(holding_lock=True)
+                Database.activate(self.status.target, self._targets)
+                self._swapped = True
+            self._drop(self.status.source.values())
+            self.status.state = "succeeded"
+        except Exception as exc:
+            logger.exception("Reindex failed")
+            if not self._swapped:
+                Database.install(self._sources)
+                self._drop(self.status.target.values())
+            self.status.state = "failed"
+            self.status.error = str(exc)
+        finally:
+            self.status.finished_at = _utc_now()
+
+    def _prepare(self) -> None:
+        source = Database.active_names()
+        suffix = datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S%f")
+        target = {logical: f"{logical}_{suffix}" for logical in LOGICAL_COLLECTIONS}
+        self._drop_stale(set(source.values()))
+        self.status.source = source
+        self.status.target = target
+        self._sources = {logical: Database.open_physical(source[logical]) for logical in source}
+        self._targets = {logical: Database.open_physical(target[logical]) for logical in target}
+        self._dirty = {logical: set() for logical in LOGICAL_COLLECTIONS}
+        self._deletes = {logical: [] for logical in LOGICAL_COLLECTIONS}
+        self._swapped = False
+        self.status.total = sum(collection.count() for collection in self._sources.values())
+        Database.install(
+            {
+                logical: TrackingCollection(logical, collection, self)
+                for logical, collection in self._sources.items()
+            }
+        )
+
+    def _current(self, logical: str, source: Any) -> Any:
+        return self._targets[logical] if self._swapped else source
+
+    def _write(self, logical: str, source: Any, op: str, kwargs: dict) -> Any:
+        with self._write_lock:
+            if self._swapped:
+                return getattr(self._targets[logical], op)(**kwargs)
+            result = getattr(source, op)(**kwargs)
+            ids = kwargs.get("ids")
+            if ids:
+                self._dirty[logical].update([ids] if isinstance(ids, str) else ids)
+            if op == "delete" and kwargs.get("where"):
+                self._deletes[logical].append(kwargs["where"])
+            return result
+
+    def _put(self, logical: str, rows: Rows) -> None:
+        if self.transform is not None:
+            rows = self.transform(logical, rows)
+        if rows["ids"]:
+            self._targets[logical].upsert(**rows)
+
+    def _copy_all(self, logical: str) -> None:
+        source = self._sources[logical]
+        offset = 0
+        while True:
+            page = source.get(limit=self.batch_size, offset=offset, include=_INCLUDE)
+            ids = page.get("ids") or []
+            if ids:
+                self._put(logical, _rows(page))
+                self.status.copied += len(ids)
+            if len(ids) < self.batch_size:
+                return
+            offset += len(ids)
+
+    def _all_ids(self, collection: Any) -> Set[str]:
+        ids: Set[str] = set()
+        offset = 0
+        while True:
+            page = collection.get(limit=self.batch_size * 10, offset=offset, include=[])
+            batch = page.get("ids") or []
+            ids.update(batch)
+            if len(batch) < self.batch_size * 10:
+                return ids
+            offset += len(batch)
+
+    def _copy_missing(self, logical: str) -> None:
+        """Copy rows that offset paging skipped because deletes shifted the pages."""
+        missing = self._all_ids(self._sources[logical]) - self._all_ids(self._targets[logical])
+        self._recopy(logical, sorted(missing))
+
+    def _recopy(self, logical: str, ids: List[str]) -> None:
+        """Make the target match the source for ``ids`` (copy found rows, delete the rest)."""
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start : start + self.batch_size]
+            rows = _rows(self._sources[logical].get(ids=batch, include=_INCLUDE))
+            self._put(logical, rows)
+            gone = sorted(set(batch) - set(rows["ids"]))
+            if gone:
+                self._targets[logical].delete(ids=gone)
+            self.status.caught_up += len(batch)
+
+    def _drain(self, logical: str):
+        dirty, self._dirty[logical] = self._dirty[logical], set()
+        deletes, self._deletes[logical] = self._deletes[logical], []
+        return dirty, deletes
+
+    def _catch_up(self, holding_lock: bool = False) -> None:
+        """Replay writes recorded since the last catch-up onto the target collections.
+
+        Filtered deletes go first; recopying the dirty ids afterwards restores any
+        row written after such a delete.
+        """
+        for logical in LOGICAL_COLLECTIONS:
+            if holding_lock:
+                dirty, deletes = self._drain(logical)
+            else:
+                with self._write_lock:
+                    dirty, deletes = self._drain(logical)
+            for where in deletes:
+                self._targets[logical].delete(where=where)
+            self._recopy(logical, sorted(dirty))
+
+    def _drop(self, names) -> None:
+        client = Database.get_client()
+        for name in names:
+            try:
+                Database._call(lambda name=name: client.delete_collection(name))
+            except Exception:
+                logger.warning("Could not drop collection %s", name)
+
+    def _drop_stale(self, active: Set[str]) -> None:
+        """Drop half-built collections left by a reindex that died with its process."""
+        client = Database.get_client()
+        for collection in Database._call(client.list_collections):
+            name = getattr(collection, "name", collection)
+            if name in active:
+                continue
+            if any(name.startswith(f"{logical}_v") for logical in LOGICAL_COLLECTIONS):
+                Database._call(lambda name=name: client.delete_collection(name))
+
+
+def _exact_neighbors(matrix, query, space: str, k: int) -> List[int]:
+    import numpy as np
+
+    if space == "l2":
+        distances = ((matrix - query) ** 2).sum(axis=1)
+    elif space == "cosine":
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        distances = 1.0 - (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    else:
+        distances = 1.0 - matrix @ query
+    return list(np.argsort(distances, kind="stable")[:k])
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def index_report(sample_size: int = 50, k: int = 10, seed: int = 0) -> dict:
+    """Recall@k and query latency of the live HNSW index against exact search.
+
+    Queries are stored embeddings sampled with a fixed seed, so reports taken
+    before and after a reindex are comparable.
+    """
+    import numpy as np
+
+    collection = get_db_collection()
+    ids: List[str] = []
+    vectors: List[List[float]] = []
+    page_size = max(1, settings.REINDEX_BATCH_SIZE)
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings"])
+        batch = page.get("ids") or []
+        ids.extend(batch)
+        if batch:
+            vectors.extend(_rows(page)["embeddings"])
+        if len(batch) < page_size:
+            break
+        offset += len(batch)
+
+    space = distance_space(collection)
+    report = {
+        "collection": getattr(collection, "name", "memory_blocks"),
+        "count": len(ids),
+        "space": space,
+        "params": {key: value for key, value in (collection.metadata or {}).items()},
+        "configured": hnsw_metadata(),
+        "sample_size": 0,
+        "k": min(k, len(ids)),
+        "recall_at_k": None,
+        "latency_ms_p50": None,
+        "latency_ms_p95": None,
+        "exact_latency_ms_mean": None,
+    }
+    if not ids or k <= 0 or sample_size <= 0:
+        return report
+
+    matrix = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(ids))
+    sample = random.Random(seed).sample(range(len(ids)), min(sample_size, len(ids)))
+    recalls: List[float] = []
+    latencies: List[float] = []
+    exact_latencies: List[float] = []
+    for index in sample:
+        query = matrix[index]
+        started = time.perf_counter()
+        result = collection.query(
+            query_embeddings=[query.tolist()], n_results=k, include=["distances"]
+        )
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        started = time.perf_counter()
+        exact = {ids[i] for i in _exact_neighbors(matrix, query, space, k)}
+        exact_latencies.append((time.perf_counter() - started) * 1000.0)
+        found = set((result.get("ids") or [[]])[0])
+        recalls.append(len(found & exact) / k)
+
+    report.update(
+        sample_size=len(sample),
+        k=k,
+        recall_at_k=round(statistics.fmean(recalls), 4),
+        latency_ms_p50=round(_percentile(latencies, 0.5), 3),
+        latency_ms_p95=round(_percentile(latencies, 0.95), 3),
+        exact_latency_ms_mean=round(statistics.fmean(exact_latencies), 3),
+    )
+    return report
+
+
+reindex_job: Optional[ReindexJob] = None
+
+
+def get_reindex_job() -> ReindexJob:
+    global reindex_job
+    if reindex_job is None:
+        reindex_job = ReindexJob(batch_size=settings.REINDEX_BATCH_SIZE)
+    return reindex_job
+
+
+def reset_reindex_job() -> None:
+    global reindex_job
+    if reindex_job is not None:
+        reindex_job.wait(timeout=30)
+    reindex_job = None
@@ -0,0 +1,242 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import get_db_collection
+from app.services.memory_service import MemoryService
+from app.services.metadata import as_utc, extract_tags
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """Expiry rules; a memory is expired as soon as any rule matches.
+
+    TTLs count from ``created_at``. The longest matching session prefix
+    overrides the default TTL. ``max_age_seconds`` counts from ``updated_at``.
+    A value of 0 disables a rule.
+    """
+
+    default_ttl_seconds: int = 0
+    session_prefix_ttls: Dict[str, int] = field(default_factory=dict)
+    tag_ttls: Dict[str, int] = field(default_factory=dict)
+    max_age_seconds: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "RetentionPolicy":
+        return cls(
+            default_ttl_seconds=settings.RETENTION_DEFAULT_TTL_SECONDS,
+            session_prefix_ttls=dict(settings.RETENTION_SESSION_PREFIX_TTLS),
+            tag_ttls=dict(settings.RETENTION_TAG_TTLS),
+            max_age_seconds=settings.RETENTION_MAX_AGE_SECONDS,
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.default_ttl_seconds > 0
+            or any(ttl > 0 for ttl in self.session_prefix_ttls.values())
+            or any(ttl > 0 for ttl in self.tag_ttls.values())
+            or self.max_age_seconds > 0
+        )
+
+    def _session_ttl(self, session_id: str) -> Tuple[int, str]:
+        best_prefix: Optional[str] = None
+        for prefix in self.session_prefix_ttls:
+            if session_id.startswith(prefix) and (
+                best_prefix is None or len(prefix) > len(best_prefix)
+            ):
+                best_prefix = prefix
+        if best_prefix is not None:
+            return self.session_prefix_ttls[best_prefix], f"session_ttl:{best_prefix}"
+        return self.default_ttl_seconds, "default_ttl"
+
+    def expiry_reason(self, meta: dict, now: datetime) -> Optional[str]:
+        created = as_utc(meta.get("created_at"))
+        updated = as_utc(meta.get("updated_at")) or created
+        if created is None:
+            return None
+        created_age = (now - created).total_seconds()
+
+        ttl, reason = self._session_ttl(str(meta.get("session_id") or ""))
+        if ttl > 0 and created_age > ttl:
+            return reason
+
+        for tag in extract_tags(meta):
+            tag_ttl = self.tag_ttls.get(tag, 0)
+            if tag_ttl > 0 and created_age > tag_ttl:
+                return f"tag_ttl:{tag}"
+
+        if self.max_age_seconds > 0 and updated is not None:
+            if (now - updated).total_seconds() > self.max_age_seconds:
+                return "max_age"
+        return None
+
+
+@dataclass
+class RetentionMetrics:
+    runs: int = 0
+    deleted_total: int = 0
+    seconds_total: float = 0.0
+    last_run_at: Optional[str] = None
+    last_run_deleted: int = 0
+    last_run_seconds: float = 0.0
+    last_error: Optional[str] = None
+    deleted_by_reason: Dict[str, int] = field(default_factory=dict)
+
+
+class RetentionWorker:
+    """Applies a ``RetentionPolicy`` in rate-limited batches.
+
+    Periodic runs are scheduled by the job manager (``app.services.jobs``).
+    """
+
+    def __init__(
+        self,
+        policy: RetentionPolicy,
+        interval_seconds: float = 300.0,
+        scan_page_size: int = 1000,
+        delete_batch_size: int = 200,
+        max_deletes_per_second: float = 500.0,
+    ):
+        self.policy = policy
+        self.interval_seconds = interval_seconds
+        self.scan_page_size = max(1, scan_page_size)
+        self.delete_batch_size = max(1, delete_batch_size)
+        self.max_deletes_per_second = max_deletes_per_second
+        self.metrics = RetentionMetrics()
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def iter_expired(
+        self, now: Optional[datetime] = None, deleting: bool = False
+    ) -> Iterator[List[Tuple[str, str]]]:
+        """Yield ``(id, reason)`` for expired memories, one scan page at a time.
+
+        With ``deleting``, the caller deletes each page's ids before asking for
+        the next, so the scan offset skips only the rows that are left.
+        """
+        if not self.policy.active:
+            return
+        now = now or datetime.now(timezone.utc)
+        collection = get_db_collection()
+        offset = 0
+        while True:
+            page = collection.get(
+                limit=self.scan_page_size,
+                offset=offset,
+                include=["metadatas"],
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                break
+            expired = [
+                (item_id, reason)
+                for item_id, meta in zip(ids, page.get("metadatas") or [])
+                if (reason := self.policy.expiry_reason(meta or {}, now)) is not None
+            ]
+            if expired:
+                yield expired
+            if len(ids) < self.scan_page_size:
+                break
+            offset += len(ids) - (len(expired) if deleting else 0)
+
+    def find_expired(self, now: Optional[datetime] = None) -> List[Tuple[str, str]]:
+        """Return ``(id, reason)`` for every expired memory without deleting anything."""
+        return [item for page in self.iter_expired(now) for item in page]
+
+    def report(self, sample_limit: int = 20) -> dict:
+        expired = self.find_expired()
+        by_reason: Dict[str, int] = {}
+        for _, reason in expired:
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+        return {
+            "policy_active": self.policy.active,
+            "candidates": len(expired),
+            "by_reason": by_reason,
+            "sample_ids": [item_id for item_id, _ in expired[:sample_limit]],
+        }
+
+    def run_once(self, should_stop: Optional[Callable[[], bool]] = None) -> int:
+        """Delete everything expired now, a scan page at a time.
+
+        ``should_stop`` is checked between batches.
+        """
+        with self._run_lock:
+            started = time.monotonic()
+            deleted = 0
+            try:
+                service = MemoryService()
+                for batch in self._delete_batches(self.iter_expired(deleting=True)):
+                    if self._stop.is_set() or (should_stop is not None and should_stop()):
+                        break
+                    batch_started = time.monotonic()
+                    service.delete_bulk([item_id for item_id, _ in batch])
+                    deleted += len(batch)
+                    for _, reason in batch:
+                        by_reason = self.metrics.deleted_by_reason
+                        by_reason[reason] = by_reason.get(reason, 0) + 1
+                    if self.max_deletes_per_second > 0:
+                        budget = len(batch) / self.max_deletes_per_second
+                        pause = budget - (time.monotonic() - batch_started)
+                        if pause > 0:
+                            self._stop.wait(pause)
+                self.metrics.last_error = None
+            except Exception as exc:
+                logger.exception("Retention run failed")
+                self.metrics.last_error = str(exc)
+
+            elapsed = time.monotonic() - started
+            self.metrics.runs += 1
+            self.metrics.deleted_total += deleted
+            self.metrics.seconds_total += elapsed
+            self.metrics.last_run_at = datetime.now(timezone.utc).isoformat()
+            self.metrics.last_run_deleted = deleted
+            self.metrics.last_run_seconds = elapsed
+            return deleted
+
+    def _delete_batches(
+        self, pages: Iterator[List[Tuple[str, str]]]
+    ) -> Iterator[List[Tuple[str, str]]]:
+        for page in pages:
+            for start in range(0, len(page), self.delete_batch_size):
+                yield page[start : start + self.delete_batch_size]
+
+    @property
+    def running(self) -> bool:
+        """True while a run is deleting."""
+        return self._run_lock.locked()
+
+    def stop(self) -> None:
+        """Make an in-flight run stop after its current batch."""
+        self._stop.set()
+
+
+retention_worker: Optional[RetentionWorker] = None
+
+
+def reset_retention_worker() -> None:
+    global retention_worker
+    if retention_worker is not None:
+        retention_worker.stop()
+    retention_worker = None
+
+
+def get_retention_worker() -> RetentionWorker:
+    global retention_worker
+    if retention_worker is not None:
+        return retention_worker
+
+    retention_worker = RetentionWorker(
+        RetentionPolicy.from_settings(),
+        interval_seconds=settings.RETENTION_INTERVAL_SECONDS,
+        scan_page_size=settings.RETENTION_SCAN_PAGE_SIZE,
+        delete_batch_size=settings.RETENTION_DELETE_BATCH_SIZE,
+        max_deletes_per_second=settings.RETENTION_MAX_DELETES_PER_SECOND,
+    )
+    return retention_worker
@@ -0,0 +1,118 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.core.database import get_db_collection
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalTracker:
+    """Buffers last-retrieved timestamps and writes them to metadata in batches.
+
+    Queries only touch an in-memory dict; a background thread merges the
+    buffered timestamps into ``last_retrieved_at`` every ``flush_seconds`` or
+    once ``max_pending`` ids are waiting.
+    """
+
+    def __init__(self, flush_seconds: float = 30.0, max_pending: int = 5000):
+        self.flush_seconds = flush_seconds
+        self.max_pending = max(1, max_pending)
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, ids: Iterable[str]) -> None:
+        stamp = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            for item_id in ids:
+                self._pending[item_id] = stamp
+            overflow = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if overflow:
+            self._wake.set()
+
+    def pending(self, ids: Iterable[str]) -> Dict[str, str]:
+        with self._lock:
+            return {item_id: self._pending[item_id] for item_id in ids if item_id in self._pending}
+
+    def forget(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for item_id in ids:
+                self._pending.pop(item_id, None)
+
+    def flush(self) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            collection = get_db_collection()
+            existing = collection.get(ids=list(batch), include=[])
+            ids = existing.get("ids") or []
+            if ids:
+                collection.update(
+                    ids=ids,
+                    metadatas=[{"last_retrieved_at": batch[item_id]} for item_id in ids],
+                )
+        except Exception:
+            with self._lock:
+                for item_id, stamp in batch.items():
+                    self._pending.setdefault(item_id, stamp)
+            raise
+        return len(ids)
+
+    def stop(self) -> None:
+        """Stop the flush thread; the last buffered timestamps are written on the way out."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop, name="retrieval-tracker", daemon=True
+            )
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing retrieval timestamps failed")
+
+
+retrieval_tracker: Optional[RetrievalTracker] = None
+
+
+def reset_retrieval_tracker() -> None:
+    global retrieval_tracker
+    if retrieval_tracker is not None:
+        retrieval_tracker.stop()
+    retrieval_tracker = None
+
+
+def get_retrieval_tracker() -> RetrievalTracker:
+    global retrieval_tracker
+    if retrieval_tracker is not None:
+        return retrieval_tracker
+
+    retrieval_tracker = RetrievalTracker(
+        flush_seconds=settings.RETRIEVAL_TRACKING_FLUSH_SECONDS,
+        max_pending=settings.RETRIEVAL_TRACKING_MAX_PENDING,
+    )
+    return retrieval_tracker
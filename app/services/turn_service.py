@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+from pydantic import ValidationError as PydanticValidationError
+
+from app.core.errors import ValidationError
+from app.models.schemas import HybridMemoryQuery, MemoryUpsert, TurnRequest
+from app.services.automation_policy import PolicyEngine
+from app.services.chunking import assemble, embedding_inputs
+from app.services.memory_service import MemoryService
+
+
+class TurnService:
+    """One agent turn in one call: save the previous turn, retrieve for the next.
+
+    The previous output is saved first (when the policy fires) so the new
+    prompt's context already includes it. The prompt and the output's chunks
+    are deduplicated and encoded in a single batch, so a prompt that repeats
+    the previous output costs one encode.
+    """
+
+    def __init__(self, memory_service: MemoryService, policy: PolicyEngine):
+        self.memory_service = memory_service
+        self.policy = policy
+
+    def run(self, request: TurnRequest) -> Dict[str, object]:
+        decision = self.policy.evaluate(
+            request.previous_input,
+            request.previous_output,
+            always_save=request.always_save,
+            explicit_memory_command=request.explicit_memory_command,
+        )
+        save = decision.save and bool(request.previous_output.strip())
+        save_reason = decision.save_reason if save or not decision.save else "empty_output"
+
+        texts = [request.prompt]
+        if save:
+            texts.extend(embedding_inputs(request.previous_output))
+        unique = list(dict.fromkeys(texts))
+        vectors = dict(zip(unique, self._encode_batch(unique)))
+
+        memory = None
+        if save:
+            upsert = self._build_upsert(request)
+            embedded = assemble(request.previous_output, [vectors[text] for text in texts[1:]])
+            memory = self.memory_service.upsert_memory(upsert, embedded=embedded)
+
+        rows = self.memory_service.query_hybrid_rows(
+            HybridMemoryQuery(
+                query_text=request.prompt,
+                session_id=request.session_id,
+                top_k=request.top_k,
+                candidate_k=request.candidate_k,
+                recency_weight=request.recency_weight,
+                similarity_weight=request.similarity_weight,
+            ),
+            query_embedding=vectors[request.prompt],
+        )
+        return {
+            "session_id": request.session_id,
+            "saved": save,
+            "save_reason": save_reason,
+            "confidence_low": decision.confidence_low,
+            "confidence_reason": decision.confidence_reason,
+            "memory": memory,
+            "results": rows,
+        }
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        return [list(vector) for vector in self.memory_service.embedder.encode_batch(texts)]
+
+    def _build_upsert(self, request: TurnRequest) -> MemoryUpsert:
+        try:
+            return MemoryUpsert(
+                content=request.previous_output,
+                name=request.memory_name,
+                session_id=request.session_id,
+                tags=request.memory_tags,
+                external_id=request.memory_external_id,
+            )
+        except PydanticValidationError as exc:
+            raise ValidationError("Invalid memory for turn", details=str(exc))
+
@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.database import get_db_collection
+from app.services.chunking import EmbeddedDocument, embed_documents, write_chunks
+from app.services.delta_sync import content_hash, record_tombstones
+from app.services.embedder import get_embedder
+from app.services.lexical_index import index_documents
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingWrite:
+    seq: int
+    id: str
+    session_id: str
+    document: str
+    metadata: dict
+    # Vector computed by the caller, if any. Kept in memory only: replayed writes re-embed.
+    embedded: Optional[EmbeddedDocument] = field(default=None, compare=False)
+
+    def record(self) -> dict:
+        return {
+            "op": "write",
+            "seq": self.seq,
+            "id": self.id,
+            "session_id": self.session_id,
+            "document": self.document,
+            "metadata": self.metadata,
+        }
+
+
+class WriteBehindBuffer:
+    """Acknowledges writes once they are journaled and embeds/upserts them in batches.
+
+    Every accepted write is appended to a JSONL journal (fsynced) before the
+    caller gets its response. A background thread embeds pending writes with
+    ``encode_batch`` and upserts them into Chroma, then appends an ack record.
+    Unacked writes are replayed on startup.
+
+    Readers call ``flush(session_id)`` first; it drains that session's pending
+    writes on the caller's thread, so a query never misses an acknowledged write.
+    Queued writes for the same ids in other sessions are drained with them, so
+    an id moved between sessions always ends up in its newest session.
+    """
+
+    def __init__(
+        self,
+        journal_path: str,
+        batch_size: int = 64,
+        flush_interval_ms: float = 50.0,
+        fsync: bool = True,
+        on_flushed: Optional[Callable[[Set[str]], None]] = None,
+    ):
+        self.journal_path = journal_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(flush_interval_ms, 1.0) / 1000.0
+        self.fsync = fsync
+        self.on_flushed = on_flushed
+        self.flushed_total = 0
+        self._pending: List[PendingWrite] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        # Re-entrant: the post-flush cap hook may delete ids and flush again.
+        self._flush_lock = threading.RLock()
+        self._journal_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        directory = os.path.dirname(os.path.abspath(journal_path))
+        os.makedirs(directory, exist_ok=True)
+        self._journal = open(journal_path, "a+", encoding="utf-8")
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def has_pending(
+        self,
+        session_id: Optional[str] = None,
+        ids: Optional[List[str]] = None,
+    ) -> bool:
+        with self._lock:
+            if ids is not None:
+                wanted = set(ids)
+                return any(write.id in wanted for write in self._pending)
+            if session_id is None:
+                return bool(self._pending)
+            return any(write.session_id == session_id for write in self._pending)
+
+    def pending_metadata(self, block_id: str) -> Optional[dict]:
+        """Metadata of the newest queued write for ``block_id``, if any."""
+        with self._lock:
+            for write in reversed(self._pending):
+                if write.id == block_id:
+                    return dict(write.metadata)
+        return None
+
+    def submit(
+        self,
+        block_id: str,
+        session_id: str,
+        document: str,
+        metadata: dict,
+        embedded: Optional[EmbeddedDocument] = None,
+    ) -> None:
+        with self._lock:
+            self._seq += 1
+            write = PendingWrite(self._seq, block_id, session_id, document, metadata, embedded)
+            self._append(write.record())
+            self._pending.append(write)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """Embed and upsert pending writes (all, or one session's) before returning."""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    candidates = self._pending
+                    if session_id is not None:
+                        ids = {w.id for w in self._pending if w.session_id == session_id}
+                        candidates = [write for write in self._pending if write.id in ids]
+                    batch = candidates[: self.batch_size]
+                if not batch:
+                    break
+                self._write_batch(batch)
+                flushed += len(batch)
+        return flushed
+
+    def recover(self) -> int:
+        """Re-queue journaled writes that were never acknowledged as flushed."""
+        writes: Dict[int, PendingWrite] = {}
+        acked: Set[int] = set()
+        with self._journal_lock:
+            self._journal.seek(0)
+            for line in self._journal:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping torn write-behind journal line")
+                    continue
+                if record.get("op") == "write":
+                    record.pop("op")
+                    writes[record["seq"]] = PendingWrite(**record)
+                elif record.get("op") == "ack":
+                    acked.update(record.get("seqs") or [])
+        recovered = [writes[seq] for seq in sorted(writes) if seq not in acked]
+        with self._lock:
+            self._pending = recovered + self._pending
+            self._seq = max([self._seq] + list(writes))
+            self._rewrite_journal()
+        if recovered:
+            logger.info("Recovered %d unflushed writes from %s", len(recovered), self.journal_path)
+        return len(recovered)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final write-behind flush failed; writes stay in the journal")
+        with self._journal_lock:
+            self._journal.close()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed; retrying")
+                self._stop.wait(1.0)
+
+    def _write_batch(self, batch: List[PendingWrite]) -> None:
+        # Chroma rejects duplicate ids in one call; the latest write for an id wins.
+        latest: Dict[str, PendingWrite] = {}
+        for write in batch:
+            latest[write.id] = write
+        writes = list(latest.values())
+        embedder = get_embedder()
+        fresh = iter(
+            embed_documents(embedder, [w.document for w in writes if w.embedded is None])
+        )
+        embedded = [w.embedded if w.embedded is not None else next(fresh) for w in writes]
+        collection = get_db_collection()
+        stored = collection.get(ids=list(latest), include=["metadatas"])
+        moved = [
+            (block_id, meta["session_id"])
+            for block_id, meta in zip(stored.get("ids") or [], stored.get("metadatas") or [])
+            if meta and meta.get("session_id") not in (None, latest[block_id].session_id)
+        ]
+        collection.upsert(
+            ids=[write.id for write in writes],
+            embeddings=[document.embedding for document in embedded],
+            metadatas=[
+                {
+                    **write.metadata,
+                    "chunk_count": len(document.chunks),
+                    "embedding_model": embedder.model_id,
+                    "content_hash": content_hash(write.document),
+                }
+                for write, document in zip(writes, embedded)
+            ],
+            documents=[write.document for write in writes],
+        )
+        write_chunks(
+            (write.id, write.session_id, document) for write, document in zip(writes, embedded)
+        )
+        index_documents((write.id, write.session_id, write.document) for write in writes)
+        # Moved: replicas of the old session must drop it.
+        record_tombstones(moved)
+        done = {write.seq for write in batch}
+        with self._lock:
+            self._append({"op": "ack", "seqs": sorted(done)})
+            self._pending = [write for write in self._pending if write.seq not in done]
+            if not self._pending:
+                self._rewrite_journal()
+        self.flushed_total += len(batch)
+        if self.on_flushed is not None:
+            self.on_flushed({write.session_id for write in writes})
+
+    def _append(self, record: dict) -> None:
+        with self._journal_lock:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+
+    def _rewrite_journal(self) -> None:
+        """Compact the journal down to the still-pending writes. Caller holds ``_lock``."""
+        with self._journal_lock:
+            tmp_path = f"{self.journal_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as tmp:
+                for write in self._pending:
+                    tmp.write(json.dumps(write.record()) + "\n")
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            self._journal.close()
+            os.replace(tmp_path, self.journal_path)
+            self._journal = open(self.journal_path, "a+", encoding="utf-8")
+
+
+write_buffer: Optional[WriteBehindBuffer] = None
+_write_buffer_lock = threading.Lock()
+
+
+def write_behind_enabled() -> bool:
+    return settings.WRITE_BEHIND_ENABLED
+
+
+def reset_write_buffer() -> None:
+    global write_buffer
+    if write_buffer is not None:
+        write_buffer.stop()
+    write_buffer = None
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    global write_buffer
+    if write_buffer is not None:
+        return write_buffer
+
+    with _write_buffer_lock:
+        if write_buffer is None:
+            from app.services.memory_service import MemoryService
+
+            def enforce_caps(session_ids: Set[str]) -> None:
+                service = MemoryService()
+                for session_id in session_ids:
+                    service._enforce_session_cap(session_id)
+
+            journal_path = settings.WRITE_BEHIND_JOURNAL_PATH or os.path.join(
+                settings.CHROMA_DB_PATH, "write_behind.journal"
+            )
+            buffer = WriteBehindBuffer(
+                journal_path,
+                batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+                flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+                fsync=settings.WRITE_BEHIND_FSYNC,
+                on_flushed=enforce_caps,
+            )
+            buffer.recover()
+            buffer.start()
+            write_buffer = buffer
+    return write_buffer
@@ -0,0 +1,120 @@
+"""Shared timing, result and baseline-comparison helpers for benchmark suites."""
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+RESULT_SCHEMA_VERSION = 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    total_s = sum(samples_ms) / 1000.0
+    return {
+        "runs": len(samples_ms),
+        "min_ms": round(min(samples_ms), 4) if samples_ms else 0.0,
+        "mean_ms": round(statistics.fmean(samples_ms), 4) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 4),
+        "p95_ms": round(percentile(samples_ms, 95), 4),
+        "p99_ms": round(percentile(samples_ms, 99), 4),
+        "ops_per_sec": round(len(samples_ms) / total_s, 2) if total_s > 0 else 0.0,
+    }
+
+
+def measure(fn: Callable[[int], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Call ``fn(i)`` ``warmup + repeat`` times and summarize the timed runs."""
+    for i in range(warmup):
+        fn(-(i + 1))
+    samples: List[float] = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return summarize(samples)
+
+
+def result_key(row: Dict[str, object]) -> str:
+    params = row.get("params") or {}
+    suffix = ",".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"{row['name']}[{suffix}]"
+
+
+def build_report(suite: str, rows: List[Dict[str, object]], config: Dict[str, object]) -> dict:
+    return {
+        "schema_version": RESULT_SCHEMA_VERSION,
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": rows,
+    }
+
+
+def write_report(report: dict, out_file: Optional[Path]) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if out_file is None:
+        print(text)
+        return
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    out_file.write_text(text + "\n", encoding="utf-8")
+
+
+def load_report(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare_reports(
+    current: dict,
+    baseline: dict,
+    metric: str = "p50_ms",
+    threshold: float = 0.25,
+) -> List[Dict[str, object]]:
+    """Return one row per benchmark present in both reports.
+
+    A row is flagged as a regression when ``metric`` grew by more than
+    ``threshold`` (relative) over the baseline value.
+    """
+    base_rows = {result_key(row): row for row in baseline.get("results", [])}
+    compared: List[Dict[str, object]] = []
+    for row in current.get("results", []):
+        key = result_key(row)
+        base = base_rows.get(key)
+        if base is None:
+            continue
+        before = float(base.get(metric) or 0.0)
+        after = float(row.get(metric) or 0.0)
+        change = (after - before) / before if before > 0 else 0.0
+        compared.append(
+            {
+                "key": key,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": change > threshold,
+            }
+        )
+    return compared
+
+
+def print_comparison(rows: List[Dict[str, object]]) -> None:
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(
+            f"{flag:>10}  {row['key']:<60} "
+            f"{row['baseline']:>10.3f} -> {row['current']:>10.3f} ms ({row['change']:+.1%})"
+        )
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for MemoryService hot paths (offline, hash embedder).
+
+Examples:
+
+    python -m benchmarks.memory_service --sizes 1000,10000 --sessions 10,1000 \
+        --out bench/memory_service.json
+    python -m benchmarks.memory_service --compare bench/memory_service.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+os.environ.setdefault("EMBEDDING_PROVIDER", "hash")
+os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+import app.services.embedder as embedder_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import Database  # noqa: E402
+from app.core.versions import reset_write_versions  # noqa: E402
+from app.models.schemas import (  # noqa: E402
+    HybridMemoryQuery,
+    MemoryCreate,
+    MemoryQuery,
+    MemoryUpsert,
+    SessionRestoreRequest,
+)
+from app.services.lexical_index import reset_lexical_index  # noqa: E402
+from app.services.memory_service import MemoryService  # noqa: E402
+from app.services.retrieval_tracker import reset_retrieval_tracker  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    build_report,
+    compare_reports,
+    load_report,
+    measure,
+    print_comparison,
+    write_report,
+)
+
+SUITE = "memory_service"
+TAG_POOL = ["preference", "decision", "todo", "policy", "fact", "scratch", "pinned", "style"]
+WORDS = (
+    "user prefers concise answers about deployment fallback policy local model routing "
+    "weekend plans austin ticket release checklist snapshot restore session memory agent"
+).split()
+POPULATE_BATCH = 1000
+SCAN_OPS = {"list_sessions", "list_tags", "stats_overview", "snapshot_session"}
+
+
+def _parse_ints(raw: str) -> List[int]:
+    return [int(part) for part in raw.split(",") if part.strip()]
+
+
+def _sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _reset_store(db_path: str) -> None:
+    settings.CHROMA_DB_PATH = db_path
+    settings.EMBEDDING_PROVIDER = "hash"
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    embedder_module.reset_embedder()
+    # In-process state keyed to the previous store would leak into this run's numbers.
+    reset_lexical_index()
+    reset_write_versions()
+    reset_retrieval_tracker()
+
+
+def populate(store_size: int, sessions: int, seed: int = 7) -> None:
+    """Bulk-load ``store_size`` memories spread round-robin over ``sessions`` sessions."""
+    rng = random.Random(seed)
+    collection = Database.get_collection()
+    embedder = embedder_module.get_embedder()
+    now = datetime.now(timezone.utc)
+
+    for start in range(0, store_size, POPULATE_BATCH):
+        ids: List[str] = []
+        embeddings: List[List[float]] = []
+        metadatas: List[dict] = []
+        documents: List[str] = []
+        for i in range(start, min(start + POPULATE_BATCH, store_size)):
+            content = f"{_sentence(rng)} #{i}"
+            stamp = (now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))).isoformat()
+            ids.append(f"bench_{i}")
+            embeddings.append(embedder.encode(content))
+            documents.append(content)
+            metadatas.append(
+                {
+                    "name": f"Bench {i}",
+                    "session_id": f"bench:session:{i % sessions}",
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                    "tags_json": json.dumps(rng.sample(TAG_POOL, 2)),
+                }
+            )
+        collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+
+def build_operations(sessions: int, seed: int = 11) -> Dict[str, Callable[[int], object]]:
+    rng = random.Random(seed)
+    service = MemoryService()
+    hot_session = "bench:session:0"
+    # Without ids, so each restore creates fresh memories in its scratch session rather
+    # than moving the hot session's memories out from under the other operations.
+    restore_payload = [
+        MemoryUpsert(**item.model_dump(include={"content", "name", "tags"}))
+        for item in service.snapshot_session(hot_session, limit=50).memories
+    ]
+
+    def add_memory(_: int) -> object:
+        return service.add_memory(
+            MemoryCreate(
+                content=_sentence(rng),
+                name="bench add",
+                session_id=f"bench:session:{rng.randrange(sessions)}",
+                tags=["fact"],
+            )
+        )
+
+    def upsert_memory(i: int) -> object:
+        return service.upsert_memory(
+            MemoryUpsert(
+                external_id=f"bench:upsert:{i % 10}",
+                content=_sentence(rng),
+                name="bench upsert",
+                session_id=hot_session,
+                tags=["decision"],
+            )
+        )
+
+    def query_memories(_: int) -> object:
+        return service.query_memories(
+            MemoryQuery(query_text=_sentence(rng, 6), session_id=hot_session, top_k=5)
+        )
+
+    def query_memories_hybrid(_: int) -> object:
+        return service.query_memories_hybrid(
+            HybridMemoryQuery(
+                query_text=_sentence(rng, 6),
+                session_id=hot_session,
+                top_k=5,
+                candidate_k=20,
+            )
+        )
+
+    def restore_session(_: int) -> object:
+        scratch = f"bench:restore:{uuid.uuid4().hex[:8]}"
+        request = SessionRestoreRequest(mode="append", memories=restore_payload)
+        count = service.restore_session(scratch, request)
+        service.delete_session(scratch)
+        return count
+
+    return {
+        "add_memory": add_memory,
+        "upsert_memory": upsert_memory,
+        "query_memories": query_memories,
+        "query_memories_hybrid": query_memories_hybrid,
+        "list_sessions": lambda _: service.list_sessions(limit=50, offset=0),
+        "list_tags": lambda _: service.list_tags(limit=20, offset=0),
+        "stats_overview": lambda _: service.stats_overview(),
+        "snapshot_session": lambda _: service.snapshot_session(hot_session, limit=1000),
+        "restore_session": restore_session,
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    session_counts: List[int],
+    repeat: int,
+    scan_repeat: int,
+    only: List[str],
+) -> List[Dict[str, object]]:
+    rows: List[Dict[str, object]] = []
+    for store_size in sizes:
+        for sessions in session_counts:
+            if sessions > store_size:
+                continue
+            workdir = tempfile.mkdtemp(prefix="statelock-bench-")
+            try:
+                _reset_store(workdir)
+                print(f"populating memories={store_size} sessions={sessions}", file=sys.stderr)
+                populate(store_size, sessions)
+                for name, fn in build_operations(sessions).items():
+                    if only and name not in only:
+                        continue
+                    runs = scan_repeat if name in SCAN_OPS else repeat
+                    stats = measure(fn, repeat=runs)
+                    row = {
+                        "name": name,
+                        "params": {"memories": store_size, "sessions": sessions},
+                        **stats,
+                    }
+                    print(
+                        f"  {name:<24} p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms",
+                        file=sys.stderr,
+                    )
+                    rows.append(row)
+            finally:
+                Database._client = None
+                Database._collection = None
+                Database._chunk_collection = None
+                shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="StateLock MemoryService micro-benchmarks")
+    parser.add_argument("--sizes", default="1000,10000", help="Store sizes, e.g. 1000,10000,100000")
+    parser.add_argument("--sessions", default="10,1000", help="Session counts, e.g. 10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--scan-repeat", type=int, default=5, help="Runs for full-scan operations")
+    parser.add_argument("--only", default="", help="Comma-separated operation names to run")
+    parser.add_argument("--out", default="", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    sizes = _parse_ints(args.sizes)
+    session_counts = _parse_ints(args.sessions)
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    original_path = settings.CHROMA_DB_PATH
+    original_provider = settings.EMBEDDING_PROVIDER
+    try:
+        rows = run_suite(sizes, session_counts, args.repeat, args.scan_repeat, only)
+    finally:
+        settings.CHROMA_DB_PATH = original_path
+        settings.EMBEDDING_PROVIDER = original_provider
+        embedder_module.reset_embedder()
+
+    report = build_report(
+        SUITE,
+        rows,
+        {
+            "sizes": sizes,
+            "sessions": session_counts,
+            "repeat": args.repeat,
+            "scan_repeat": args.scan_repeat,
+            "embedding_provider": "hash",
+            "hash_embedding_dim": settings.HASH_EMBEDDING_DIM,
+        },
+    )
+    write_report(report, Path(args.out) if args.out else None)
+
+    if args.compare:
+        compared = compare_reports(
+            report, load_report(Path(args.compare)), args.metric, args.threshold
+        )
+        print_comparison(compared)
+        if any(row["regression"] for row in compared):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Throughput of the automation-policy engine on long model outputs.
+
+Compares the compiled ``PolicyEngine`` against the previous approach of one
+regex scan per pattern. The worst case for both is an output with no trigger,
+where every byte is scanned; ``--hit-rate`` mixes in outputs that do match.
+
+    python -m benchmarks.policy_engine --chars 2000,12000 --turns 200
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.services.automation_policy import (
+    LOW_CONFIDENCE_PATTERNS,
+    SAVE_TRIGGER_PATTERNS,
+    PolicyEngine,
+)
+from benchmarks.harness import (
+    build_report,
+    compare_reports,
+    load_report,
+    measure,
+    print_comparison,
+    write_report,
+)
+
+SUITE = "policy_engine"
+
+FILLER = (
+    "the deployment pipeline builds containers then runs integration checks against "
+    "staging before promoting artifacts to production clusters across regions "
+).split()
+
+
+def _legacy_evaluate(user_input: str, model_output: str) -> Tuple[bool, bool]:
+    text = f"{user_input}\n{model_output}".strip()
+    save = any(pattern.search(text) for pattern in SAVE_TRIGGER_PATTERNS)
+    low = any(pattern.search(model_output) for pattern in LOW_CONFIDENCE_PATTERNS)
+    return save, low
+
+
+def build_turns(count: int, chars: int, hit_rate: float, seed: int) -> List[Dict[str, str]]:
+    rng = random.Random(seed)
+    turns = []
+    for _ in range(count):
+        words: List[str] = []
+        while sum(len(word) + 1 for word in words) < chars:
+            words.append(rng.choice(FILLER))
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words)), rng.choice(["decision", "todo", "maybe"]))
+        turns.append({"user_input": "What is the rollout plan?", "model_output": " ".join(words)})
+    return turns
+
+
+def run_suite(char_sizes: List[int], turns: int, repeat: int, hit_rate: float) -> List[dict]:
+    engine = PolicyEngine()
+    rows = []
+    for chars in char_sizes:
+        batch = build_turns(turns, chars, hit_rate, seed=chars)
+        total_chars = sum(len(turn["model_output"]) for turn in batch)
+        cases = {
+            "legacy_per_pattern": lambda _: [
+                _legacy_evaluate(turn["user_input"], turn["model_output"]) for turn in batch
+            ],
+            "engine_batch": lambda _: engine.evaluate_batch(batch),
+        }
+        for name, fn in cases.items():
+            stats = measure(fn, repeat)
+            seconds = stats["mean_ms"] / 1000.0
+            stats["turns_per_sec"] = round(turns / seconds, 1) if seconds > 0 else 0.0
+            stats["mb_per_sec"] = round(total_chars / seconds / 1e6, 2) if seconds > 0 else 0.0
+            row = {"name": name, "params": {"chars": chars, "turns": turns}, **stats}
+            rows.append(row)
+            print(
+                f"  {name:<20} chars={chars:<6} turns/s={stats['turns_per_sec']:<10} "
+                f"MB/s={stats['mb_per_sec']}",
+                file=sys.stderr,
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="StateLock policy engine throughput benchmark")
+    parser.add_argument("--chars", default="2000,12000", help="Model output lengths")
+    parser.add_argument("--turns", type=int, default=200, help="Turns per evaluated batch")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--hit-rate", type=float, default=0.1)
+    parser.add_argument("--out", default="", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    char_sizes = [int(part) for part in args.chars.split(",") if part.strip()]
+    rows = run_suite(char_sizes, args.turns, args.repeat, args.hit_rate)
+    report = build_report(
+        SUITE,
+        rows,
+        {"turns": args.turns, "repeat": args.repeat, "hit_rate": args.hit_rate},
+    )
+    write_report(report, Path(args.out) if args.out else None)
+
+    if args.compare:
+        compared = compare_reports(
+            report, load_report(Path(args.compare)), args.metric, args.threshold
+        )
+        print_comparison(compared)
+        if any(row["regression"] for row in compared):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""Open-loop traffic replay modeled on agent tool calls.
+
+Each simulated agent turn follows ``examples/litellm-client/client_flow.py``:
+``query-hybrid`` for context, an ``upsert`` when the save policy fires on the
+synthetic model output, and an occasional session clear. Request bodies take
+their shape from ``examples/openclaw-tooling/example_tool_calls.json``.
+
+Turns arrive as a Poisson process at ``--rps`` regardless of how fast the
+server answers (open loop), and sessions are picked with Zipfian popularity.
+
+Examples:
+
+    python -m benchmarks.replay --rps 50 --duration 30            # in-process, hash embedder
+    python -m benchmarks.replay --base-url http://127.0.0.1:8000 --rps 200 --sessions 5000
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.services.automation_policy import should_save_memory
+from benchmarks.harness import (
+    build_report,
+    compare_reports,
+    load_report,
+    print_comparison,
+    summarize,
+    write_report,
+)
+
+SUITE = "replay"
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TOOL_CALLS_FILE = REPO_ROOT / "examples" / "openclaw-tooling" / "example_tool_calls.json"
+
+PROMPTS = [
+    "How should I respond?",
+    "Plan my weekend in Austin.",
+    "What did we decide about the fallback model?",
+    "Summarize the open todo items for ticket OPS-{n}.",
+    "Which deployment policy applies to release {n}?",
+]
+OUTPUTS = [
+    "Keep answers short and cite the saved preference.",
+    "Decision: use the local model first and escalate only on failure.",
+    "Todo: follow up on ticket OPS-{n} before the release checklist.",
+    "Here is a plan with three stops and a backup option for rain.",
+    "Policy: snapshots are exported nightly and restored on demand.",
+]
+
+Transport = Callable[[str, str, Optional[dict]], int]
+
+
+class ZipfSampler:
+    """Draws ranks ``0..n-1`` with probability proportional to ``1 / (rank + 1) ** s``."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        weights = [1.0 / ((rank + 1) ** s) for rank in range(n)]
+        total = sum(weights)
+        running = 0.0
+        self.cdf: List[float] = []
+        for weight in weights:
+            running += weight / total
+            self.cdf.append(running)
+
+    def sample(self) -> int:
+        return min(bisect.bisect_left(self.cdf, self.rng.random()), len(self.cdf) - 1)
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(elapsed_ms)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def load_tool_shapes(path: Path = TOOL_CALLS_FILE) -> Tuple[dict, dict]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    query = dict(data["memory.query"]["body"])
+    # Tool payloads name the field ``query``; the HTTP API expects ``query_text``.
+    query.pop("query", None)
+    query.pop("session_id", None)
+    save = dict(data["memory.save"]["body"])
+    save.pop("session_id", None)
+    save.pop("content", None)
+    return query, save
+
+
+def http_transport(base_url: str, api_key: str, timeout: float) -> Transport:
+    import requests
+
+    local = threading.local()
+    headers = {"X-Statelock-Api-Key": api_key} if api_key else {}
+
+    def send(method: str, path: str, body: Optional[dict]) -> int:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+            session.headers.update(headers)
+        resp = session.request(method, f"{base_url.rstrip('/')}{path}", json=body, timeout=timeout)
+        return resp.status_code
+
+    return send
+
+
+def in_process_transport(db_path: str) -> Transport:
+    from fastapi.testclient import TestClient
+
+    import app.services.embedder as embedder_module
+    from app.core.config import settings
+    from app.core.database import Database
+    from main import app
+
+    settings.CHROMA_DB_PATH = db_path
+    settings.EMBEDDING_PROVIDER = "hash"
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    embedder_module.reset_embedder()
+    client = TestClient(app)
+
+    def send(method: str, path: str, body: Optional[dict]) -> int:
+        return client.request(method, path, json=body).status_code
+
+    return send
+
+
+def run_replay(
+    transport: Transport,
+    sessions: int,
+    zipf_s: float,
+    rps: float,
+    duration: float,
+    workers: int,
+    clear_probability: float,
+    seed: int,
+) -> Tuple[LatencyRecorder, dict]:
+    rng = random.Random(seed)
+    sampler = ZipfSampler(sessions, zipf_s, rng)
+    query_shape, save_shape = load_tool_shapes()
+    recorder = LatencyRecorder()
+    lag_ms: List[float] = []
+    turns_done = [0]
+    done_lock = threading.Lock()
+
+    def timed(endpoint: str, method: str, path: str, body: Optional[dict]) -> bool:
+        start = time.perf_counter()
+        try:
+            status = transport(method, path, body)
+            ok = status < 400
+        except Exception:
+            ok = False
+        recorder.record(endpoint, (time.perf_counter() - start) * 1000.0, ok)
+        return ok
+
+    def turn(
+        session_rank: int,
+        slot: int,
+        prompt: str,
+        output: str,
+        clear: bool,
+        scheduled: float,
+    ) -> None:
+        session_id = f"replay:chat_{session_rank}:user_{session_rank}"
+        timed(
+            "query-hybrid",
+            "POST",
+            "/memories/query-hybrid",
+            {**query_shape, "session_id": session_id, "query_text": prompt},
+        )
+        if should_save_memory(user_input=prompt, model_output=output):
+            timed(
+                "upsert",
+                "POST",
+                "/memories/upsert",
+                {
+                    **save_shape,
+                    "external_id": f"replay:{session_rank}:{slot}",
+                    "session_id": session_id,
+                    "content": output,
+                },
+            )
+        if clear:
+            timed("clear-session", "DELETE", f"/memories/session/{quote(session_id)}", None)
+        recorder.record("turn", (time.perf_counter() - scheduled) * 1000.0, True)
+        with done_lock:
+            turns_done[0] += 1
+
+    # Open the store and load the embedder before the clock starts.
+    transport("GET", "/readyz", None)
+
+    pool = ThreadPoolExecutor(max_workers=workers)
+    started = time.perf_counter()
+    next_at = started
+    dispatched = 0
+    while True:
+        next_at += rng.expovariate(rps)
+        if next_at - started > duration:
+            break
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        lag_ms.append(max(time.perf_counter() - next_at, 0.0) * 1000.0)
+        n = rng.randrange(10_000)
+        pool.submit(
+            turn,
+            sampler.sample(),
+            n % 8,
+            rng.choice(PROMPTS).format(n=n),
+            rng.choice(OUTPUTS).format(n=n),
+            rng.random() < clear_probability,
+            next_at,
+        )
+        dispatched += 1
+    pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - started
+
+    requests_total = sum(
+        len(samples) for name, samples in recorder.samples.items() if name != "turn"
+    )
+    summary = {
+        "elapsed_s": round(elapsed, 3),
+        "turns_dispatched": dispatched,
+        "turns_completed": turns_done[0],
+        "requests_total": requests_total,
+        "throughput_rps": round(requests_total / elapsed, 2) if elapsed > 0 else 0.0,
+        "turns_per_sec": round(turns_done[0] / elapsed, 2) if elapsed > 0 else 0.0,
+        "dispatch_lag_p99_ms": summarize(lag_ms)["p99_ms"] if lag_ms else 0.0,
+    }
+    return recorder, summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="StateLock agent-traffic replay load generator")
+    parser.add_argument("--base-url", default="", help="Target server; omit to run in-process")
+    parser.add_argument("--api-key", default="")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for popularity")
+    parser.add_argument("--rps", type=float, default=20.0, help="Target turn arrival rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals")
+    parser.add_argument("--workers", type=int, default=64, help="Max in-flight turns")
+    parser.add_argument("--clear-probability", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--metric", default="p99_ms")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    workdir = ""
+    if args.base_url:
+        transport = http_transport(args.base_url, args.api_key, args.timeout)
+    else:
+        workdir = tempfile.mkdtemp(prefix="statelock-replay-")
+        os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+        transport = in_process_transport(workdir)
+
+    try:
+        recorder, summary = run_replay(
+            transport,
+            sessions=args.sessions,
+            zipf_s=args.zipf_s,
+            rps=args.rps,
+            duration=args.duration,
+            workers=args.workers,
+            clear_probability=args.clear_probability,
+            seed=args.seed,
+        )
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    params = {"rps": args.rps, "sessions": args.sessions}
+    rows = []
+    for endpoint in sorted(recorder.samples):
+        stats = summarize(recorder.samples[endpoint])
+        stats["errors"] = recorder.errors.get(endpoint, 0)
+        rows.append({"name": endpoint, "params": params, **stats})
+        print(
+            f"  {endpoint:<16} n={stats['runs']:<6} err={stats['errors']:<4} "
+            f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms",
+            file=sys.stderr,
+        )
+    print(f"  summary {json.dumps(summary)}", file=sys.stderr)
+
+    config = {
+        "target": args.base_url or "in-process",
+        "zipf_s": args.zipf_s,
+        "duration": args.duration,
+        "workers": args.workers,
+        "clear_probability": args.clear_probability,
+        "seed": args.seed,
+        "summary": summary,
+    }
+    report = build_report(SUITE, rows, config)
+    write_report(report, Path(args.out) if args.out else None)
+
+    if args.compare:
+        compared = compare_reports(
+            report, load_report(Path(args.compare)), args.metric, args.threshold
+        )
+        print_comparison(compared)
+        if any(row["regression"] for row in compared):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
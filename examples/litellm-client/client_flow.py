@@ -24,6 +24,8 @@ try:
             "similarity_weight": 0.75,
             "recency_weight": 0.25,
         },
+        # Ask StateLock to shed (503 + Retry-After) instead of queueing past our budget.
+        headers={"X-Statelock-Deadline-Ms": "500"},
         timeout=10,
     )
     context_resp.raise_for_status()
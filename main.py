@@ -1,5 +1,6 @@
 import logging
 import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -8,23 +9,63 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.database import Database
 from app.core.errors import AppError, InternalServiceError, ServiceUnavailableError
+from app.core.memory_store import reset_memory_store
 from app.models.errors import ErrorResponse
-from app.routers import insights, memories
+from app.routers import admin, insights, jobs, memories, policy, turns
 from app.services.embedder import get_embedder
+from app.services.embedding_migration import (
+    check_embedding_model,
+    get_embedding_migration,
+    migration_pending,
+    reset_embedding_migration,
+)
+from app.services.jobs import reset_job_manager, start_job_manager
+from app.services.retention import reset_retention_worker
+from app.services.retrieval_tracker import reset_retrieval_tracker
+from app.services.write_buffer import get_write_buffer, reset_write_buffer
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.WRITE_BEHIND_ENABLED:
+        # Replays unflushed journal entries and starts the flusher.
+        get_write_buffer()
+    # Hosts the periodic retention, compaction and counter-rebuild jobs.
+    start_job_manager()
+    if migration_pending():
+        get_embedding_migration().resume()
+    yield
+    # First: jobs write through the services torn down below.
+    reset_job_manager()
+    reset_embedding_migration()
+    reset_retention_worker()
+    reset_write_buffer()
+    reset_retrieval_tracker()
+    # Last: the final checkpoint must include writes flushed above.
+    reset_memory_store()
+
+
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description="Self-hosted memory sidecar for local-first agent workflows.",
+    lifespan=lifespan,
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
 app.include_router(memories.router, prefix=settings.API_PREFIX, tags=["Memories"])
 app.include_router(insights.router, tags=["Insights"])
+app.include_router(policy.router, prefix="/policy", tags=["Policy"])
+app.include_router(turns.router, tags=["Turns"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 site_app_path = Path(__file__).resolve().parent / "site" / "app"
 if site_app_path.exists():
@@ -53,7 +94,11 @@ async def app_error_handler(request: Request, exc: AppError):
         details=exc.details,
         trace_id=getattr(request.state, "trace_id", "unknown"),
     )
-    return JSONResponse(status_code=exc.status_code, content=payload.model_dump())
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=payload.model_dump(),
+        headers=exc.headers,
+    )
 
 
 @app.exception_handler(RequestValidationError)
@@ -97,8 +142,9 @@ async def healthz():
 @app.get("/readyz", tags=["Health"])
 async def readyz():
     try:
-        Database.get_collection()
+        Database.check_ready()
         get_embedder()
+        check_embedding_model()
     except Exception as exc:
         raise ServiceUnavailableError(details=str(exc))
     return {"status": "ready"}
@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.embedder as embedder_module
+from app.core.config import settings
+from app.core.database import Database
+from app.services.lexical_index import reset_lexical_index
+
+
+@pytest.fixture(scope="module")
+def memory_store(tmp_path_factory):
+    """Point the app at a throwaway Chroma store with the hash embedder for one module.
+
+    The directory is left for pytest to clean up: Chroma caches one system per
+    path, so deleting it here would let a later module reuse a stale path.
+    """
+    db_path = tmp_path_factory.mktemp("chroma")
+    original_path = settings.CHROMA_DB_PATH
+    original_provider = settings.EMBEDDING_PROVIDER
+
+    settings.CHROMA_DB_PATH = str(db_path)
+    settings.EMBEDDING_PROVIDER = "hash"
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    embedder_module.reset_embedder()
+    reset_lexical_index()
+
+    yield db_path
+
+    settings.CHROMA_DB_PATH = original_path
+    settings.EMBEDDING_PROVIDER = original_provider
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    embedder_module.reset_embedder()
+    reset_lexical_index()
+
+
+@pytest.fixture
+def client():
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def job_manager():
+    """The process job manager, torn down after the test so its threads don't leak."""
+    from app.services.jobs import get_job_manager, reset_job_manager
+
+    reset_job_manager()
+    yield get_job_manager()
+    reset_job_manager()
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import anyio
+import httpx
+import pytest
+
+from app.core.admission import (
+    AdmissionController,
+    get_admission_controller,
+    reset_admission_controller,
+)
+from app.core.config import settings
+from app.core.errors import ServiceUnavailableError
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+@pytest.fixture
+def single_slot():
+    original = settings.ADMISSION_MAX_CONCURRENT
+    settings.ADMISSION_MAX_CONCURRENT = 1
+    reset_admission_controller()
+    yield get_admission_controller()
+    settings.ADMISSION_MAX_CONCURRENT = original
+    reset_admission_controller()
+
+
+def test_queries_are_admitted_before_queued_bulk_work():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, initial_service_ms=1)
+        held = await controller.acquire("write", deadline_ms=1000)
+        order = []
+
+        async def worker(priority):
+            admitted_at = await controller.acquire(priority, deadline_ms=5000)
+            order.append(priority)
+            controller.release(priority, admitted_at)
+
+        bulk = asyncio.create_task(worker("bulk"))
+        await asyncio.sleep(0.01)
+        query = asyncio.create_task(worker("query"))
+        await asyncio.sleep(0.01)
+        controller.release("write", held)
+        await asyncio.wait_for(asyncio.gather(bulk, query), timeout=5)
+        return order
+
+    assert asyncio.run(scenario()) == ["query", "bulk"]
+
+
+def test_queued_requests_do_not_hold_threadpool_threads(single_slot):
+    """More concurrent requests than threads: waiters must not starve admitted endpoints."""
+    from main import app
+
+    async def burst():
+        # Sync endpoints and dependencies share this limiter; waiters must stay off it.
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 4
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/memories/query",
+                        json={"query_text": f"burst {i}", "top_k": 1},
+                        headers={"X-Statelock-Deadline-Ms": "20000"},
+                    )
+                    for i in range(24)
+                )
+            )
+        return [response.status_code for response in responses]
+
+    started = time.monotonic()
+    assert asyncio.run(burst()) == [200] * 24
+    assert time.monotonic() - started < 15
+    assert single_slot.snapshot()["admitted_total"] == 24
+
+
+def test_overload_is_shed_with_retry_after(client, single_slot):
+    held = asyncio.run(single_slot.acquire("query", deadline_ms=1000))
+    try:
+        shed = client.post(
+            "/memories/query",
+            json={"query_text": "anything", "top_k": 1},
+            headers={"X-Statelock-Deadline-Ms": "10"},
+        )
+    finally:
+        single_slot.release("query", held)
+
+    assert shed.status_code == 503
+    assert shed.json()["code"] == "service_unavailable"
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert single_slot.snapshot()["shed_total"]["query"] == 1
+
+    ok = client.post("/memories/query", json={"query_text": "anything", "top_k": 1})
+    assert ok.status_code == 200
+
+    bad = client.post(
+        "/memories/query",
+        json={"query_text": "anything"},
+        headers={"X-Statelock-Deadline-Ms": "soon"},
+    )
+    assert bad.status_code == 422
+
+
+def test_shed_without_waiting_when_estimate_exceeds_deadline():
+    controller = AdmissionController(max_concurrent=1, initial_service_ms=2000)
+    held = asyncio.run(controller.acquire("query", deadline_ms=1000))
+    started = time.monotonic()
+    with pytest.raises(ServiceUnavailableError) as excinfo:
+        asyncio.run(controller.acquire("bulk", deadline_ms=500))
+    assert time.monotonic() - started < 0.1
+    assert excinfo.value.headers == {"Retry-After": "2"}
+    controller.release("query", held)
+
+
+def test_streamed_snapshot_holds_its_bulk_slot_until_the_body_is_sent(client, single_slot):
+    from main import app
+
+    for i in range(3):
+        created = client.post(
+            "/memories/", json={"content": f"streamed {i}", "session_id": "stream-slot"}
+        )
+        assert created.status_code == 201
+
+    bulk_during_body = []
+
+    async def fetch():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/memories/session/stream-slot/snapshot",
+            "raw_path": b"/memories/session/stream-slot/snapshot",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test")],
+            "client": ("test", 1),
+            "server": ("test", 80),
+        }
+
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                bulk_during_body.append(single_slot.bulk_in_flight)
+
+        await app(scope, receive, send)
+
+    asyncio.run(fetch())
+
+    assert bulk_during_body and all(held == 1 for held in bulk_during_body)
+    assert single_slot.snapshot()["in_flight"] == 0
+    assert single_slot.bulk_in_flight == 0
@@ -25,6 +25,7 @@ def setup_test_db():
     settings.STATELOCK_API_KEY = ""
     Database._client = None
     Database._collection = None
+    Database._chunk_collection = None
     embedder_module.reset_embedder()
 
     yield
@@ -38,6 +39,7 @@ def setup_test_db():
     settings.STATELOCK_API_KEY = original_api_key
     Database._client = None
     Database._collection = None
+    Database._chunk_collection = None
     embedder_module.reset_embedder()
 
 
@@ -242,3 +244,107 @@ def test_insights_endpoints(client):
     tags_body = tags.json()
     assert tags_body["total"] >= 3
     assert len(tags_body["items"]) >= 3
+
+
+def test_field_projection_and_content_truncation(client):
+    sid = "projection_demo"
+    created = client.post(
+        "/memories/",
+        json={"content": "x" * 200, "name": "Long", "session_id": sid, "tags": ["bulk"]},
+    )
+    assert created.status_code == 201
+
+    hybrid = client.post(
+        "/memories/query-hybrid?fields=id,score,name",
+        json={"query_text": "long", "session_id": sid, "top_k": 1},
+    )
+    assert hybrid.status_code == 200
+    result = hybrid.json()["results"][0]
+    assert set(result) == {"id", "score", "name"}
+    assert result["score"] is not None
+
+    listed = client.get(f"/memories/?session_id={sid}&content_max_chars=10")
+    assert listed.json()["items"][0]["content"] == "x" * 10
+    assert listed.json()["items"][0]["tags"] == ["bulk"]
+
+    snap = client.get(f"/memories/session/{sid}/snapshot?fields=id,content&content_max_chars=5")
+    assert snap.json()["memories"] == [{"id": created.json()["id"], "content": "xxxxx"}]
+
+    bad = client.get(f"/memories/?session_id={sid}&fields=id,bogus")
+    assert bad.status_code == 422
+    assert bad.json()["code"] == "validation_error"
+
+    # Write-only: read rows never carry it, so projecting it would always return null.
+    write_only = client.get(f"/memories/?session_id={sid}&fields=id,ingest_action")
+    assert write_only.status_code == 422
+    assert write_only.json()["details"]["unknown"] == ["ingest_action"]
+
+    client.delete(f"/memories/session/{sid}")
+
+
+def test_ingest_dedup_refreshes_and_merges(client):
+    sid = "dedup_demo"
+    payload = {"content": "User prefers concise answers.", "session_id": sid, "tags": ["style"]}
+    first = client.post("/memories/", json={**payload, "dedup": True})
+    assert first.json()["ingest_action"] == "inserted"
+
+    again = client.post("/memories/", json={**payload, "tags": ["preference"], "dedup": True})
+    assert again.status_code == 201
+    body = again.json()
+    assert body["ingest_action"] == "refreshed"
+    assert body["id"] == first.json()["id"]
+    assert body["tags"] == ["style", "preference"]
+
+    original_action = settings.DEDUP_ACTION
+    settings.DEDUP_ACTION = "merge"
+    merged = client.post("/memories/", json={**payload, "name": "Style", "dedup": True})
+    settings.DEDUP_ACTION = original_action
+    assert merged.json()["ingest_action"] == "merged"
+    assert merged.json()["name"] == "Style"
+
+    other = client.post(
+        "/memories/", json={"content": "Deploy on Fridays", "session_id": sid, "dedup": True}
+    )
+    assert other.json()["ingest_action"] == "inserted"
+    assert client.get(f"/memories/?session_id={sid}").json()["total"] == 2
+
+    client.delete(f"/memories/session/{sid}")
+
+
+def test_ingest_dedup_catches_reworded_near_duplicates(client, monkeypatch):
+    # The n-gram embedder scores rewordings by shared word fragments, unlike the hash one.
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "ngram")
+    monkeypatch.setattr(settings, "NGRAM_EMBEDDING_DIM", settings.HASH_EMBEDDING_DIM)
+    monkeypatch.setattr(settings, "DEDUP_SIMILARITY_THRESHOLD", 0.85)
+    monkeypatch.setattr(settings, "DEDUP_ACTION", "merge")
+    embedder_module.reset_embedder()
+    sid = "dedup_reworded"
+    try:
+        first = client.post(
+            "/memories/",
+            json={"content": "User prefers concise answers.", "session_id": sid, "dedup": True},
+        ).json()
+        reworded = client.post(
+            "/memories/",
+            json={
+                "content": "The user prefers concise answers!",
+                "session_id": sid,
+                "dedup": True,
+            },
+        ).json()
+        assert reworded["ingest_action"] == "merged"
+        assert reworded["id"] == first["id"]
+        assert reworded["content"] == "The user prefers concise answers!"
+
+        # Similar, but below the threshold: kept as its own memory.
+        distinct = client.post(
+            "/memories/",
+            json={"content": "Users prefer concise answers", "session_id": sid, "dedup": True},
+        ).json()
+        assert distinct["ingest_action"] == "inserted"
+        assert distinct["id"] != first["id"]
+        assert client.get(f"/memories/?session_id={sid}").json()["total"] == 2
+        client.delete(f"/memories/session/{sid}")
+    finally:
+        monkeypatch.undo()
+        embedder_module.reset_embedder()
@@ -1,4 +1,5 @@
 from app.services.automation_policy import (
+    PolicyEngine,
     build_confidence_signal,
     derive_session_id,
     should_save_memory,
@@ -34,3 +35,42 @@ def test_confidence_signal():
         "Use local models for standard tasks and escalate only when correctness is critical."
     )
     assert ok["confidence_low"] is False
+
+
+def test_engine_compiles_configured_triggers_and_matches_legacy():
+    engine = PolicyEngine(save_triggers=["runbook", r"on[-\s]?call"], low_confidence_patterns=[])
+    decision = engine.evaluate(
+        "Update the on call rota", "Done, the rota now lists every engineer this week."
+    )
+    assert decision.save is True
+    assert decision.save_reason == r"trigger:on[-\s]?call"
+    assert decision.confidence_low is False
+    assert engine.evaluate("a decision", "ok").save is False
+
+    default = PolicyEngine()
+    for user_input, output in [
+        ("We made a decision", "Policy is local-first."),
+        ("hi", "hello there"),
+        ("", "I am not sure this works"),
+    ]:
+        assert default.should_save(user_input, output) == should_save_memory(user_input, output)
+        assert default.confidence(output) == build_confidence_signal(output)
+
+
+def test_policy_evaluate_endpoint_batches_turns(client):
+    resp = client.post(
+        "/policy/evaluate",
+        json={
+            "turns": [
+                {"user_input": "Any todo left?", "model_output": "Todo: ship it."},
+                {"user_input": "hi", "model_output": "hello", "always_save": True},
+                {"user_input": "hi", "model_output": "hello"},
+            ]
+        },
+    )
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["save_reason"] for r in results] == ["trigger:todo", "always_save", "none"]
+    assert [r["confidence_reason"] for r in results] == ["too_short"] * 3
+
+    assert client.post("/policy/evaluate", json={"turns": []}).status_code == 422
@@ -0,0 +1,40 @@
+import random
+
+from benchmarks.harness import compare_reports, percentile, summarize
+from benchmarks.replay import ZipfSampler, load_tool_shapes
+
+
+def _report(p50: float) -> dict:
+    return {
+        "results": [
+            {"name": "query_memories", "params": {"memories": 1000, "sessions": 10}, "p50_ms": p50}
+        ]
+    }
+
+
+def test_summarize_percentiles():
+    stats = summarize([1.0, 2.0, 3.0, 4.0])
+    assert stats["runs"] == 4
+    assert stats["p50_ms"] == 2.5
+    assert percentile([5.0], 99) == 5.0
+
+
+def test_compare_flags_regressions_only_over_threshold():
+    slower = compare_reports(_report(13.0), _report(10.0), threshold=0.25)
+    assert slower[0]["regression"] is True
+    assert slower[0]["key"] == "query_memories[memories=1000,sessions=10]"
+
+    within = compare_reports(_report(11.0), _report(10.0), threshold=0.25)
+    assert within[0]["regression"] is False
+
+
+def test_zipf_sampler_prefers_low_ranks_and_tool_shapes_load():
+    sampler = ZipfSampler(100, 1.1, random.Random(1))
+    draws = [sampler.sample() for _ in range(2000)]
+    assert all(0 <= rank < 100 for rank in draws)
+    assert draws.count(0) > draws.count(50)
+
+    query_shape, save_shape = load_tool_shapes()
+    assert "query" not in query_shape
+    assert query_shape["top_k"] == 5
+    assert save_shape["tags"]
@@ -0,0 +1,116 @@
+import shutil
+import socket
+import subprocess
+import time
+
+import httpx
+import pytest
+
+from app.core.chroma_remote import RetryingCollection
+from app.core.config import settings
+from app.core.database import Database
+from app.services.lexical_index import reset_lexical_index
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+class FlakyCollection:
+    name = "flaky"
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def count(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise httpx.ConnectError("connection refused")
+        return 7
+
+
+def test_retrying_collection_backs_off_on_transport_errors():
+    flaky = FlakyCollection(failures=2)
+    assert RetryingCollection(flaky, retries=2, backoff_seconds=0.001).count() == 7
+    assert flaky.calls == 3
+    assert RetryingCollection(flaky, retries=0, backoff_seconds=0.0).name == "flaky"
+
+    with pytest.raises(httpx.ConnectError):
+        RetryingCollection(FlakyCollection(failures=5), retries=1, backoff_seconds=0.001).count()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def chroma_server(tmp_path):
+    executable = shutil.which("chroma")
+    if executable is None:
+        pytest.skip("chroma CLI not installed")
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            executable,
+            "run",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--path",
+            str(tmp_path / "server"),
+            "--log-path",
+            str(tmp_path / "chroma.log"),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/v1/heartbeat", timeout=1).raise_for_status()
+            break
+        except httpx.HTTPError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.skip("local chroma server did not start")
+            time.sleep(0.25)
+
+    overrides = {"CHROMA_MODE": "http", "CHROMA_PORT": port, "CHROMA_HOST": "127.0.0.1"}
+    originals = {key: getattr(settings, key) for key in overrides}
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    reset_lexical_index()
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        for key, value in originals.items():
+            setattr(settings, key, value)
+        Database._client = None
+        Database._collection = None
+        Database._chunk_collection = None
+        reset_lexical_index()
+
+
+def test_http_mode_round_trip_and_readiness(client, chroma_server):
+    sid = "http_mode"
+    created = client.post("/memories/", json={"session_id": sid, "content": "served by chroma"})
+    assert created.status_code == 201
+    query = client.post("/memories/query", json={"session_id": sid, "query_text": "served"})
+    assert [row["id"] for row in query.json()["results"]] == [created.json()["id"]]
+    assert client.get("/readyz").status_code == 200
+
+    chroma_server.terminate()
+    chroma_server.wait(timeout=30)
+    original_retries = settings.CHROMA_RETRIES
+    settings.CHROMA_RETRIES = 0
+    try:
+        assert client.get("/readyz").status_code == 503
+    finally:
+        settings.CHROMA_RETRIES = original_retries
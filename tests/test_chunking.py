@@ -0,0 +1,79 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import get_chunk_collection
+from app.services import chunking
+from app.services.chunking import split_chunks
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def test_split_chunks_overlaps_and_covers_text():
+    text = " ".join(f"word{i}" for i in range(600))
+    chunks = split_chunks(text)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= settings.CHUNK_SIZE_CHARS for chunk in chunks)
+    assert chunks[0] == text[: len(chunks[0])]
+    assert text.endswith(chunks[-1])
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current[:20] in previous
+    assert split_chunks("short text") == []
+
+
+def test_long_memory_tail_is_searchable_and_collapses_to_parent(client):
+    sid = "chunk_session"
+    content = " ".join(f"token{i}" for i in range(500)) + " the rollback runbook lives here"
+    created = client.post("/memories/", json={"session_id": sid, "content": content})
+    assert created.status_code == 201
+    block_id = created.json()["id"]
+    client.post("/memories/", json={"session_id": sid, "content": "unrelated short memory"})
+    chunks = split_chunks(content)
+    assert get_chunk_collection().count() == len(chunks)
+
+    response = client.post(
+        "/memories/query", json={"session_id": sid, "query_text": chunks[-1], "top_k": 5}
+    )
+    results = response.json()["results"]
+    assert [row["id"] for row in results].count(block_id) == 1
+    assert results[0]["id"] == block_id
+    assert results[0]["content"] == content
+    assert results[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+
+    # Shrinking below one window drops the stale chunks; deletes clean up too.
+    upsert = client.post(
+        "/memories/upsert",
+        json={"id": block_id, "session_id": sid, "content": "now short"},
+    )
+    assert upsert.status_code == 200
+    assert get_chunk_collection().count() == 0
+
+    client.post("/memories/", json={"session_id": sid, "content": content})
+    assert get_chunk_collection().count() == len(chunks)
+    client.delete(f"/memories/session/{sid}")
+    assert get_chunk_collection().count() == 0
+
+
+def test_queries_cache_whether_chunks_exist(client, monkeypatch):
+    sid = "chunk_cache"
+    collection = get_chunk_collection()
+    counts = []
+    count = collection.count
+    monkeypatch.setattr(collection, "count", lambda: counts.append(1) or count())
+    monkeypatch.setattr(chunking, "_known_collection", None)
+
+    for _ in range(3):
+        query = {"session_id": sid, "query_text": "nothing stored yet", "top_k": 3}
+        assert client.post("/memories/query", json=query).status_code == 200
+    assert len(counts) == 1
+    assert chunking._known_has_chunks is False
+
+    # A write in this process flips the cached flag, so the new chunks are searched at once.
+    content = " ".join(f"cached{i}" for i in range(500))
+    block_id = client.post("/memories/", json={"session_id": sid, "content": content}).json()["id"]
+    tail = split_chunks(content)[-1]
+    response = client.post(
+        "/memories/query", json={"session_id": sid, "query_text": tail, "top_k": 3}
+    )
+    assert response.json()["results"][0]["id"] == block_id
+    assert response.json()["results"][0]["distance"] == pytest.approx(0.0, abs=1e-6)
+    assert len(counts) == 1
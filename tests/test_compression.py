@@ -0,0 +1,65 @@
+import gzip
+import json
+
+import pytest
+
+from app.core.compression import negotiate_encoding
+from app.core.config import settings
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def test_negotiation_honours_q_values():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("*") is not None
+    assert negotiate_encoding("") is None
+
+
+def test_snapshot_streams_compressed_and_small_bodies_pass_through(client):
+    sid = "gzip_snapshot"
+    memories = [{"content": f"memory number {i} " + "x" * 200} for i in range(30)]
+    restore = client.post(
+        f"/memories/session/{sid}/restore",
+        content=gzip.compress(json.dumps({"mode": "replace", "memories": memories}).encode()),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert restore.status_code == 200
+    assert restore.json()["restored"] == 30
+    assert "content-encoding" not in restore.headers
+
+    snapshot = client.get(
+        f"/memories/session/{sid}/snapshot?limit=25", headers={"Accept-Encoding": "gzip"}
+    )
+    assert snapshot.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in snapshot.headers["vary"]
+    payload = snapshot.json()
+    assert payload["session_id"] == sid
+    assert payload["total"] == len(payload["memories"]) == 25
+
+    plain = client.get(f"/memories/session/{sid}/snapshot", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.json()["total"] == 30
+
+
+def test_request_decompression_is_bounded(client):
+    original = settings.REQUEST_MAX_DECOMPRESSED_BYTES
+    settings.REQUEST_MAX_DECOMPRESSED_BYTES = 1024
+    try:
+        body = json.dumps({"mode": "append", "memories": [{"content": "y" * 5000}]}).encode()
+        too_big = client.post(
+            "/memories/session/gzip_bomb/restore",
+            content=gzip.compress(body),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+        )
+        assert too_big.status_code == 413
+        assert too_big.json()["code"] == "payload_too_large"
+
+        unknown = client.post(
+            "/memories/session/gzip_bomb/restore",
+            content=b"{}",
+            headers={"Content-Encoding": "lzma", "Content-Type": "application/json"},
+        )
+        assert unknown.status_code == 415
+    finally:
+        settings.REQUEST_MAX_DECOMPRESSED_BYTES = original
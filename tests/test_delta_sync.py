@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.services.embedder as embedder_module
+from app.core.config import settings
+from app.services.delta_sync import content_hash
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def _create(client, session_id, content):
+    response = client.post("/memories/", json={"content": content, "session_id": session_id})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _delta(client, session_id, **body):
+    response = client.post(f"/memories/session/{session_id}/delta", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_since_watermark_returns_changes_and_tombstoned_deletes(client):
+    kept = _create(client, "delta-since", "unchanged note")
+    edited = _create(client, "delta-since", "note before the edit")
+    doomed = _create(client, "delta-since", "note that gets deleted")
+
+    full = _delta(client, "delta-since")
+    assert full["reset"] is True
+    assert {row["id"] for row in full["memories"]} == {kept, edited, doomed}
+    assert full["memories"][0]["content_hash"] == content_hash(full["memories"][0]["content"])
+
+    client.post(
+        "/memories/upsert",
+        json={"id": edited, "content": "note after the edit", "session_id": "delta-since"},
+    )
+    assert client.delete(f"/memories/{doomed}").status_code == 200
+    added = _create(client, "delta-since", "note added later")
+
+    delta = _delta(client, "delta-since", since=full["watermark"])
+    assert delta["reset"] is False
+    assert {row["id"] for row in delta["memories"]} == {edited, added}
+    assert delta["deleted"] == [doomed]
+
+    assert _delta(client, "delta-since", since=delta["watermark"])["memories"] == []
+    bad = client.post("/memories/session/delta-since/delta", json={"since": "yesterday"})
+    assert bad.status_code == 422
+
+
+def test_known_tuples_are_diffed_by_hash(client):
+    same = _create(client, "delta-known", "same on both sides")
+    stale = _create(client, "delta-known", "server copy")
+    fresh = _create(client, "delta-known", "only on the server")
+    known = [
+        {"id": same, "content_hash": content_hash("same on both sides")},
+        {"id": stale, "content_hash": content_hash("replica copy")},
+        {"id": "gone-from-server", "content_hash": content_hash("anything")},
+    ]
+
+    delta = _delta(client, "delta-known", known=known)
+    assert delta["reset"] is False
+    assert {row["id"] for row in delta["memories"]} == {stale, fresh}
+    assert delta["deleted"] == ["gone-from-server"]
+
+
+def test_watermark_older_than_tombstone_window_forces_reset(client, monkeypatch):
+    monkeypatch.setattr(settings, "TOMBSTONE_RETENTION_SECONDS", 60)
+    kept = _create(client, "delta-old", "survivor")
+    old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+
+    delta = _delta(client, "delta-old", since=old)
+    assert delta["reset"] is True
+    assert [row["id"] for row in delta["memories"]] == [kept]
+    assert delta["deleted"] == []
+
+
+def test_delta_restore_skips_reembedding_unchanged_memories(client, monkeypatch):
+    unchanged = _create(client, "delta-restore", "keeps its vector")
+    doomed = _create(client, "delta-restore", "removed by the replica")
+    calls = []
+    embedder = embedder_module.get_embedder()
+    encode = embedder.encode
+    monkeypatch.setattr(embedder, "encode", lambda text: calls.append(text) or encode(text))
+
+    response = client.post(
+        "/memories/session/delta-restore/restore",
+        json={
+            "mode": "delta",
+            "deleted": [doomed, "not-in-this-session"],
+            "memories": [
+                {"id": unchanged, "content": "keeps its vector", "name": "renamed"},
+                {"id": "delta-new", "content": "brand new on the replica"},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["restored"], body["deleted"], body["unchanged"]) == (2, 1, 1)
+    assert calls == ["brand new on the replica"]
+
+    rows = client.get("/memories/", params={"session_id": "delta-restore"}).json()["items"]
+    assert {row["id"]: row["name"] for row in rows} == {
+        unchanged: "renamed",
+        "delta-new": "Unnamed Block",
+    }
@@ -0,0 +1,46 @@
+import math
+
+from app.services.embedder import FeatureHashEmbedder
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_feature_hash_embedder_is_normalized_and_deterministic():
+    embedder = FeatureHashEmbedder(dim=256)
+    vector = embedder.encode("User prefers concise answers")
+    assert len(vector) == 256
+    assert math.isclose(math.sqrt(sum(v * v for v in vector)), 1.0, rel_tol=1e-9)
+    assert FeatureHashEmbedder(dim=256).encode("User prefers concise answers") == vector
+
+
+def test_feature_hash_embedder_reflects_lexical_similarity():
+    embedder = FeatureHashEmbedder()
+    base, near, far = embedder.encode_batch(
+        [
+            "User prefers concise answers",
+            "User prefers concise answer.",
+            "Deploy the kubernetes cluster tonight",
+        ]
+    )
+    assert _cosine(base, near) > 0.8
+    assert _cosine(base, far) < 0.3
+    assert embedder.encode_batch([]) == []
+
+
+def test_feature_hash_batch_matches_single_encodes():
+    embedder = FeatureHashEmbedder(dim=256)
+    texts = ["User prefers concise answers", "", "a", "  ", "Deploy the cluster tonight"]
+    batch = embedder.encode_batch(texts)
+    assert batch == [embedder.encode(text) for text in texts]
+    assert batch[1] == [0.0] * 256
+
+
+def test_feature_hash_embedder_uses_word_order():
+    embedder = FeatureHashEmbedder(char_ngram_range=(3, 3))
+    base, same_order, swapped = embedder.encode_batch(
+        ["deploy before review", "deploy before review today", "review before deploy"]
+    )
+    # Only the bigrams tell the swapped phrase apart: unigrams and most trigrams match.
+    assert _cosine(base, same_order) > _cosine(base, swapped)
@@ -0,0 +1,120 @@
+import os
+
+import pytest
+
+import app.services.embedder as embedder_module
+from app.core.config import settings
+from app.core.database import Database
+from app.services.embedder import build_embedder, embedding_model_id
+from app.services.embedding_migration import (
+    EmbeddingMigration,
+    _checkpoint_path,
+    get_embedding_migration,
+    reset_embedding_migration,
+)
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+NGRAM_ID = embedding_model_id("ngram")
+
+
+@pytest.fixture
+def migration(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MIGRATION_MAX_ROWS_PER_SECOND", 0.0)
+    reset_embedding_migration()
+    yield
+    reset_embedding_migration()
+    embedder_module.reset_embedder()
+    if os.path.exists(_checkpoint_path()):
+        os.remove(_checkpoint_path())
+
+
+def _create(client, session_id, content):
+    response = client.post("/memories/", json={"content": content, "session_id": session_id})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_copy_resumes_from_checkpoint_after_a_stop(client, migration):
+    for i in range(5):
+        _create(client, "resume", f"resumable memory {i}")
+    total = Database.get_collection().count()
+    holder = {}
+
+    def stopping_factory(provider, model_name=None):
+        embedder = build_embedder(provider, model_name)
+        encode_batch = embedder.encode_batch
+
+        def encode_and_stop(texts):
+            holder["job"]._stop.set()
+            return encode_batch(texts)
+
+        embedder.encode_batch = encode_and_stop
+        return embedder
+
+    first = holder["job"] = EmbeddingMigration(batch_size=2, embedder_factory=stopping_factory)
+    first.start("ngram")
+    first.wait(timeout=30)
+    assert first.state["state"] == "copying"
+    assert first.state["offset"] == 2
+
+    resumed = EmbeddingMigration(batch_size=2, max_rows_per_second=0)
+    assert resumed.resume() is True
+    resumed.wait(timeout=30)
+    assert resumed.state["state"] == "ready"
+    assert resumed.state["copied"] == total
+
+
+def test_migration_switches_to_the_reembedded_shadow(client, migration):
+    kept = _create(client, "migrate", "deploy checklist for the payments service")
+    doomed = _create(client, "migrate", "obsolete note to delete before the switch")
+    _create(client, "migrate", "long design document paragraph " * 60)
+    source_name = Database.get_collection().name
+
+    started = client.post("/admin/embedding-migration", json={"provider": "ngram"})
+    assert started.status_code == 202
+    job = get_embedding_migration()
+    job.wait(timeout=30)
+    assert job.state["state"] == "ready", job.state["error"]
+    assert client.post("/admin/embedding-migration", json={"provider": "local"}).status_code == 409
+
+    # Reads and writes stay on the old model until the switch.
+    assert Database.get_collection().name == source_name
+    late = _create(client, "migrate", "written after the copy finished")
+    assert client.delete(f"/memories/{doomed}").status_code == 200
+    models = client.get("/admin/embedding-models").json()
+    assert models["mixed"] is False
+    assert set(models["counts"]) == {"hash:256"}
+
+    assert client.post("/admin/embedding-migration/switch").status_code == 202
+    job.wait(timeout=30)
+    assert job.state["state"] == "switched", job.state["error"]
+    assert not os.path.exists(_checkpoint_path())
+
+    collection = Database.get_collection()
+    assert collection.name == job.state["target"]["memory_blocks"]
+    rows = collection.get(where={"session_id": "migrate"}, include=["metadatas"])
+    assert set(rows["ids"]) >= {kept, late}
+    assert doomed not in rows["ids"]
+    assert {meta["embedding_model"] for meta in rows["metadatas"]} == {NGRAM_ID}
+    assert Database.get_chunk_collection().count() > 0
+    assert embedder_module.get_embedder().model_id == NGRAM_ID
+
+    hits = client.post(
+        "/memories/query", json={"query_text": "payments deploy checklist", "session_id": "migrate"}
+    )
+    assert hits.json()["results"][0]["id"] == kept
+    assert client.get("/readyz").status_code == 200
+
+    # A process still configured for the old model refuses to serve the migrated store.
+    embedder_module.reset_embedder()
+    assert client.get("/readyz").status_code == 503
+
+
+def test_migration_is_refused_in_http_mode(client, migration, monkeypatch):
+    # Other workers would keep embedding with the old model into the new collections.
+    monkeypatch.setattr(settings, "CHROMA_MODE", "http")
+    started = client.post("/admin/embedding-migration", json={"provider": "ngram"})
+    assert started.status_code == 422
+    assert client.post("/admin/embedding-migration/switch").status_code == 422
+    assert not os.path.exists(_checkpoint_path())
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+from app.services.embedder import HashEmbedder
+from app.services.embedding_server import EmbeddingServer, RemoteEmbedder
+
+
+@pytest.fixture
+def server():
+    socket_path = os.path.join(tempfile.mkdtemp(), "embedder.sock")
+    srv = EmbeddingServer(HashEmbedder(64), socket_path, max_batch=32, batch_window_ms=20)
+    srv.start()
+    yield srv
+    srv.shutdown()
+
+
+def test_remote_embedder_matches_in_process_encoding(server):
+    client = RemoteEmbedder(server.socket_path)
+    local = HashEmbedder(64)
+
+    single = client.encode("hello world")
+    assert single == pytest.approx(local.encode("hello world"), abs=1e-6)
+
+    batch = client.encode_batch(["a", "b", "c"])
+    assert len(batch) == 3
+    assert batch[2] == pytest.approx(local.encode("c"), abs=1e-6)
+
+
+def test_concurrent_clients_share_batches(server):
+    client = RemoteEmbedder(server.socket_path)
+    threads = [
+        threading.Thread(target=client.encode, args=(f"text {i}",)) for i in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.requests_served == 16
+    assert server.batches_run < 16
+
+
+def test_falls_back_in_process_when_server_is_down():
+    client = RemoteEmbedder(
+        "/nonexistent/statelock.sock",
+        fallback_factory=lambda: HashEmbedder(64),
+    )
+    assert client.encode("offline") == HashEmbedder(64).encode("offline")
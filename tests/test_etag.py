@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.config import settings
+from app.core.versions import etags_enabled
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def test_snapshot_etag_tracks_session_writes(client):
+    sid = "etag_snapshot"
+    client.post("/memories/", json={"content": "first", "session_id": sid})
+
+    first = client.get(f"/memories/session/{sid}/snapshot")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    unchanged = client.get(f"/memories/session/{sid}/snapshot", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    assert unchanged.content == b""
+
+    # Projection changes the representation, so it gets its own tag.
+    projected = client.get(
+        f"/memories/session/{sid}/snapshot?fields=id", headers={"If-None-Match": etag}
+    )
+    assert projected.status_code == 200
+
+    # Writes to another session leave this session's tag alone.
+    client.post("/memories/", json={"content": "elsewhere", "session_id": "etag_other"})
+    still = client.get(f"/memories/session/{sid}/snapshot", headers={"If-None-Match": etag})
+    assert still.status_code == 304
+
+    created = client.post("/memories/", json={"content": "second", "session_id": sid}).json()
+    changed = client.get(f"/memories/session/{sid}/snapshot", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["total"] == 2
+
+    etag = changed.headers["ETag"]
+    client.delete(f"/memories/{created['id']}")
+    after_delete = client.get(f"/memories/session/{sid}/snapshot", headers={"If-None-Match": etag})
+    assert after_delete.status_code == 200
+
+
+def test_global_listings_use_store_version(client):
+    def status(path, etag):
+        return client.get(path, headers={"If-None-Match": etag}).status_code
+
+    sessions_etag = client.get("/sessions").headers["ETag"]
+    tags_etag = client.get("/tags").headers["ETag"]
+    assert status("/sessions", sessions_etag) == 304
+    assert status("/tags", tags_etag) == 304
+
+    client.post("/memories/", json={"content": "tagged", "session_id": "etag_g", "tags": ["t"]})
+    assert status("/sessions", sessions_etag) == 200
+    assert status("/tags", tags_etag) == 200
+
+
+def test_etags_default_off_in_http_mode(monkeypatch):
+    monkeypatch.setattr(settings, "ETAG_ENABLED", None)
+    assert etags_enabled()
+    # Per-process versions would answer stale 304s across workers sharing a Chroma server.
+    monkeypatch.setattr(settings, "CHROMA_MODE", "http")
+    assert not etags_enabled()
+    monkeypatch.setattr(settings, "ETAG_ENABLED", True)
+    assert etags_enabled()
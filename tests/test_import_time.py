@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Set, Tuple
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Generous enough for a cold CI runner; the heavy-module check is the strict part.
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STATELOCK_STARTUP_BUDGET_SECONDS", "3.0"))
+HEAVY_MODULES = {"chromadb", "torch", "sentence_transformers", "numpy"}
+
+
+def _cold_start(args: List[str]) -> Tuple[float, Set[str]]:
+    """Run a fresh interpreter; return wall time and the top-level modules it imported."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env={**os.environ, "EMBEDDING_PROVIDER": "hash"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    modules = {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and line.count("|") == 2
+    }
+    return elapsed, modules
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["-c", "import main"],
+        ["-c", "import app.services.automation_policy"],
+        ["-c", "import app.services.embedding_server"],
+        ["scripts/session_snapshot_cli.py", "--help"],
+    ],
+)
+def test_hash_mode_cold_start_skips_heavy_dependencies(args):
+    elapsed, modules = _cold_start(args)
+    assert not modules & HEAVY_MODULES
+    assert elapsed < STARTUP_BUDGET_SECONDS
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.jobs import JobManager, JobStore, _db_path, job_handler
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+release = threading.Event()
+
+
+@job_handler("test_blocking")
+def _blocking(context, params):
+    while not release.wait(0.01):
+        context.advance()
+    return {"done": context.done}
+
+
+def _create(client, session_id, content):
+    response = client.post("/memories/", json={"content": content, "session_id": session_id})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _wait(manager, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    job = manager.get(job_id)
+    while job["state"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.02)
+        job = manager.get(job_id)
+    return job
+
+
+def test_async_session_delete_and_snapshot_run_as_jobs(client, job_manager):
+    for i in range(4):
+        _create(client, "jobs-snap", f"snapshot memory {i}")
+
+    started = client.get("/memories/session/jobs-snap/snapshot", params={"async": "true"})
+    assert started.status_code == 202
+    assert started.json()["kind"] == "snapshot"
+    snapshot_id = started.json()["id"]
+    assert _wait(job_manager, snapshot_id)["state"] == "succeeded"
+    snapshot = client.get(f"/jobs/{snapshot_id}/result").json()
+    assert snapshot["total"] == 4 and len(snapshot["memories"]) == 4
+    # Streamed to a file beside the job table rather than stored in it.
+    result_path = job_manager.result_file(snapshot_id)
+    assert os.path.exists(result_path) and job_manager.store.result(snapshot_id) is None
+
+    deleted = client.delete("/memories/session/jobs-snap", params={"async": "true"})
+    assert deleted.status_code == 202
+    job = _wait(job_manager, deleted.json()["id"])
+    assert (job["state"], job["total"]) == ("succeeded", 4)
+    assert client.get(f"/jobs/{job['id']}/result").json()["deleted"] == 4
+    assert client.get("/memories/", params={"session_id": "jobs-snap"}).json()["items"] == []
+    assert client.get("/jobs", params={"kind": "delete_session"}).json()["items"][0]["id"] == (
+        job["id"]
+    )
+
+    job_manager.store.update(snapshot_id, finished_at="2000-01-01T00:00:00+00:00")
+    assert job_manager.prune() == 1
+    assert not os.path.exists(result_path)
+
+
+def test_async_restore_spools_its_body_outside_the_job_row(client, job_manager):
+    memories = [{"content": f"restored memory {i} " + "x" * 200} for i in range(3)]
+    started = client.post(
+        "/memories/session/jobs-restore/restore",
+        params={"async": "true"},
+        json={"mode": "replace", "memories": memories},
+    )
+    assert started.status_code == 202
+    job_id = started.json()["id"]
+    # Only a summary is stored with the job and returned by the job endpoints.
+    summary = {"session_id": "jobs-restore", "mode": "replace", "count": 3}
+    assert started.json()["params"] == summary
+    assert _wait(job_manager, job_id)["state"] == "succeeded"
+    assert client.get("/jobs", params={"kind": "restore"}).json()["items"][0]["params"] == summary
+
+    assert client.get(f"/jobs/{job_id}/result").json()["restored"] == 3
+    assert len(client.get("/memories/", params={"session_id": "jobs-restore"}).json()["items"]) == 3
+    assert os.listdir(job_manager.store.payloads_dir) == []
+
+
+def test_cancel_queued_and_running_jobs(client, job_manager):
+    release.clear()
+    running = job_manager.submit("test_blocking", resources=["session:jobs-busy"])
+    queued = [job_manager.submit("test_blocking") for _ in range(2)]
+
+    # An active job holds its session against conflicting heavy operations.
+    conflict = client.delete("/memories/session/jobs-busy", params={"async": "true"})
+    assert conflict.status_code == 409
+
+    cancelled = client.post(f"/jobs/{queued[-1]['id']}/cancel")
+    assert cancelled.status_code == 202
+    assert cancelled.json()["state"] == "cancelled"
+    for job in (running, *queued[:-1]):
+        job_manager.cancel(job["id"])
+    for job in (running, *queued):
+        assert _wait(job_manager, job["id"])["state"] == "cancelled"
+    assert client.post(f"/jobs/{running['id']}/cancel").status_code == 409
+    assert client.get(f"/jobs/{running['id']}/result").status_code == 409
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_jobs_of_a_dead_process_are_failed_and_periodic_jobs_run(job_manager):
+    release.clear()
+    orphan = job_manager.submit("test_blocking")
+    # Simulate the owning process dying: it stops heartbeating and never finishes.
+    job_manager.store.update(orphan["id"], heartbeat_at=0.0, owner="gone")
+
+    successor = JobManager(JobStore(_db_path()), heartbeat_seconds=0.05)
+    try:
+        ticks = []
+        successor.schedule("compaction", 0.05)
+        # Per-process upkeep runs on the scheduler thread without a job row.
+        successor.every("tick", 0.05, lambda: ticks.append(1))
+        successor.start()
+        failed = successor.get(orphan["id"])
+        assert failed["state"] == "failed" and "interrupted" in failed["error"]
+
+        deadline = time.monotonic() + 10
+        while not successor.store.list(kind="compaction") and time.monotonic() < deadline:
+            time.sleep(0.02)
+        compaction = successor.store.list(kind="compaction")[0]
+        assert _wait(successor, compaction["id"])["state"] == "succeeded"
+        assert ticks and not successor.store.list(kind="tick")
+    finally:
+        release.set()
+        successor.stop()
+        successor.store.close()
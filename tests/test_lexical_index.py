@@ -0,0 +1,97 @@
+import pytest
+
+from app.core.config import settings
+from app.services.embedder import get_embedder
+from app.services.lexical_index import LexicalIndex, lexical_index_enabled, tokenize
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("See PROJ-1234 in main.py, ping @alice.") == [
+        "see",
+        "proj-1234",
+        "proj",
+        "1234",
+        "in",
+        "main.py",
+        "main",
+        "py",
+        "ping",
+        "@alice",
+        "alice",
+    ]
+
+
+def test_index_loads_lazily_and_applies_writes_and_deletes():
+    stored = [("a", "s1", "deploy PROJ-1234 today"), ("b", "s1", "lunch menu")]
+    loads = []
+
+    def loader(session_id):
+        loads.append(session_id)
+        return [doc for doc in stored if session_id in (None, doc[1])]
+
+    index = LexicalIndex(loader)
+    index.add("s1", "ignored", "PROJ-1234")  # session not loaded yet: skipped
+    assert [doc_id for doc_id, _ in index.search("s1", "proj-1234", 5)] == ["a"]
+    assert loads == ["s1"]
+
+    index.add("s1", "c", "PROJ-1234 rollback PROJ-1234")
+    assert [doc_id for doc_id, _ in index.search("s1", "PROJ-1234", 5)] == ["c", "a"]
+    index.remove(["c"])
+    index.drop_session("s1")
+    assert index.search("s1", "PROJ-1234", 5) == []
+    assert loads == ["s1"]
+
+
+def test_hybrid_lexical_fusion_and_lexical_only(client, monkeypatch):
+    sid = "lexical_session"
+    contents = [f"general note about release planning number {i}" for i in range(8)]
+    contents.append("Incident INC-40417 traced to cache eviction in worker.py")
+    for content in contents:
+        response = client.post("/memories/", json={"session_id": sid, "content": content})
+        assert response.status_code == 201
+
+    fused = client.post(
+        "/memories/query-hybrid",
+        json={
+            "session_id": sid,
+            "query_text": "INC-40417",
+            "top_k": 1,
+            "candidate_k": 1,
+            "lexical_weight": 1.0,
+        },
+    )
+    assert fused.status_code == 200
+    assert "INC-40417" in fused.json()["results"][0]["content"]
+
+    monkeypatch.setattr(
+        get_embedder(), "encode", lambda text: pytest.fail("lexical_only must not embed")
+    )
+    keyword = client.post(
+        "/memories/query-hybrid",
+        json={"session_id": sid, "query_text": "worker.py", "lexical_only": True},
+    )
+    results = keyword.json()["results"]
+    assert [row["content"] for row in results] == [contents[-1]]
+    assert results[0]["distance"] is None
+
+    client.delete(f"/memories/{results[0]['id']}")
+    gone = client.post(
+        "/memories/query-hybrid",
+        json={"session_id": sid, "query_text": "worker.py", "lexical_only": True},
+    )
+    assert gone.json()["results"] == []
+
+
+def test_index_defaults_off_in_http_mode_without_rebuilds(monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", None)
+    assert lexical_index_enabled()
+    # Other workers' writes and deletes never reach a per-process index on its own.
+    monkeypatch.setattr(settings, "CHROMA_MODE", "http")
+    monkeypatch.setattr(settings, "JOBS_COUNTER_REBUILD_INTERVAL_SECONDS", 0.0)
+    assert not lexical_index_enabled()
+    monkeypatch.setattr(settings, "JOBS_COUNTER_REBUILD_INTERVAL_SECONDS", 60.0)
+    assert lexical_index_enabled()
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_ENABLED", False)
+    assert not lexical_index_enabled()
@@ -0,0 +1,100 @@
+import pytest
+
+import app.core.memory_store as memory_store_module
+from app.core.config import settings
+from app.core.database import Database
+from app.core.memory_store import get_memory_store, reset_memory_store
+from app.services.lexical_index import reset_lexical_index
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def _reconnect(checkpoint: bool) -> None:
+    reset_memory_store(checkpoint=checkpoint)
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    reset_lexical_index()
+
+
+@pytest.fixture
+def memory_mode(monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_MODE", "memory")
+    monkeypatch.setattr(settings, "MEMORY_CHECKPOINT_INTERVAL_SECONDS", 3600.0)
+    _reconnect(checkpoint=False)
+    Database.get_collection()
+    yield
+    _reconnect(checkpoint=False)
+
+
+def _create(client, content):
+    response = client.post(
+        "/memories/", json={"content": content, "name": content, "session_id": "mem-mode"}
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_memory_mode_recovers_checkpoint_plus_journal_after_crash(memory_mode, client):
+    kept = _create(client, "checkpointed memory")
+    dropped = _create(client, "deleted after checkpoint")
+    get_memory_store().checkpoint()
+    late = _create(client, "journaled after checkpoint")
+    assert client.delete(f"/memories/{dropped}").status_code == 200
+
+    # No final checkpoint: startup must rebuild from checkpoint + journal.
+    _reconnect(checkpoint=False)
+    Database.get_collection()
+
+    response = client.get("/memories/", params={"session_id": "mem-mode"})
+    assert response.status_code == 200
+    ids = {row["id"] for row in response.json()["items"]}
+    assert ids == {kept, late}
+    assert get_memory_store().checkpoints_total == 0
+
+
+def test_memory_mode_checkpoints_after_write_threshold(memory_mode, client, monkeypatch):
+    monkeypatch.setattr(get_memory_store(), "checkpoint_every_writes", 2)
+    _create(client, "first")
+    _create(client, "second")
+
+    store = get_memory_store()
+    for _ in range(100):
+        if store.checkpoints_total:
+            break
+        store._stop.wait(0.05)
+    assert store.checkpoints_total >= 1
+    assert store._journal_seqs() == [store._journal_seq]
+
+
+def test_checkpoint_keeps_rows_when_a_delete_lands_mid_checkpoint(memory_mode, monkeypatch):
+    monkeypatch.setattr(memory_store_module, "_CHECKPOINT_PAGE_SIZE", 2)
+    store = get_memory_store()
+    blocks = store.collection("memory_blocks")
+    ids = [f"ckpt-{i}" for i in range(6)]
+    blocks.add(
+        ids=ids,
+        embeddings=[[0.1] * settings.HASH_EMBEDDING_DIM] * len(ids),
+        metadatas=[{"session_id": "ckpt"}] * len(ids),
+        documents=ids,
+    )
+
+    raw = store._raw["memory_blocks"]
+    get = raw.get
+    reads = []
+
+    def get_then_delete(**kwargs):
+        result = get(**kwargs)
+        reads.append(kwargs)
+        if len(reads) == 1:
+            # A concurrent delete between the checkpoint's first and later reads.
+            blocks.delete(ids=["ckpt-0"])
+        return result
+
+    monkeypatch.setattr(raw, "get", get_then_delete)
+    store.checkpoint()
+    monkeypatch.setattr(raw, "get", get)
+
+    _reconnect(checkpoint=False)
+    recovered = Database.get_collection().get(where={"session_id": "ckpt"})["ids"]
+    assert sorted(recovered) == ids[1:]
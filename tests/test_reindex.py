@@ -0,0 +1,120 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import Database
+from app.models.schemas import MemoryCreate
+from app.services.memory_service import MemoryService
+from app.services.reindex import ReindexJob, get_reindex_job, reset_reindex_job
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def _create(client, session_id, content):
+    response = client.post(
+        "/memories/", json={"content": content, "name": content[:20], "session_id": session_id}
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _hybrid_scores(client, session_id, text):
+    response = client.post(
+        "/memories/query-hybrid",
+        json={"query_text": text, "session_id": session_id, "top_k": 3},
+    )
+    assert response.status_code == 200
+    return [(row["id"], round(row["score"], 6)) for row in response.json()["results"]]
+
+
+@pytest.fixture
+def new_hnsw_settings(monkeypatch):
+    monkeypatch.setattr(settings, "CHROMA_DISTANCE_SPACE", "cosine")
+    monkeypatch.setattr(settings, "CHROMA_HNSW_M", 8)
+    monkeypatch.setattr(settings, "CHROMA_HNSW_CONSTRUCTION_EF", 64)
+    monkeypatch.setattr(settings, "CHROMA_HNSW_SEARCH_EF", 32)
+    reset_reindex_job()
+    yield
+    reset_reindex_job()
+
+
+def test_reindex_swaps_in_new_hnsw_params_without_changing_scores(client, new_hnsw_settings):
+    ids = [_create(client, "reindex", f"deploy note {i} on the staging cluster") for i in range(6)]
+    _create(client, "reindex", "long runbook paragraph " * 80)
+    before = _hybrid_scores(client, "reindex", "staging cluster deploy")
+    blocks, chunks = Database.get_collection().count(), Database.get_chunk_collection().count()
+
+    started = client.post("/admin/reindex")
+    assert started.status_code == 202
+    status = get_reindex_job().wait(timeout=30)
+    assert status.state == "succeeded", status.error
+    assert client.get("/admin/reindex").json()["state"] == "succeeded"
+
+    active = Database.active_names()
+    assert active == status.target
+    assert Database.get_collection().metadata["hnsw:space"] == "cosine"
+    assert Database.get_collection().metadata["hnsw:M"] == 8
+    assert Database.get_collection().count() == blocks
+    assert Database.get_chunk_collection().count() == chunks
+    assert set(ids) <= set(Database.get_collection().get(ids=ids)["ids"])
+
+    # Unit-norm embeddings score the same under cosine as under squared L2.
+    assert _hybrid_scores(client, "reindex", "staging cluster deploy") == pytest.approx(before)
+
+    # A reconnect resolves the rebuilt collections through the catalog.
+    Database._client = None
+    Database._collection = None
+    Database._chunk_collection = None
+    assert Database.get_collection().name == active["memory_blocks"]
+
+    assert client.post("/admin/reindex").status_code == 202
+    second = get_reindex_job().wait(timeout=30)
+    assert second.state == "succeeded", second.error
+    assert second.source == status.target
+
+
+def test_writes_during_reindex_are_caught_up_before_swap(new_hnsw_settings):
+    service = MemoryService()
+    keep = service.add_memory(MemoryCreate(content="kept during copy", session_id="live")).id
+    doomed = service.add_memory(MemoryCreate(content="deleted during copy", session_id="live")).id
+    written = {}
+
+    def write_while_copying(logical, rows):
+        if logical == "memory_blocks" and not written:
+            live = MemoryService()
+            written["id"] = live.add_memory(
+                MemoryCreate(content="written during copy", session_id="live")
+            ).id
+            live.delete_bulk([doomed])
+        return rows
+
+    job = ReindexJob(batch_size=2, transform=write_while_copying)
+    job.start()
+    status = job.wait(timeout=30)
+    assert status.state == "succeeded", status.error
+    assert status.caught_up > 0
+
+    found = set(Database.get_collection().get(where={"session_id": "live"})["ids"])
+    assert keep in found
+    assert written["id"] in found
+    assert doomed not in found
+
+
+def test_index_report_measures_recall_against_exact_search(client):
+    for i in range(12):
+        _create(client, "report", f"report sample {i} with distinct words {i * 7}")
+    report = client.get("/admin/index/report", params={"sample_size": 5, "k": 3})
+    assert report.status_code == 200
+    body = report.json()
+    assert body["sample_size"] == 5
+    assert body["k"] == 3
+    assert 0.0 <= body["recall_at_k"] <= 1.0
+    assert body["latency_ms_p95"] >= body["latency_ms_p50"] >= 0.0
+    assert body["configured"]["hnsw:M"] == settings.CHROMA_HNSW_M
+
+
+def test_reindex_is_refused_in_http_mode(client, monkeypatch):
+    # Other workers would keep writing to the collections the swap drops.
+    monkeypatch.setattr(settings, "CHROMA_MODE", "http")
+    response = client.post("/admin/reindex")
+    assert response.status_code == 422
+    assert not get_reindex_job().running
@@ -0,0 +1,49 @@
+import pytest
+
+from app.core.config import settings
+from app.services.retrieval_tracker import get_retrieval_tracker, reset_retrieval_tracker
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+@pytest.fixture
+def session_cap():
+    original_cap = settings.SESSION_MEMORY_CAP
+    original_policy = settings.SESSION_EVICTION_POLICY
+    settings.SESSION_MEMORY_CAP = 3
+    settings.SESSION_EVICTION_POLICY = "lru"
+    reset_retrieval_tracker()
+    yield
+    settings.SESSION_MEMORY_CAP = original_cap
+    settings.SESSION_EVICTION_POLICY = original_policy
+    reset_retrieval_tracker()
+
+
+def _ids(client, sid):
+    items = client.get(f"/memories/?session_id={sid}&fields=content").json()["items"]
+    return sorted(item["content"] for item in items)
+
+
+def test_cap_evicts_least_recently_retrieved_and_skips_pinned(client, session_cap):
+    sid = "cap_lru"
+    client.post("/memories/", json={"content": "A", "session_id": sid, "tags": ["pinned"]})
+    client.post("/memories/", json={"content": "B", "session_id": sid})
+    client.post("/memories/", json={"content": "C", "session_id": sid})
+
+    hit = client.post("/memories/query", json={"query_text": "B", "session_id": sid, "top_k": 1})
+    assert hit.json()["results"][0]["content"] == "B"
+    assert get_retrieval_tracker().flush() == 1
+
+    client.post("/memories/", json={"content": "D", "session_id": sid})
+    assert _ids(client, sid) == ["A", "B", "D"]
+
+
+def test_cap_applies_once_after_restore(client, session_cap):
+    settings.SESSION_EVICTION_POLICY = "oldest"
+    sid = "cap_restore"
+    memories = [{"content": f"m{i}", "tags": ["pinned"] if i == 0 else []} for i in range(5)]
+    restore = client.post(
+        f"/memories/session/{sid}/restore", json={"mode": "append", "memories": memories}
+    )
+    assert restore.json()["restored"] == 5
+    assert _ids(client, sid) == ["m0", "m3", "m4"]
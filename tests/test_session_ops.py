@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+import app.services.embedder as embedder_module
+from app.core.config import settings
+from app.core.database import Database
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def _create(client, session_id, content):
+    response = client.post("/memories/", json={"content": content, "session_id": session_id})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def _ids(client, session_id):
+    response = client.get("/memories/", params={"session_id": session_id})
+    return {row["id"] for row in response.json()["items"]}
+
+
+@pytest.fixture
+def forbid_encoding(monkeypatch):
+    def fail(*args):
+        raise AssertionError("fork and move must not re-embed")
+
+    def forbid():
+        embedder = embedder_module.get_embedder()
+        monkeypatch.setattr(embedder, "encode", fail)
+        monkeypatch.setattr(embedder, "encode_batch", fail)
+
+    return forbid
+
+
+def test_fork_copies_vectors_and_chunks_under_new_deterministic_ids(
+    client, monkeypatch, forbid_encoding
+):
+    source = {_create(client, "fork-src", "deploy checklist for payments")}
+    source.add(_create(client, "fork-src", "long design note paragraph " * 80))
+
+    forbid_encoding()
+    first = client.post("/memories/session/fork-src/fork", json={"target_session_id": "fork-a"})
+    assert first.status_code == 200
+    assert first.json()["processed"] == 2
+
+    copies = _ids(client, "fork-a")
+    assert len(copies) == 2 and not copies & source
+    assert _ids(client, "fork-src") == source
+    chunks = Database.get_chunk_collection().get(where={"session_id": "fork-a"})
+    assert chunks["ids"] and all(chunk_id.split("#")[0] in copies for chunk_id in chunks["ids"])
+
+    again = client.post("/memories/session/fork-src/fork", json={"target_session_id": "fork-a"})
+    assert again.status_code == 200
+    assert _ids(client, "fork-a") == copies
+
+    monkeypatch.undo()
+    hits = client.post(
+        "/memories/query", json={"query_text": "payments deploy checklist", "session_id": "fork-a"}
+    ).json()["results"]
+    assert hits[0]["id"] in copies
+
+
+def test_move_relabels_in_place_and_tombstones_the_source(client, forbid_encoding):
+    moved = {_create(client, "move-src", f"moved memory {i}") for i in range(3)}
+    watermark = client.post("/memories/session/move-src/delta", json={}).json()["watermark"]
+    forbid_encoding()
+
+    response = client.post(
+        "/memories/session/move-src/move", json={"target_session_id": "move-dst"}
+    )
+    assert response.status_code == 200
+    assert response.json()["processed"] == 3
+    assert _ids(client, "move-dst") == moved
+    assert _ids(client, "move-src") == set()
+
+    delta = client.post("/memories/session/move-src/delta", json={"since": watermark}).json()
+    assert set(delta["deleted"]) == moved
+    same = client.post("/memories/session/move-dst/move", json={"target_session_id": "move-dst"})
+    assert same.status_code == 422
+
+
+def test_large_sessions_run_as_jobs_with_progress(
+    client, monkeypatch, forbid_encoding, job_manager
+):
+    monkeypatch.setattr(settings, "SESSION_COPY_INLINE_MAX", 2)
+    monkeypatch.setattr(settings, "SESSION_COPY_BATCH_SIZE", 2)
+    for i in range(5):
+        _create(client, "fork-big", f"bulk memory {i}")
+    forbid_encoding()
+
+    started = client.post("/memories/session/fork-big/fork", json={"target_session_id": "fork-b"})
+    assert started.status_code == 202
+    job = started.json()
+    assert (job["kind"], job["total"]) == ("fork_session", 5)
+    deadline = time.monotonic() + 30
+    while job["state"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job['id']}").json()
+    assert (job["state"], job["done"]) == ("succeeded", 5)
+    assert client.get(f"/jobs/{job['id']}/result").json()["processed"] == 5
+    assert len(_ids(client, "fork-b")) == 5
@@ -0,0 +1,59 @@
+import threading
+import time
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def _run_concurrently(flight, key, fn, callers=5, share=None):
+    results, errors = [], []
+    start = threading.Barrier(callers)
+
+    def call():
+        start.wait()
+        try:
+            results.append(flight.do(key, fn, share))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return [{"id": "a"}]
+
+    results, errors = _run_concurrently(flight, ("q", "same"), slow, share=list)
+    assert not errors
+    assert len(calls) == 1
+    assert flight.executed == 1 and flight.coalesced == 4
+    assert all(result == [{"id": "a"}] for result in results)
+
+    # Finished calls are not cached.
+    flight.do(("q", "same"), slow)
+    assert len(calls) == 2
+
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    results, errors = _run_concurrently(flight, "k", failing, callers=3)
+    assert not results
+    assert len(errors) == 3 and all(str(exc) == "boom" for exc in errors)
+    with pytest.raises(RuntimeError):
+        flight.do("k", failing)
@@ -0,0 +1,90 @@
+import pytest
+
+from app.core.config import settings
+from app.services.embedder import get_embedder
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+def test_turn_saves_previous_output_and_retrieves_it(client, monkeypatch):
+    embedder = get_embedder()
+    calls, encoded = [], []
+    original_batch, original_encode = embedder.encode_batch, embedder.encode
+    monkeypatch.setattr(
+        embedder, "encode_batch", lambda texts: calls.append(list(texts)) or original_batch(texts)
+    )
+    monkeypatch.setattr(
+        embedder, "encode", lambda text: encoded.append(text) or original_encode(text)
+    )
+
+    output = "Decision: deploy the API behind the shared gateway in every region."
+    response = client.post(
+        "/turns",
+        json={
+            "session_id": "turns_session",
+            "previous_input": "Where should the API run?",
+            "previous_output": output,
+            "prompt": "Where does the API run?",
+            "memory_external_id": "deploy_target",
+            "memory_tags": ["deploy"],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["saved"] is True
+    assert body["save_reason"] == "trigger:decision"
+    assert body["memory"]["content"] == output
+    assert body["memory"]["tags"] == ["deploy"]
+    assert [row["content"] for row in body["results"]] == [output]
+    assert calls == [["Where does the API run?", output]]
+    # HashEmbedder.encode_batch encodes per text: nothing is encoded outside the one batch.
+    assert encoded == ["Where does the API run?", output]
+
+    # Re-sending the same turn updates the same block rather than adding another.
+    again = client.post(
+        "/turns?fields=id",
+        json={
+            "session_id": "turns_session",
+            "previous_output": output,
+            "prompt": output,
+            "memory_external_id": "deploy_target",
+            "always_save": True,
+        },
+    )
+    assert again.json()["memory"]["id"] == body["memory"]["id"]
+    assert again.json()["results"] == [{"id": body["memory"]["id"]}]
+    assert calls[-1] == [output]
+    assert encoded == ["Where does the API run?", output, output]
+
+
+def test_turn_skips_save_when_policy_does_not_fire(client):
+    response = client.post(
+        "/turns",
+        json={
+            "session_id": "turns_skip",
+            "previous_input": "hi",
+            "previous_output": "hello there",
+            "prompt": "anything new?",
+        },
+    )
+    body = response.json()
+    assert body["saved"] is False
+    assert body["save_reason"] == "none"
+    assert body["memory"] is None
+    assert body["results"] == []
+
+    empty = client.post(
+        "/turns",
+        json={"session_id": "turns_skip", "prompt": "again", "always_save": True},
+    )
+    assert empty.json()["save_reason"] == "empty_output"
+    assert empty.json()["confidence_low"] is True
+
+
+def test_turn_rejects_an_oversized_prompt(client):
+    response = client.post(
+        "/turns",
+        json={"session_id": "turns_long", "prompt": "x" * (settings.API_CONTENT_MAX_CHARS + 1)},
+    )
+    assert response.status_code == 422
+    assert response.json()["code"] == "validation_error"
@@ -0,0 +1,112 @@
+import pytest
+
+from app.core.config import settings
+from app.core.database import get_db_collection
+from app.services.embedder import get_embedder
+from app.services.write_buffer import WriteBehindBuffer, reset_write_buffer
+
+pytestmark = pytest.mark.usefixtures("memory_store")
+
+
+@pytest.fixture
+def write_behind(tmp_path):
+    original_enabled = settings.WRITE_BEHIND_ENABLED
+    original_journal = settings.WRITE_BEHIND_JOURNAL_PATH
+    original_interval = settings.WRITE_BEHIND_FLUSH_INTERVAL_MS
+    settings.WRITE_BEHIND_ENABLED = True
+    settings.WRITE_BEHIND_JOURNAL_PATH = str(tmp_path / "journal.jsonl")
+    # Keep the background flusher out of the way so reads must do the flushing.
+    settings.WRITE_BEHIND_FLUSH_INTERVAL_MS = 60_000
+    reset_write_buffer()
+    yield
+    reset_write_buffer()
+    settings.WRITE_BEHIND_ENABLED = original_enabled
+    settings.WRITE_BEHIND_JOURNAL_PATH = original_journal
+    settings.WRITE_BEHIND_FLUSH_INTERVAL_MS = original_interval
+
+
+def test_queued_writes_are_visible_to_session_reads(client, write_behind):
+    sid = "wb_visible"
+    created = client.post("/memories/", json={"content": "queued fact", "session_id": sid})
+    assert created.status_code == 201
+    assert created.json()["ingest_action"] == "queued"
+
+    upserted = client.post(
+        "/memories/upsert",
+        json={"external_id": "wb:1", "content": "first", "session_id": sid},
+    ).json()
+    again = client.post(
+        "/memories/upsert",
+        json={"external_id": "wb:1", "content": "second", "session_id": sid},
+    ).json()
+    assert again["id"] == upserted["id"]
+    assert again["created_at"] == upserted["created_at"]
+
+    hits = client.post(
+        "/memories/query", json={"query_text": "queued fact", "session_id": sid, "top_k": 5}
+    ).json()["results"]
+    assert sorted(hit["content"] for hit in hits) == ["queued fact", "second"]
+
+
+def test_unacked_journal_entries_are_replayed(tmp_path):
+    journal = str(tmp_path / "journal.jsonl")
+    meta = {"name": "n", "session_id": "wb_replay", "tags_json": "[]"}
+
+    first = WriteBehindBuffer(journal, fsync=False)
+    first.submit("wb-replay-1", "wb_replay", "flushed before crash", dict(meta))
+    first.flush()
+    first.submit("wb-replay-2", "wb_replay", "lost on crash", dict(meta))
+    # Simulate a crash: no stop(), so the second write is never flushed.
+
+    second = WriteBehindBuffer(journal, fsync=False)
+    assert second.recover() == 1
+    assert second.flush() == 1
+    stored = get_db_collection().get(where={"session_id": "wb_replay"})
+    assert sorted(stored["ids"]) == ["wb-replay-1", "wb-replay-2"]
+    second.stop()
+    assert WriteBehindBuffer(journal, fsync=False).recover() == 0
+
+
+def test_flushing_a_session_drains_its_ids_queued_in_other_sessions(client, write_behind):
+    first = client.post(
+        "/memories/upsert",
+        json={"external_id": "wb:moved", "content": "in a", "session_id": "wb_a"},
+    ).json()
+    watermark = client.post("/memories/session/wb_a/delta", json={}).json()["watermark"]
+    client.post(
+        "/memories/upsert",
+        json={"external_id": "wb:moved", "content": "in b", "session_id": "wb_b"},
+    )
+
+    # Reading the newer session must not leave the older write queued to land last.
+    hits = client.get("/memories/", params={"session_id": "wb_b"}).json()["items"]
+    assert [hit["content"] for hit in hits] == ["in b"]
+    client.get("/memories/", params={"session_id": "wb_a"})
+    stored = get_db_collection().get(ids=[first["id"]])
+    assert stored["metadatas"][0]["session_id"] == "wb_b"
+
+    delta = client.post("/memories/session/wb_a/delta", json={"since": watermark}).json()
+    assert delta["deleted"] == [first["id"]]
+
+
+def test_queued_turn_reuses_the_turn_embedding(client, write_behind, monkeypatch):
+    embedder = get_embedder()
+    calls = []
+    original_batch = embedder.encode_batch
+    monkeypatch.setattr(
+        embedder, "encode_batch", lambda texts: calls.append(list(texts)) or original_batch(texts)
+    )
+
+    output = "Decision: keep the queue in the same region as the API."
+    response = client.post(
+        "/turns",
+        json={
+            "session_id": "wb_turns",
+            "previous_input": "Where does the queue live?",
+            "previous_output": output,
+            "prompt": "Which region hosts the queue?",
+        },
+    )
+    assert response.status_code == 200
+    assert [row["content"] for row in response.json()["results"]] == [output]
+    assert calls == [["Which region hosts the queue?", output]]